@@ -0,0 +1 @@
+"""Microbenchmarks for the PyConsoleApp hot paths. Each module can be run directly with python -m."""
@@ -0,0 +1,100 @@
+"""Runs the benchmark scenarios and writes the results as JSON, so runs from different commits can be compared.
+
+Usage:
+    python -m pyconsoleapp.bench [--filter TEXT] [--output FILE] [--compare BASELINE_FILE] [--repeat N]
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import timeit
+from typing import Any, Dict, List, Optional
+
+from pyconsoleapp.bench import scenarios
+
+
+def _git_commit() -> Optional[str]:
+    """Returns the current git commit hash, if there is one."""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(func, repeat: int) -> Dict[str, Any]:
+    """Times the callable, calling it enough times per measurement to take at least 0.2s."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        'calls_per_measurement': number,
+        'best_s': min(times),
+        'mean_s': sum(times) / len(times),
+        'max_s': max(times),
+    }
+
+
+def run(name_filter: Optional[str], repeat: int) -> Dict[str, Any]:
+    """Runs the matching scenarios and returns the JSON-ready report."""
+    results = {}
+    for s in scenarios.find(name_filter):
+        try:
+            func = s.setup(**s.params)
+        except scenarios.SkipScenario as e:
+            results[s.name] = {'params': s.params, 'skipped': str(e)}
+            print('{name:<55} skipped: {reason}'.format(name=s.name, reason=e), file=sys.stderr)
+            continue
+        result = measure(func, repeat)
+        results[s.name] = dict(params=s.params, **result)
+        print('{name:<55} {best:12.2f}us'.format(name=s.name, best=result['best_s'] * 1e6), file=sys.stderr)
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Prints the change in best time for every scenario in both reports."""
+    print('{name:<55} {old:>12} {new:>12} {ratio:>8}'.format(name='scenario', old='baseline', new='current',
+                                                           ratio='ratio'), file=sys.stderr)
+    for name, result in report['results'].items():
+        old = baseline['results'].get(name, {})
+        if 'best_s' not in result or 'best_s' not in old:
+            continue
+        print('{name:<55} {old:10.2f}us {new:10.2f}us {ratio:7.2f}x'.format(
+            name=name, old=old['best_s'] * 1e6, new=result['best_s'] * 1e6, ratio=result['best_s'] / old['best_s']),
+            file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None, prog: str = 'python -m pyconsoleapp.bench') -> None:
+    """Runs the registered scenarios; apps which register their own scenarios call this with their own prog."""
+    parser = argparse.ArgumentParser(prog=prog, description=__doc__.splitlines()[0])
+    parser.add_argument('--filter', help='Only run scenarios whose names contain this text.')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+    parser.add_argument('--compare', help='JSON report from an earlier run, to compare the results against.')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of measurements per scenario.')
+    args = parser.parse_args(argv)
+
+    report = run(args.filter, args.repeat)
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    if args.compare is not None:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Compares the per-frame cost of clearing the console with os.system against the in-process TerminalWriter,
+and the bytes written per frame by full repaints against the IncrementalRenderer.
+
+Output goes to the null device, so the numbers measure the cost of producing a frame, not of the terminal
+drawing it.
+
+Run with:
+    python -m pyconsoleapp.bench.frame_latency
+"""
+import os
+import sys
+import time
+from typing import Callable
+
+from pyconsoleapp import terminal
+
+_LINES = ['{:03d} '.format(i) + 'x' * 95 for i in range(40)]
+_FRAME = '\n'.join(_LINES) + '\n'
+
+
+def time_frames(draw_frame: Callable[[], None], num_frames: int) -> float:
+    """Returns the mean time (seconds) taken to draw a frame."""
+    start = time.perf_counter()
+    for _ in range(num_frames):
+        draw_frame()
+    return (time.perf_counter() - start) / num_frames
+
+
+def main(num_frames: int = 50) -> None:
+    clear_command = 'cls' if os.name == 'nt' else 'clear'
+    with open(os.devnull, 'w') as devnull:
+        # Point the real stdout file descriptor at the null device, so the clear command's output is discarded;
+        sys.stdout.flush()
+        saved_stdout_fd = os.dup(1)
+        os.dup2(devnull.fileno(), 1)
+        try:
+            def shell_clear_frame():
+                os.system(clear_command)
+                devnull.write(_FRAME)
+                devnull.flush()
+
+            writer = terminal.TerminalWriter(stream=devnull, plain=False)
+
+            shell_clear = time_frames(shell_clear_frame, num_frames)
+            in_process = time_frames(lambda: writer.write_frame(_FRAME), num_frames)
+        finally:
+            os.dup2(saved_stdout_fd, 1)
+            os.close(saved_stdout_fd)
+
+    print('os.system clear: {shell:9.1f}us per frame'.format(shell=shell_clear * 1e6))
+    print('TerminalWriter:  {writer:9.1f}us per frame (x{ratio:.0f} faster)'.format(
+        writer=in_process * 1e6, ratio=shell_clear / in_process))
+
+    # Draw frames which differ only in their message bar row, as most frames do;
+    with open(os.devnull, 'w') as devnull:
+        renderer = terminal.IncrementalRenderer(terminal.TerminalWriter(stream=devnull, plain=False),
+                                                get_terminal_size=lambda: os.terminal_size((100, 50)))
+        for frame_num in range(num_frames):
+            message_bar = '[i] Info: message {num}'.format(num=frame_num).ljust(99)
+            renderer.render('\n'.join(_LINES[:3] + [message_bar] + _LINES[4:]) + '\n')
+    full_repaint_bytes = len(_FRAME.encode('utf-8'))
+    print('Full repaint:    {full:9.0f} bytes per frame'.format(full=full_repaint_bytes))
+    print('Incremental:     {incremental:9.0f} bytes per frame, {lines:.1f} lines (x{ratio:.0f} fewer bytes)'.format(
+        incremental=renderer.stats.mean_bytes_per_frame, lines=renderer.stats.mean_lines_per_frame,
+        ratio=full_repaint_bytes / renderer.stats.mean_bytes_per_frame))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Measures the memory held per responder and per component, using tracemalloc. The todo app measures its todos
+with python -m todo_app.bench --memory.
+
+Run with:
+    python -m pyconsoleapp.bench.memory [--responders 10000] [--json]
+"""
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from pyconsoleapp import ConsoleApp, Component, PrimaryArg, OptionalArg
+
+
+class _Page(Component):
+    def printer(self, **kwds) -> str:
+        return ''
+
+
+def bytes_per_object(make: Callable[[int], Any], count: int) -> float:
+    """Returns the bytes allocated and kept per object, making count objects with make(i)."""
+    gc.collect()
+    tracemalloc.start()
+    objects: List[Any] = [None] * count  # Allocated up front, so the list itself isn't counted.
+    baseline, _ = tracemalloc.get_traced_memory()
+    for i in range(count):
+        objects[i] = make(i)
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (end - baseline) / count
+
+
+def measure(responders: int) -> Dict[str, float]:
+    """Returns the bytes per responder (with three args) and per component."""
+    app = ConsoleApp('Memory')
+    page = _Page(app=app)
+    return {
+        'bytes_per_responder': bytes_per_object(lambda i: page.configure_responder(lambda text, today, i: None, args=[
+            PrimaryArg(name='text', accepts_value=True, markers=['-add', '-a']),
+            OptionalArg(name='today', accepts_value=False, markers=['--today']),
+            OptionalArg(name='i', accepts_value=True, markers=['--importance', '--i'], default_value=1),
+        ]), responders),
+        'bytes_per_component': bytes_per_object(lambda i: _Page(app=app), responders),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m pyconsoleapp.bench.memory', description=__doc__.splitlines()[0])
+    parser.add_argument('--responders', type=int, default=10000, help='Number of responders and components to make.')
+    parser.add_argument('--json', action='store_true', help='Write the results to stdout as JSON.')
+    args = parser.parse_args()
+    report = measure(args.responders)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+        return
+    for name, value in report.items():
+        print('{name:<22} {value:10.1f}'.format(name=name, value=value))
+
+
+if __name__ == '__main__':
+    main()
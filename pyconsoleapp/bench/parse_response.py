@@ -0,0 +1,76 @@
+"""Compares Responder._parse_response against the original per-word marker scan.
+
+Run with:
+    python -m pyconsoleapp.bench.parse_response
+"""
+import timeit
+from typing import Any, Dict, List
+
+from pyconsoleapp import ConsoleApp, PrimaryArg, OptionalArg
+from pyconsoleapp.responder import Responder
+
+
+class _LinearScanResponder(Responder):
+    """Responder using the original parsing strategy, which rebuilt the marker list for every word."""
+
+    def _parse_response(self, response: str) -> Dict[str, Any]:
+        def all_markers() -> List[str]:
+            markers = []
+            for arg in self._args:
+                markers.extend(arg.markers)
+            return markers
+
+        def get_arg_for_marker(marker: str):
+            for arg in self._args:
+                if marker in arg.markers:
+                    return arg
+
+        current_arg = self.markerless_arg
+        for current_word in response.split():
+            if current_word in all_markers():
+                if current_arg is not None:
+                    current_arg.write_value_buffer()
+                current_arg = get_arg_for_marker(current_word)
+                current_arg.marker_found = True
+            else:
+                current_arg.buffer_value(current_word)
+        current_arg.write_value_buffer()
+        return self._args_and_values
+
+
+def make_args() -> List[PrimaryArg]:
+    """Returns the args used by the todo menu's -add responder."""
+    return [
+        PrimaryArg(name='todo_text', accepts_value=True, markers=['-add', '-a']),
+        OptionalArg(name='today_flag', accepts_value=False, markers=['--today', '--t']),
+        OptionalArg(name='importance_score', accepts_value=True, markers=['--importance', '--i'], default_value=1)
+    ]
+
+
+def make_response(num_words: int) -> str:
+    """Returns an -add response carrying num_words words of todo text."""
+    return '-add {text} --today --importance 2'.format(text=' '.join(['word'] * num_words))
+
+
+def time_parse(responder: Responder, response: str, number: int) -> float:
+    """Returns the best mean time (seconds) per parse of the response."""
+
+    def parse():
+        responder._parse_response(response)
+        responder._reset_args()
+
+    return min(timeit.repeat(parse, number=number, repeat=5)) / number
+
+
+def main() -> None:
+    app = ConsoleApp('Benchmark')
+    for num_words, number in ((10, 2000), (1000, 100), (10000, 10)):
+        response = make_response(num_words)
+        indexed = time_parse(Responder(app, lambda **kwds: None, args=make_args()), response, number)
+        linear = time_parse(_LinearScanResponder(app, lambda **kwds: None, args=make_args()), response, number)
+        print('{words:>6} words: linear scan {linear:9.1f}us, indexed {indexed:9.1f}us, speedup x{ratio:.1f}'.format(
+            words=num_words, linear=linear * 1e6, indexed=indexed * 1e6, ratio=linear / indexed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""Benchmark scenarios for the hot paths. Each scenario does its setup, then returns the callable to time."""
+import random
+import string
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from pyconsoleapp import ConsoleApp, Component, PrimaryArg, fuzzy_index, styles, utils
+from pyconsoleapp.bench import parse_response
+from pyconsoleapp.responder import Responder
+
+
+class Scenario(NamedTuple):
+    name: str
+    params: Dict[str, Any]
+    setup: Callable[..., Callable[[], Any]]
+
+
+scenarios: List[Scenario] = []
+
+
+def scenario(name: str, **param_options: List[Any]) -> Callable:
+    """Registers the decorated setup function as one scenario per value of its (single) parameter."""
+
+    def register(setup: Callable[..., Callable[[], Any]]) -> Callable[..., Callable[[], Any]]:
+        (param_name, values), = param_options.items()
+        for value in values:
+            scenarios.append(Scenario(name='{name}[{param}={value}]'.format(name=name, param=param_name, value=value),
+                                      params={param_name: value}, setup=setup))
+        return setup
+
+    return register
+
+
+class SkipScenario(Exception):
+    """Raised by a scenario's setup when it can't run in this environment."""
+
+
+class _Page(Component):
+    """Minimal component, to hang benchmark responders and children on."""
+
+    def printer(self, **kwds) -> str:
+        return ''
+
+
+@scenario('responder.parse_response', words=[10, 10000])
+def parse_response_setup(words: int) -> Callable[[], Any]:
+    responder = Responder(ConsoleApp('Benchmark'), lambda **kwds: None, args=parse_response.make_args())
+    response = parse_response.make_response(words)
+
+    def parse():
+        responder._parse_response(response)
+        responder._reset_args()
+
+    return parse
+
+
+@scenario('console_app.process_response', responders=[10, 100, 1000])
+def process_response_setup(responders: int) -> Callable[[], Any]:
+    app = ConsoleApp('Benchmark')
+    app.configure(routes={'page': _Page})
+    app.current_route = 'page'
+    page = app.get_component(_Page, 'page')
+    page.configure(responders=[
+        page.configure_responder(lambda value: None, args=[
+            PrimaryArg(name='value', accepts_value=True, markers=['-cmd{}'.format(i)])
+        ]) for i in range(responders)
+    ])
+    response = '-cmd{} some value'.format(responders - 1)
+    return lambda: app._process_response(response)
+
+
+class _RoutePage(_Page):
+    """Route component with a few delegated states and responders, like a typical console page."""
+
+    def __init__(self, **kwds):
+        super().__init__(**kwds)
+        for state in ('view', 'edit', 'confirm'):
+            self.delegate_state(state, _Page)
+        self.configure(responders=[
+            self.configure_responder(lambda: None, args=[
+                PrimaryArg(name='option', accepts_value=False, markers=['-option{}'.format(i)])
+            ]) for i in range(10)
+        ])
+
+
+@scenario('console_app.startup', routes=[200])
+def startup_setup(routes: int) -> Callable[[], Any]:
+    def start():
+        app = ConsoleApp('Benchmark')
+        app.configure(routes={'route{}'.format(i): _RoutePage for i in range(routes)})
+        app.current_route = 'route0'
+        return app._load_active_component().render()
+
+    return start
+
+
+@scenario('console_app.go_to_param_route', routes=[200])
+def go_to_param_route_setup(routes: int) -> Callable[[], Any]:
+    app = ConsoleApp('Benchmark')
+    app.configure(routes={'route{}.<item_id>'.format(i): _RoutePage for i in range(routes)})
+    item_ids = iter(range(10 ** 9))
+
+    def go_to():
+        app.go_to('route{}.{}'.format(routes - 1, next(item_ids)))
+        return app._load_active_component()
+
+    return go_to
+
+
+def _make_deep_tree(depth: int) -> Component:
+    """Returns the root of a chain of components, each with a child and a responder."""
+    app = ConsoleApp('Benchmark')
+    root = component = _Page(app=app)
+    for level in range(depth):
+        component.configure(responders=[component.configure_responder(lambda: None, args=[
+            PrimaryArg(name='level', accepts_value=False, markers=['-level{}'.format(level)])
+        ])])
+        component = component.use_component(_Page)
+    return root
+
+
+@scenario('component.active_responders.cold', depth=[10, 100])
+def active_responders_cold_setup(depth: int) -> Callable[[], Any]:
+    root = _make_deep_tree(depth)
+
+    def resolve():
+        root.app.notify_component_tree_changed()  # Force a full resolution every time.
+        return root.active_responders
+
+    return resolve
+
+
+@scenario('component.active_responders.cached', depth=[10, 100])
+def active_responders_cached_setup(depth: int) -> Callable[[], Any]:
+    root = _make_deep_tree(depth)
+    return lambda: root.active_responders
+
+
+@scenario('utils.get_n_best_matches', vocabulary=[1000, 10000])
+def get_n_best_matches_setup(vocabulary: int) -> Callable[[], Any]:
+    rng = random.Random(0)
+    words = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 12)))
+             for _ in range(vocabulary)]
+    return lambda: utils.get_n_best_matches(words, 'benchmark', 5)
+
+
+@scenario('fuzzy_index.best_matches', vocabulary=[1000, 10000, 100000])
+def fuzzy_index_best_matches_setup(vocabulary: int) -> Callable[[], Any]:
+    rng = random.Random(0)
+    index = fuzzy_index.FuzzyIndex(''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 12)))
+                                   for _ in range(vocabulary))
+    return lambda: index.best_matches('benchmark', 5)
+
+
+@scenario('styles.styled', plain=[False, True])
+def styles_styled_setup(plain: bool) -> Callable[[], Any]:
+    styles.set_plain(plain)
+    return lambda: styles.styled('Todo number 1', fore='red', weight='bright')
+
+
+def find(name_filter: Optional[str] = None) -> List[Scenario]:
+    """Returns the scenarios whose names contain the filter, or all scenarios if no filter is given."""
+    return [s for s in scenarios if name_filter is None or name_filter in s.name]
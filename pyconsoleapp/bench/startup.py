@@ -0,0 +1,107 @@
+"""Measures the cost of importing the package in a fresh interpreter, using python -X importtime, and lists the
+modules which take the longest to import. Also checks that the dependencies which are only needed by some apps
+are not imported up front.
+
+Run with:
+    python -m pyconsoleapp.bench.startup [--module pyconsoleapp] [--runs 10] [--json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, NamedTuple
+
+# Dependencies only some apps, or only some code paths, need, so importing the package shouldn't load them;
+LAZY_DEPENDENCIES = ('asyncio', 'readline', 'pyautogui', 'difflib', 'textwrap', 'colorama', 'concurrent.futures',
+                     'cProfile', 'pstats', 'inspect', 'shutil')
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def _run_python(args: List[str]) -> subprocess.CompletedProcess:
+    """Runs a fresh interpreter with the repo on its path."""
+    repo_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [repo_root, os.environ.get('PYTHONPATH')])))
+    return subprocess.run([sys.executable] + args, capture_output=True, text=True, env=env, check=True)
+
+
+def measure_import_times(module: str) -> List[ImportTime]:
+    """Returns the import time of every module imported by importing the module in a fresh interpreter."""
+    result = _run_python(['-X', 'importtime', '-c', 'import {module}'.format(module=module)])
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times.append(ImportTime(module=name.strip(), self_us=int(self_us), cumulative_us=int(cumulative_us)))
+    return times
+
+
+def measure_wall_time(module: str, runs: int) -> float:
+    """Returns the best wall clock time (seconds) to start an interpreter and import the module, less the time
+    to start an interpreter which imports nothing."""
+
+    def best_time(code: str) -> float:
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            _run_python(['-c', code])
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    return best_time('import {module}'.format(module=module)) - best_time('pass')
+
+
+def loaded_modules(module: str) -> List[str]:
+    """Returns the lazy dependencies which are loaded by importing the module."""
+    code = 'import sys, {module}; print(" ".join(sys.modules))'.format(module=module)
+    modules = set(_run_python(['-c', code]).stdout.split())
+    return [dependency for dependency in LAZY_DEPENDENCIES if dependency in modules]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m pyconsoleapp.bench.startup', description=__doc__.splitlines()[0])
+    parser.add_argument('--module', default='pyconsoleapp', help='Module to import.')
+    parser.add_argument('--runs', type=int, default=10, help='Number of runs to take the best time from.')
+    parser.add_argument('--top', type=int, default=10, help='Number of the slowest imports to list.')
+    parser.add_argument('--json', action='store_true', help='Write the results to stdout as JSON.')
+    args = parser.parse_args()
+
+    # Take each module's best time over the runs, as the first run may be paying to write bytecode caches;
+    best: Dict[str, ImportTime] = {}
+    for _ in range(args.runs):
+        for import_time in measure_import_times(args.module):
+            if import_time.module not in best or import_time.cumulative_us < best[import_time.module].cumulative_us:
+                best[import_time.module] = import_time
+    slowest = sorted(best.values(), key=lambda t: t.self_us, reverse=True)[:args.top]
+    report = {
+        'module': args.module,
+        'python': sys.version.split()[0],
+        'import_cumulative_us': best[args.module].cumulative_us,
+        'wall_time_s': measure_wall_time(args.module, args.runs),
+        'lazy_dependencies_loaded': loaded_modules(args.module),
+        'slowest_imports': [t._asdict() for t in slowest],
+    }
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+        return
+    print('import {module}: {cumulative:.1f}ms (importtime), {wall:.1f}ms (wall clock, less interpreter startup)'.format(
+        module=args.module, cumulative=report['import_cumulative_us'] / 1e3, wall=report['wall_time_s'] * 1e3))
+    print('Lazy dependencies loaded on import: {loaded}'.format(
+        loaded=', '.join(report['lazy_dependencies_loaded']) or 'none'))
+    print('Slowest imports (self time):')
+    for t in slowest:
+        print('  {module:<40} {self:8.1f}ms {cumulative:8.1f}ms cumulative'.format(
+            module=t.module, self=t.self_us / 1e3, cumulative=t.cumulative_us / 1e3))
+
+
+if __name__ == '__main__':
+    main()
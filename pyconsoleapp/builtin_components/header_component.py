@@ -5,6 +5,7 @@ from pyconsoleapp import Component, builtin_components
 
 class HeaderComponent(Component):
     """Page Header. Includes title bar, navigation bar and message bar."""
+    render_dependencies = ()
 
     _template = u'''{title_bar}
 {nav_bar}
@@ -19,10 +20,10 @@ class HeaderComponent(Component):
 
     def printer(self, **kwds) -> str:
         return self._template.format(
-            title_bar=self._title_bar.printer(),
-            nav_bar=self._nav_options.printer(),
+            title_bar=self._title_bar.render(),
+            nav_bar=self._nav_options.render(),
             single_hr=self.single_hr,
-            message_bar=self._message_bar.printer()
+            message_bar=self._message_bar.render()
         )
 
     def configure(self, go_back: Optional[Callable[[], None]] = None, **kwds):
@@ -2,27 +2,29 @@ from pyconsoleapp import Component, styles
 
 
 class MessageBarComponent(Component):
-    """Component to display the info and error messages stored on the component."""
+    """Component to display the info and error messages stored on the component, and the progress of any
+    background jobs."""
+    render_dependencies = ('messages', 'jobs')
     _main_template = '''{content}
 {hr}\n'''
     _info_template = '[i] Info: {message}'
     _error_template = '/!\\ Error: {message}'
+    _job_template = '[~] {description}: {progress}'
 
     def __init__(self, app):
         super().__init__(app)
 
     def printer(self, **kwds) -> str:
+        lines = []
         if self.app.error_message is not None:
             if self.app.error_message.replace(' ', '') == '':
                 self.app.error_message = "An error occurred."
-            return self._main_template.format(
-                content=styles.fore(self._error_template.format(message=self.app.error_message), 'red'),
-                hr=self.single_hr
-            )
+            lines.append(styles.fore(self._error_template.format(message=self.app.error_message), 'red'))
         elif self.app.info_message is not None and not self.app.info_message.replace(' ', '') == '':
-            return self._main_template.format(
-                content=styles.fore(self._info_template.format(message=self.app.info_message), 'blue'),
-                hr=self.single_hr
-            )
-        else:
+            lines.append(styles.fore(self._info_template.format(message=self.app.info_message), 'blue'))
+        for job in self.app.jobs.running_jobs:
+            lines.append(styles.fore(self._job_template.format(description=job.description,
+                                                               progress=job.progress_text), 'yellow'))
+        if len(lines) == 0:
             return ''
+        return self._main_template.format(content='\n'.join(lines), hr=self.single_hr)
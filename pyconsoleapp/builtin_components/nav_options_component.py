@@ -5,6 +5,7 @@ from pyconsoleapp import Component, PrimaryArg
 
 class NavOptionsComponent(Component):
     """Navigation bar. Includes quit and back options."""
+    render_dependencies = ()
     _template = u'''Navigate Back   \u2502 -back, -b
 Quit            \u2502 -quit, -q'''
 
@@ -29,11 +30,15 @@ Quit            \u2502 -quit, -q'''
         if self._on_back_ is not None:
             self._on_back_()
         else:
+            # Go up to the nearest route above this one, skipping any which only exist as part of a longer
+            # route, like todos.edit in todos.edit.<todo_id>;
             route_list = self.app.current_route.split('.')
-            if len(route_list) > 1:
+            while len(route_list) > 1:
                 route_list.pop(-1)
                 back_route = '.'.join(route_list)
-                self.app.go_to(back_route)
+                if self.app.has_route(back_route):
+                    self.app.go_to(back_route)
+                    return
 
     def _on_quit(self) -> None:
         self.app.quit()
@@ -14,6 +14,7 @@ _template_without_title = '''{header}
 
 class StandardPageComponent(Component):
     """Standard page, including header bar and input arrows >>>. Content is passed into print_view()"""
+    render_dependencies = ()
 
     def __init__(self, **kwds):
         super().__init__(**kwds)
@@ -25,13 +26,13 @@ class StandardPageComponent(Component):
         # Populate the correct template and return;
         if self._page_title:
             return _template_with_title.format(
-                header=self._header_component.printer(),
+                header=self._header_component.render(),
                 page_title=styles.weight(self._page_title, 'bright'),
                 page_title_underline=len(self._page_title) * '\u2500',
                 page_content=page_content)
         elif not self._page_title:
             return _template_without_title.format(
-                header=self._header_component.printer(),
+                header=self._header_component.render(),
                 page_content=page_content)
 
     def configure(self, page_title: Optional[str] = None,
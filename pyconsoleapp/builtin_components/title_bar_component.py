@@ -2,6 +2,7 @@ from pyconsoleapp import styles, Component
 
 
 class TitleBarComponent(Component):
+    render_dependencies = ('route',)
     _template = '''{app_name} | {route}'''
 
     def __init__(self, **kwds):
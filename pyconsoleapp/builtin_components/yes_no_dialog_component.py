@@ -4,6 +4,7 @@ from pyconsoleapp import Component, PrimaryArg
 
 
 class YesNoDialogComponent(Component, abc.ABC):
+    render_dependencies = ()
     _template = u'''{hr}
 {message}
 Yes \u2502 -y, -yes
@@ -1,7 +1,7 @@
 import abc
-from typing import List, Callable, Optional, Type, TypeVar, TYPE_CHECKING
+from typing import Any, Dict, Iterator, List, Callable, Optional, Set, Tuple, Type, TypeVar, TYPE_CHECKING
 
-from pyconsoleapp import exceptions, statemap, responder
+from pyconsoleapp import exceptions, statemap, responder, configs, styles
 
 if TYPE_CHECKING:
     from pyconsoleapp.statemap import Statemap
@@ -12,18 +12,118 @@ if TYPE_CHECKING:
 T = TypeVar('T')
 
 
+class _ActiveTable:
+    """The active components and responders resolved for one statemap-state combination."""
+    __slots__ = ('components', 'responders', 'argless_responders', 'markerless_arg_responders',
+                 'marker_arg_responders', 'marker_dispatch', 'undispatched')
+
+    def __init__(self, components: List['Component']):
+        self.components: List['Component'] = components
+        self.responders: List['Responder'] = []
+        self.argless_responders: List['Responder'] = []
+        self.markerless_arg_responders: List['Responder'] = []
+        self.marker_arg_responders: List['Responder'] = []
+        for component in components:
+            for local_responder in component.local_responders:
+                self.responders.append(local_responder)
+                if local_responder.is_argless:
+                    self.argless_responders.append(local_responder)
+                elif local_responder.has_markerless_arg:
+                    self.markerless_arg_responders.append(local_responder)
+                else:
+                    self.marker_arg_responders.append(local_responder)
+
+        # Compile the marker responders into a dispatch table, keyed on the markers of each responder's first
+        # primary arg. Any response matching a responder must contain one of them.
+        self.marker_dispatch: Dict[str, int] = {}
+        self.undispatched: List[int] = []  # Responders without primary args match every response.
+        _check_primary_marker_collisions(self.marker_arg_responders)
+        for position, marker_responder in enumerate(self.marker_arg_responders):
+            if len(marker_responder.primary_marker_sets) == 0:
+                self.undispatched.append(position)
+                continue
+            for marker in marker_responder.primary_marker_sets[0]:
+                self.marker_dispatch[marker] = position
+
+    def match_marker_responders(self, response: str) -> List['Responder']:
+        """Returns the marker responders matching the response, in the order they became active."""
+        words = set(response.split())
+        candidates = set(self.undispatched)
+        for marker in self.marker_dispatch.keys() & words:
+            candidates.add(self.marker_dispatch[marker])
+        matches = []
+        for position in sorted(candidates):
+            candidate = self.marker_arg_responders[position]
+            if candidate.check_words_match(words):
+                matches.append(candidate)
+        return matches
+
+
+def _check_primary_marker_collisions(responders: List['Responder']) -> None:
+    """Raises IdenticalPrimaryMarkersError if any primary marker is shared by more than one of the responders."""
+    marker_owners: Dict[str, 'Responder'] = {}
+    for r in responders:
+        for primary_markers in r.primary_marker_sets:
+            for marker in primary_markers:
+                if marker_owners.setdefault(marker, r) is not r:
+                    raise exceptions.IdenticalPrimaryMarkersError(
+                        'The primary marker {marker} is used by more than one responder.'.format(marker=marker))
+
+
+def _reachable_components(component: 'Component') -> Iterator['Component']:
+    """Yields the component, its siblings and their children, in every state, each once."""
+    seen: Set[int] = set()
+    to_visit = [component]
+    while to_visit:
+        for sibling in to_visit.pop()._statemap.values():
+            if id(sibling) not in seen:
+                seen.add(id(sibling))
+                yield sibling
+                to_visit.extend(sibling._child_components)
+
+
+def _can_be_active_together(path: Tuple['Component', ...], other_path: Tuple['Component', ...]) -> bool:
+    """Returns True/False to indicate if the components at the end of the paths, each leading down from the same
+    statemap, can be active at the same time. They can't if the paths first part in the same statemap, as each
+    path needs it in a different state."""
+    for component, other_component in zip(path, other_path):
+        if component is not other_component:
+            return component._statemap is not other_component._statemap
+    return True
+
+
 class Component(abc.ABC):
     """Base class for all application components."""
 
+    # Opts the component into render caching, by naming what its view depends on besides its children, its
+    # printer kwds and calls to invalidate(). Recognised dependencies are 'route' (the app's current route),
+    # 'messages' (the app's info and error messages), 'jobs' (the progress of the app's background jobs) and
+    # 'state' (the component's current state). None disables caching. Each class must declare its own, as a
+    # subclass's printer may depend on more than its base class's did, so it isn't inherited.
+    render_dependencies: Optional[Tuple[str, ...]] = None
+
+    def __init_subclass__(cls, **kwds):
+        super().__init_subclass__(**kwds)
+        if 'render_dependencies' not in cls.__dict__:
+            cls.render_dependencies = None
+
     def __init__(self, app: 'ConsoleApp', state_map: Optional['Statemap'] = None, **kwds):
         self._app = app
         if state_map is None:
-            state_map = statemap.Statemap({"main": self})
+            state_map = statemap.Statemap({"main": self}, on_state_change=app.notify_component_tree_changed)
         self._statemap: 'Statemap' = state_map
         self._child_components: List['Component'] = []
         self._local_responders: List['Responder'] = []  # 'local' indicates on *this* instance, not children.
         self._get_view_prefill: Optional[Callable[..., str]] = None
         self.loaded_once: bool = False  # Indicates first-time load status.
+        # Active components & responders, cached against the app's component tree version;
+        self._active_table: Optional[_ActiveTable] = None
+        self._active_table_version: Optional[int] = None
+        # The last rendered view, along with the render key it was rendered for;
+        self._render_cache: Optional[Tuple[Tuple[Any, ...], str]] = None
+        self._render_version: int = 0
+        self.render_cache_hits: int = 0
+        self.render_cache_misses: int = 0
 
     @property
     def app(self) -> 'ConsoleApp':
@@ -35,6 +135,58 @@ class Component(abc.ABC):
         """Abstract method responsible for rendering the component view into text."""
         raise NotImplementedError
 
+    def invalidate(self) -> None:
+        """Discards the component's cached view, so it is rendered afresh next time."""
+        self._render_version += 1
+
+    def _resolve_render_dependency(self, dependency: str) -> Any:
+        """Returns the current value of the named render dependency."""
+        if dependency == 'route':
+            return self.app.current_route
+        elif dependency == 'messages':
+            return self.app.error_message, self.app.info_message
+        elif dependency == 'jobs':
+            return tuple((job.id, job.progress_text) for job in self.app.jobs.running_jobs)
+        elif dependency == 'state':
+            return self.current_state
+        raise ValueError('{dependency} is not a recognised render dependency.'.format(dependency=dependency))
+
+    def _get_render_key(self, kwds: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+        """Returns a key which changes whenever anything the view depends on changes, or None if the view
+        can't be cached."""
+        if self.render_dependencies is None:
+            return None
+        key: List[Any] = [self._render_version, configs.terminal_width_chars, styles.is_plain(),
+                          tuple(sorted(kwds.items()))]
+        for dependency in self.render_dependencies:
+            key.append(self._resolve_render_dependency(dependency))
+        # The view also depends on each active child's view;
+        for child_component in self._child_components:
+            child_key = child_component.get_sibling()._get_render_key({})
+            if child_key is None:
+                return None
+            key.append(child_key)
+        return tuple(key)
+
+    def render(self, **kwds) -> str:
+        """Returns the component's view. If the component declares its render dependencies, the view is
+        reused until one of them changes, otherwise the printer is called every time."""
+        render_key = self._get_render_key(kwds)
+        if render_key is None:
+            return self.printer(**kwds)
+        if self._render_cache is not None and self._render_cache[0] == render_key:
+            self.render_cache_hits += 1
+            return self._render_cache[1]
+        self.render_cache_misses += 1
+        view = self.printer(**kwds)
+        self._render_cache = (render_key, view)
+        return view
+
+    @property
+    def render_cache_stats(self) -> Dict[str, int]:
+        """Returns the number of render cache hits and misses for this component."""
+        return {'hits': self.render_cache_hits, 'misses': self.render_cache_misses}
+
     @property
     def single_hr(self) -> str:
         """Returns a unicode single horizontal rule, as long as the terminal width set in configs."""
@@ -46,10 +198,12 @@ class Component(abc.ABC):
         return u'\u2501' * self.app.terminal_width
 
     def on_load(self) -> None:
-        """Method run immediately before the view is extracted from the component."""
+        """Method run immediately before the view is extracted from the component. May be overridden with an
+        async def method, which the app awaits."""
 
     def on_first_load(self) -> None:
-        """Method run the first time the component is used."""
+        """Method run the first time the component is used. May be overridden with an async def method, which
+        the app awaits."""
 
     def _validate(self) -> None:
         """Checks the component is valid. Raises an exception if not."""
@@ -67,6 +221,41 @@ class Component(abc.ABC):
                     markerless_found = True
                 elif markerless_found is True:
                     raise exceptions.DuplicateMarkerlessArgError
+        # Check no two local responders compete for the same primary marker;
+        _check_primary_marker_collisions(self._local_responders)
+
+    def check_marker_collisions(self) -> None:
+        """Raises IdenticalPrimaryMarkersError if two responders which can be active at the same time share a
+        primary marker, in any combination of states the component, its siblings and its children can be in.
+        Responders in different states of the same statemap are never active together, so they may share
+        markers. The tree is walked once, indexing each marker against the responders using it, so the cost
+        doesn't grow with the number of combinations of states."""
+        # Each responder, with the path of components leading down to it;
+        marker_owners: Dict[str, List[Tuple['Responder', Tuple['Component', ...]]]] = {}
+        to_visit: List[Tuple['Component', ...]] = [(sibling,) for sibling in dict.fromkeys(self._statemap.values())]
+        while to_visit:
+            path = to_visit.pop()
+            component = path[-1]
+            for r in component.local_responders:
+                if r.is_argless or r.has_markerless_arg:
+                    continue
+                for primary_markers in r.primary_marker_sets:
+                    for marker in primary_markers:
+                        for owner, owner_path in marker_owners.setdefault(marker, []):
+                            if owner is not r and _can_be_active_together(path, owner_path):
+                                raise exceptions.IdenticalPrimaryMarkersError(
+                                    'The primary marker {marker} is used by more than one responder.'.format(
+                                        marker=marker))
+                        marker_owners[marker].append((r, path))
+            for child_component in component._child_components:
+                to_visit.extend(path + (sibling,) for sibling in dict.fromkeys(child_component._statemap.values()))
+
+    def reachable_primary_markers(self) -> Set[str]:
+        """Returns the primary markers of every responder on the component, its siblings and their children,
+        whatever state they are in."""
+        return {marker for reachable_component in _reachable_components(self)
+                for local_responder in reachable_component.local_responders
+                for primary_markers in local_responder.primary_marker_sets for marker in primary_markers}
 
     @property
     def states(self) -> List[str]:
@@ -91,16 +280,23 @@ class Component(abc.ABC):
 
         return changer
 
+    @property
+    def _active(self) -> _ActiveTable:
+        """Returns the active components & responders for the current state combination, resolving them
+        only if a state, child or responder has changed since they were last resolved."""
+        version = self.app.component_tree_version
+        if self._active_table is None or self._active_table_version != version:
+            components = {self: None}  # Dict keys keep the order and dedupe in O(1).
+            for child_component in self._child_components:
+                components.update(dict.fromkeys(child_component.get_sibling().active_components))
+            self._active_table = _ActiveTable(list(components))
+            self._active_table_version = version
+        return self._active_table
+
     @property
     def active_components(self) -> List['Component']:
         """Returns the components associated with the siblings' current state."""
-        components = [self]
-        for child_component in self._child_components:
-            child_active_sibling = child_component.get_sibling()
-            for active_component in child_active_sibling.active_components:
-                if active_component not in components:
-                    components.append(active_component)
-        return components
+        return self._active.components
 
     def get_sibling(self, state: Optional[str] = None) -> 'Component':
         """Returns the sibling (maybe self) associated with the specified state. If no state is specified,
@@ -124,43 +320,32 @@ class Component(abc.ABC):
     @property
     def active_responders(self) -> List['Responder']:
         """Returns a list of active responders for this component and its children."""
-        active_responders = []
-        for active_component in self.active_components:
-            active_responders.extend(active_component.local_responders)
-        return active_responders
+        return self._active.responders
 
     @property
     def active_argless_responder(self) -> Optional['Responder']:
         """Returns the argless responder for this state combo, if exists, otherwise returns None."""
-        argless_responder = None
-        for active_responder in self.active_responders:
-            if active_responder.is_argless:
-                if argless_responder is None:
-                    argless_responder = active_responder
-                elif argless_responder is not None:
-                    raise exceptions.DuplicateArglessResponderError
-        return argless_responder
+        argless_responders = self._active.argless_responders
+        if len(argless_responders) > 1:
+            raise exceptions.DuplicateArglessResponderError
+        return argless_responders[0] if argless_responders else None
 
     @property
     def active_markerless_arg_responder(self) -> Optional['Responder']:
         """Returns the component's markerless arg responder, if exists, otherwise returns None."""
-        markerless_arg_responder = None
-        for active_responder in self.active_responders:
-            if active_responder.has_markerless_arg:
-                if markerless_arg_responder is None:
-                    markerless_arg_responder = active_responder
-                elif markerless_arg_responder is not None:
-                    raise exceptions.DuplicateMarkerlessArgError
-        return markerless_arg_responder
+        markerless_arg_responders = self._active.markerless_arg_responders
+        if len(markerless_arg_responders) > 1:
+            raise exceptions.DuplicateMarkerlessArgError
+        return markerless_arg_responders[0] if markerless_arg_responders else None
 
     @property
     def active_marker_arg_responders(self) -> List['Responder']:
         """Returns a list of the component's marker responders."""
-        mars = []
-        for active_responder in self.active_responders:
-            if not active_responder.has_markerless_arg and not active_responder.is_argless:
-                mars.append(active_responder)
-        return mars
+        return self._active.marker_arg_responders
+
+    def match_marker_responders(self, response: str) -> List['Responder']:
+        """Returns the active marker responders which match the response, using the compiled dispatch table."""
+        return self._active.match_marker_responders(response)
 
     def get_view_prefill(self) -> Optional[str]:
         """Returns the prefill for the component."""
@@ -174,6 +359,7 @@ class Component(abc.ABC):
         and returns it."""
         component = component_class(app=self.app, state_map=self._statemap)
         self._statemap[state] = component
+        self.app.notify_component_tree_changed()
         return component
 
     def use_component(self, component_class: Type[T]) -> T:
@@ -181,16 +367,22 @@ class Component(abc.ABC):
         component = component_class(app=self.app)
         self._child_components.append(component)
         list(set(self._child_components))  # Use set() to prevent duplication.
+        self.app.notify_component_tree_changed()
         return component
 
     def configure(self, responders: Optional[List['Responder']] = None,
                   get_prefill: Optional[Callable[[], str]] = None,
                   **kwds) -> None:
         """Implements post-initialistion configuration of the component."""
+        self.invalidate()  # Configuration may change the view.
         if responders is not None:
+            responders_added = False
             for r in responders:
                 if r not in self._local_responders:
                     self._local_responders.append(r)
+                    responders_added = True
+            if responders_added:
+                self.app.notify_component_tree_changed()
 
         if get_prefill is not None:
             self._get_view_prefill = get_prefill
@@ -1,3 +1,21 @@
 # Console App Configs
+from typing import Optional
+
 terminal_width_chars: int = 100
+terminal_height_lines: Optional[int] = None  # None uses the height of the terminal.
 route_history_length: int = 100
+# Builds each route's components as soon as the route is configured, so errors such as colliding markers are
+# raised at startup rather than when the route is first visited. Turn on while debugging, or call build_routes() in
+# the app's tests;
+validate_routes_on_configure: bool = False
+headless_when_not_tty: bool = True  # Run piped stdin as a script instead of drawing the interactive view.
+incremental_rendering: bool = True  # Redraw only the rows which changed since the last frame.
+# Seconds between redraws of the view while background jobs run and the prompt waits for a response, so their
+# progress and outcome show straight away. Needs incremental_rendering. None only redraws on the next frame;
+job_refresh_interval: Optional[float] = 0.25
+# Splits one response into a batch of commands, when each of them starts with a primary marker. None disables
+# batches;
+command_separator: Optional[str] = ';'
+instrumentation_enabled: bool = False  # Time each phase of the run loop, and accept the hidden :: commands.
+instrumentation_report_path: Optional[str] = 'pyconsoleapp_stats.txt'  # None writes the report to stderr.
+frame_profile_path: str = 'pyconsoleapp_frame.prof'  # Where ::profile saves the next frame's cProfile stats.
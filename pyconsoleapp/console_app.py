@@ -1,27 +1,29 @@
+import contextlib
+import itertools
 import os
-from typing import Dict, List, Optional, TYPE_CHECKING, Type, TypeVar
+import sys
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING, Type, TypeVar
 
-from pyconsoleapp import exceptions, configs, component
-
-if os.name == 'nt':
-    from pyautogui import write  # noqa
-else:
-    import readline  # noqa
+from pyconsoleapp import exceptions, configs, component, guard_trie, route_trie, terminal, jobs, instrumentation
 
 if TYPE_CHECKING:
     from pyconsoleapp import Component, GuardComponent
+    from pyconsoleapp.responder import Responder
 
 T = TypeVar('T')
 
 
 def _write_to_screen(view: str, prefill: Optional[str]):
-    """Adds the option of prefill to the normal input() function."""
+    """Adds the option of prefill to the normal input() function. The line editing modules are only imported
+    here, so apps which never prompt for input don't pay for them."""
     if prefill is None:
         prefill = ''
     if os.name == 'nt':
+        from pyautogui import write
         write(prefill)
         return input(view)
     else:
+        import readline  # Importing readline also gives input() line editing and history.
         readline.set_startup_hook(lambda: readline.insert_text(prefill))
         try:
             return input(view)
@@ -29,18 +31,131 @@ def _write_to_screen(view: str, prefill: Optional[str]):
             readline.set_startup_hook()
 
 
+def _is_awaitable(result: Any) -> bool:
+    """Returns True/False to indicate if the result is awaitable. Most responders return None, so inspect is only
+    imported once something else is returned."""
+    if result is None:
+        return False
+    import inspect
+    return inspect.isawaitable(result)
+
+
+def _complete(result: Any) -> Any:
+    """Runs the result to completion if it is awaitable, so async responders and hooks also work from the
+    synchronous run loop. Other results are returned as they are.
+
+    Raises:
+        RunningLoopError: To indicate the result is awaitable, but an event loop is already running on this
+            thread, so it can't be run to completion here. It should be awaited on the running loop instead, for
+            example by running the app with run_async().
+    """
+    if _is_awaitable(result):
+        import asyncio  # Only apps with async responders or hooks need the event loop.
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:  # No loop is running, so one can be run here.
+            pass
+        else:
+            if asyncio.iscoroutine(result):
+                result.close()  # It will never be awaited, so don't warn that it wasn't.
+            raise exceptions.RunningLoopError('{result!r} was reached from a synchronous call while an event loop '
+                                              'is running. Use run_async() to await it on the running '
+                                              'loop.'.format(result=result))
+
+        async def wait_for_result():
+            return await result
+
+        return asyncio.run(wait_for_result())
+    return result
+
+
+async def _complete_async(result: Any) -> Any:
+    """Awaits the result if it is awaitable, otherwise returns it as it is."""
+    if _is_awaitable(result):
+        return await result
+    return result
+
+
+class _Blocking:
+    """A blocking call yielded by the run loop's steps, such as waiting for the user's response. The
+    synchronous driver simply makes the call, while the async driver makes it on a worker thread. If the
+    steps want something done while the call is waiting, both drivers make the call on a worker thread and
+    call while_waiting on this one every configs.job_refresh_interval seconds until it returns."""
+    __slots__ = ('_func', '_args', 'while_waiting')
+
+    def __init__(self, func: Callable[..., Any], *args: Any, while_waiting: Optional[Callable[[], None]] = None):
+        self._func: Callable[..., Any] = func
+        self._args: Tuple[Any, ...] = args
+        self.while_waiting: Optional[Callable[[], None]] = while_waiting
+
+    def call(self) -> Any:
+        return self._func(*self._args)
+
+    def call_while_waiting(self) -> Any:
+        """Makes the call on a worker thread, calling while_waiting on this one until it returns. The thread
+        is a daemon, so an interrupted app can still exit while the call is blocked."""
+        import threading
+        from concurrent import futures
+        future = futures.Future()
+
+        def call():
+            try:
+                future.set_result(self.call())
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=call, name='pyconsoleapp-blocking', daemon=True).start()
+        while True:
+            try:
+                return future.result(timeout=configs.job_refresh_interval)
+            except futures.TimeoutError:
+                self.while_waiting()
+
+
+class _HookResult:
+    """The result of a frame hook, yielded by the run loop's steps. The async driver awaits it if it is
+    awaitable, while the synchronous driver rejects awaitable results; running each on a new event loop would
+    break hooks holding anything bound to a loop, such as an async database connection."""
+    __slots__ = ('hook', 'result')
+
+    def __init__(self, hook: Callable[[], Any], result: Any):
+        self.hook: Callable[[], Any] = hook
+        self.result: Any = result
+
+
 class ConsoleApp:
     def __init__(self, name):
         self._name: str = name
         self._response: Optional[str] = None
         self._current_route: Optional[str] = None
+        self._current_route_pattern: Optional[str] = None
+        self._route_params: Dict[str, str] = {}
         self._route_history: List[str] = []
+        # Each route pattern's factory, and the component it built, once the route is first needed. Routes with
+        # parameters, like todos.edit.<todo_id>, share one component however many concrete routes are visited;
+        self._route_factories: Dict[str, Callable[..., 'Component']] = {}
         self._route_component_map: Dict[str, 'Component'] = {}
-        self._initialising: bool = False
-        self._route_exit_guard_map: Dict[str, 'GuardComponent'] = {}
-        self._route_entrance_guard_map: Dict[str, 'GuardComponent'] = {}
+        self._route_trie: route_trie.RouteTrie = route_trie.RouteTrie()
+        self._routes_being_built: List[str] = []
+        self._guard_trie: guard_trie.GuardTrie = guard_trie.GuardTrie()
+        # The primary markers of the built routes and the guards, cached against what they were collected from;
+        self._known_markers_cache: Optional[Tuple[Tuple[int, int, int], Set[str]]] = None
+        # The resolved guard, cached against the route and guard trie version it was resolved for;
+        self._active_guard_cache: Optional[Tuple[Tuple[str, int], Optional['GuardComponent']]] = None
         self._finished_processing_response: bool = False
         self._quit: bool = False
+        self._component_tree_version: int = 0
+        self._terminal: terminal.TerminalWriter = terminal.TerminalWriter()
+        self._renderer: terminal.IncrementalRenderer = terminal.IncrementalRenderer(self._terminal)
+        self._jobs: jobs.JobManager = jobs.JobManager(self)
+        self._instrumentation: instrumentation.Instrumentation = instrumentation.Instrumentation(
+            enabled=configs.instrumentation_enabled)
+        self._hidden_commands: Dict[str, Callable[[], None]] = {
+            '::stats': self.dump_instrumentation,
+            '::reset-stats': self._instrumentation.reset,
+            '::profile': self._profile_next_frame,
+        }
+        self._frame_hooks: List[Callable[[], Any]] = []
         self.error_message: Optional[str] = None
         self.info_message: Optional[str] = None
 
@@ -59,21 +174,98 @@ class ConsoleApp:
     @current_route.setter
     def current_route(self, route: str) -> None:
         """Sets the current application route."""
-        if route in self._route_component_map.keys():
-            self._current_route = route
-        else:
+        try:
+            pattern, params = self._resolve_route(route)
+        except exceptions.InvalidRouteError:
             raise KeyError('The route {} was not recognised.'.format(route))
+        self._current_route, self._current_route_pattern, self._route_params = route, pattern, params
+
+    @property
+    def current_route_pattern(self) -> str:
+        """Gets the pattern the current route matched, e.g. todos.edit.<todo_id> for todos.edit.42."""
+        if self._current_route_pattern is None:
+            raise exceptions.NoCurrentRouteError
+        return self._current_route_pattern
+
+    @property
+    def route_params(self) -> Dict[str, str]:
+        """Gets the values of the current route's parameters, keyed on the parameter names."""
+        return self._route_params
+
+    @property
+    def component_tree_version(self) -> int:
+        """Returns a counter which changes whenever any component's state, children or responders change."""
+        return self._component_tree_version
+
+    def notify_component_tree_changed(self) -> None:
+        """Invalidates any active component/responder resolution cached on the app's components."""
+        self._component_tree_version += 1
+
+    def _resolve_route(self, route: str) -> Tuple[str, Dict[str, str]]:
+        """Returns the pattern the route was configured under, and the values of the pattern's parameters.
+
+        Raises:
+            InvalidRouteError: To indicate the route does not match any configured route.
+        """
+        if route in self._route_factories:
+            return route, {}
+        match = self._route_trie.match(route)
+        if match is None:
+            raise exceptions.InvalidRouteError('The route {} was not recognised.'.format(route))
+        return match
 
     def _validate_route(self, route: str):
         """Raises an exception if the route is not in the set of known routes."""
-        if route not in self._route_component_map:
-            raise exceptions.InvalidRouteError
+        self._resolve_route(route)
+
+    def has_route(self, route: str) -> bool:
+        """Returns True/False to indicate if the route matches a configured route."""
+        try:
+            self._resolve_route(route)
+        except exceptions.InvalidRouteError:
+            return False
+        return True
+
+    def _get_route_component(self, route: str) -> 'Component':
+        """Returns the component registered to the route, or the pattern it matches, building it the first
+        time it is needed.
+
+        Raises:
+            PartiallyInitialisedError: To indicate the route is still being built, because building it led
+                back to itself, for example from a component's __init__.
+        """
+        route, _ = self._resolve_route(route)
+        route_component = self._route_component_map.get(route)
+        if route_component is not None:
+            return route_component
+        if route in self._routes_being_built:
+            raise exceptions.PartiallyInitialisedError('Route {route} was requested while it was being built, '
+                                                       'via: {cycle}.'.format(route=route, cycle=' -> '.join(
+                                                        self._routes_being_built[
+                                                            self._routes_being_built.index(route):] + [route])))
+        self._routes_being_built.append(route)
+        try:
+            route_component = self._route_factories[route](app=self)
+        finally:
+            self._routes_being_built.pop()
+        # Check every combination of states the route can reach, so marker collisions surface when it is built,
+        # rather than when the user first reaches the colliding states;
+        route_component.check_marker_collisions()
+        self._route_component_map[route] = route_component
+        return route_component
+
+    def build_routes(self, routes: Optional[Iterable[str]] = None) -> None:
+        """Builds the components for the specified routes, or every route, ahead of them being needed. Useful
+        to check an app's components can all be built, without navigating to each of them."""
+        for route in routes if routes is not None else list(self._route_factories):
+            self._get_route_component(route)
 
     def _historise_route(self, route: str) -> None:
-        """Adds the route to the route history stack, if it is not already the same as the last item."""
+        """Adds the route to the route history stack, if it is not already the same as the last item. Routes
+        are stored as they were visited, so a route's parameters are remembered along with it."""
         # Save the current route to the history;
         self._validate_route(route)
-        if len(self._route_history) > 0 and not self._route_history[-1] == route:
+        if len(self._route_history) == 0 or not self._route_history[-1] == route:
             self._route_history.append(route)
         # Make sure the history doesn't get too long;
         while len(self._route_history) > configs.route_history_length:
@@ -84,14 +276,11 @@ class ConsoleApp:
         specified, the component corresponding to the route's current state is returned.
 
         Raises:
-            PartiallyInitialisedError: To indicate the application is still initialising components,
-                so we can't start retrieving them yet.
+            PartiallyInitialisedError: To indicate the route's component is still being built, so it can't
+                be retrieved yet.
         """
-        if self._initialising is True:
-            raise exceptions.PartiallyInitialisedError
-        self._validate_route(route)  # Check the route is recognised;
-        # Grab the component registered the route;
-        comp = self._route_component_map[route].get_sibling(state)
+        # Grab the component registered the route, building it if this is the first time it is needed;
+        comp = self._get_route_component(route).get_sibling(state)
         assert isinstance(comp, component_class)
         return comp
 
@@ -101,99 +290,90 @@ class ConsoleApp:
         active_guard = self._get_active_guard()
         if active_guard is not None:
             return active_guard
-        return self.get_component(component.Component, self.current_route)
+        if self._current_route_pattern is None:
+            raise exceptions.NoCurrentRouteError
+        return self._get_route_component(self._current_route_pattern).get_sibling(None)
 
     def _get_active_guard(self) -> Optional['GuardComponent']:
         """Returns the active guard if exists, otherwise returns None."""
-        guard: Optional['GuardComponent'] = None
-        # First check the exit guards;
-        for guarded_route in self._route_exit_guard_map.keys():
-            # If the guarded root does not feature in the submitted route;
-            if guarded_route not in self.current_route:
-                # The submitted route must have exited, so populate the component;
-                guard = self._route_exit_guard_map[guarded_route]
-                break
-        # Now check the entrance guards;
-        for guarded_route in self._route_entrance_guard_map.keys():
-            # If the guarded root is part of the submitted route;
-            if guarded_route in self.current_route:
-                # Then the submitted route must be beyond the guard, so populate the
-                # component;
-                guard = self._route_entrance_guard_map[guarded_route]
-        # Return the guard if it is populated & activated.
-        if guard is not None and guard.activated:
-            return guard
-        else:
-            return None
+        cache_key = (self.current_route, self._guard_trie.version)
+        if self._active_guard_cache is None or self._active_guard_cache[0] != cache_key:
+            with self._instrumentation.phase('guard_resolution', route=self._route_tag):
+                guard = self._guard_trie.resolve(self.current_route)
+            # Only keep the guard if it is activated.
+            if guard is not None and not guard.activated:
+                guard = None
+            self._active_guard_cache = (cache_key, guard)
+        return self._active_guard_cache[1]
+
+    def refresh_guards(self) -> None:
+        """Discards the cached guard activation, for when a guard's activation condition may have changed
+        without the route or the registered guards changing."""
+        self._active_guard_cache = None
 
     def guard_entrance(self, route_to_stay_outside: str, guard_class: Type[T]) -> T:
         """Instantiates the guard, assigns it to guard entrance of the specified route, and returns it."""
         self._validate_route(route_to_stay_outside)
         guard = guard_class(app=self)  # type: GuardComponent
-        self._route_entrance_guard_map[route_to_stay_outside] = guard
+        self._guard_trie.set_entrance_guard(route_to_stay_outside, guard)
         return guard
 
     def guard_exit(self, route_to_stay_within: str, guard_class: Type[T]) -> T:
         """Instantiates the guard, assigns it to guard exit of the specified route, and returns it."""
         self._validate_route(route_to_stay_within)
         guard = guard_class(app=self)  # type: GuardComponent
-        self._route_exit_guard_map[route_to_stay_within] = guard
+        self._guard_trie.set_exit_guard(route_to_stay_within, guard)
         return guard
 
     def clear_entrance(self, route: str) -> None:
         """Clears any guard from the entrance of the specified route."""
         self._validate_route(route)
-        if route in self._route_entrance_guard_map.keys():
-            del self._route_entrance_guard_map[route]
+        self._guard_trie.clear_entrance_guard(route)
 
     def clear_exit(self, route: str) -> None:
         """Clears any guard from the exit of the specified route."""
         self._validate_route(route)
-        if route in self._route_exit_guard_map.keys():
-            del self._route_exit_guard_map[route]
+        self._guard_trie.clear_exit_guard(route)
 
     def clear_guard(self, guard_instance: 'GuardComponent') -> None:
         """Removes the guard from the entrance/exit route-guard maps."""
-        self._route_exit_guard_map = {k: v for k, v in self._route_exit_guard_map.items() if not v == guard_instance}
-        self._route_entrance_guard_map = {k: v for k, v in self._route_entrance_guard_map.items() if
-                                          not v == guard_instance}
+        self._guard_trie.remove_guard(guard_instance)
 
-    def _process_response(self, response: str) -> None:
-        """Processes the response provided.
+    def _matching_responders(self, response: str) -> Iterator[Tuple['Responder', Optional[str]]]:
+        """Yields each responder which should be given the response, with the response to give it, in the order
+        they should be tried. Responders are only looked up as they are needed."""
+        current_component = self._get_active_component()
+        # If the response is empty, give each active component a chance to respond;
+        if response.replace(' ', '') == '':
+            argless_responder = current_component.active_argless_responder
+            if argless_responder:
+                yield argless_responder, None
+
+        # Otherwise, give any marker-only responders a chance;
+        else:
+            for responder in current_component.match_marker_responders(response):
+                yield responder, response
+
+        # Finally give each active component a chance to field a
+        # markerless responder;
+        markerless_responder = current_component.active_markerless_arg_responder
+        if markerless_responder:
+            yield markerless_responder, response
+
+    def _process_command_steps(self, response: str) -> Iterator[Any]:
+        """Steps through processing a single command from the response.
         - If the response is empty, the active cli are searched for an empty responder, which, if found, is
         called with no arguments.
         - If the response is not empty the active cli are searched for a matching marker-responder, which
         if found, is called with the response as an argument.
         - If no marker responders are found, the active cli are searched for a markerless responder, which if
-        found, is called with the response as an argument."""
+        found, is called with the response as an argument.
+        Async responders are run to completion before the next responder is tried."""
         responder_was_found = False
-        current_component = self._get_active_component()
         try:
-            # If the response is empty, give each active component a chance to respond;
-            if response.replace(' ', '') == '':
-                argless_responder = current_component.active_argless_responder
-                if argless_responder:
-                    argless_responder.respond()
-                    responder_was_found = True
-                    if self._finished_processing_response:
-                        return
-
-            # Otherwise, give any marker-only responders a chance;
-            else:
-                responders = current_component.active_marker_arg_responders
-                if len(responders):
-                    for responder in responders:
-                        if responder.check_marker_match(response):
-                            responder.respond(response)
-                            responder_was_found = True
-                            if self._finished_processing_response:
-                                return
-
-            # Finally give each active component a chance to field a
-            # markerless responder;
-            markerless_responder = current_component.active_markerless_arg_responder
-            if markerless_responder:
-                markerless_responder.respond(response)
+            for responder, responder_response in self._matching_responders(response):
+                with self._instrumentation.phase('responder', route=self._route_tag, responder=responder.func_name):
+                    yield responder.respond(responder_response)
                 responder_was_found = True
                 if self._finished_processing_response:
                     return
@@ -207,6 +387,83 @@ class ConsoleApp:
                 self.error_message = e.reason
             return
 
+    def _known_primary_markers(self) -> Set[str]:
+        """Returns the primary markers of every responder in the routes built so far, and in the guards,
+        whatever state they are in."""
+        cache_key = (self._component_tree_version, len(self._route_component_map), self._guard_trie.version)
+        if self._known_markers_cache is None or self._known_markers_cache[0] != cache_key:
+            markers: Set[str] = set()
+            for known_component in itertools.chain(self._route_component_map.values(), self._guard_trie.guards):
+                markers.update(known_component.reachable_primary_markers())
+            self._known_markers_cache = (cache_key, markers)
+        return self._known_markers_cache[1]
+
+    def _split_commands(self, response: str) -> List[str]:
+        """Splits the response into its separate commands. The response is only split if each command starts
+        with a primary marker, so text which just happens to contain the separator, such as the text of a
+        todo_, is kept whole. A response without a separator is one command."""
+        if configs.command_separator is None or configs.command_separator not in response:
+            return [response]
+        commands = [command.strip() for command in response.split(configs.command_separator)]
+        commands = [command for command in commands if command != '']
+        if not commands:
+            return ['']
+        known_markers = self._known_primary_markers()
+        if any(command.split(maxsplit=1)[0] not in known_markers for command in commands):
+            return [response]
+        return commands
+
+    @staticmethod
+    def _describe_command_error(command_num: int, command: str, message: str) -> str:
+        """Returns the error message for a single command within a batch."""
+        return '[{num}] {command}: {message}'.format(num=command_num, command=command, message=message)
+
+    def _run_hidden_command(self, response: str) -> bool:
+        """Runs the response if it is one of the hidden instrumentation commands, which are only recognised
+        while instrumentation is enabled. Returns True/False to indicate if it was."""
+        if not self._instrumentation.enabled:
+            return False
+        command = self._hidden_commands.get(response.strip())
+        if command is None:
+            return False
+        command()
+        return True
+
+    def _process_response(self, response: str) -> None:
+        """Processes the response, running each of its commands in turn. The active component is not reloaded
+        between commands unless a command changes which component is active, and any errors are reported
+        together, against the commands which raised them."""
+        self._drive(self._process_response_steps(response))
+
+    def _process_response_steps(self, response: str) -> Iterator[Any]:
+        """Steps through processing the response."""
+        if self._run_hidden_command(response):
+            return
+        with self._instrumentation.phase('process_response', route=self._route_tag):
+            yield from self._process_commands_steps(self._split_commands(response))
+
+    def _process_commands_steps(self, commands: List[str]) -> Iterator[Any]:
+        """Steps through processing the commands split from a response."""
+        if len(commands) == 1:
+            yield from self._process_command_steps(commands[0])
+            return
+        errors = []
+        active_component = self._get_active_component()
+        for command_num, command in enumerate(commands, start=1):
+            if self._quit:
+                break
+            self.error_message = None
+            if self._get_active_component() is not active_component:
+                active_component = yield from self._load_steps()
+                if self.error_message is not None:  # Posted by a background job, rather than by the command;
+                    errors.append(self.error_message)
+                    self.error_message = None
+            self._finished_processing_response = False
+            yield from self._process_command_steps(command)
+            if self.error_message is not None:
+                errors.append(self._describe_command_error(command_num, command, self.error_message))
+        self.error_message = ' '.join(errors) if errors else None
+
     def _clear_response(self):
         """Resets the response fields, ready for the next response collection cycle."""
         self._response = None
@@ -220,34 +477,312 @@ class ConsoleApp:
         """Instructs the application to stop searching for responders."""
         self._finished_processing_response = True
 
+    def _load_active_component(self) -> 'Component':
+        """Runs the load methods on the active component and returns it. If loading changes which component
+        is active, the newly active component is loaded instead."""
+        return self._drive(self._load_steps())
+
+    def _load_steps(self) -> Iterator[Any]:
+        """Steps through loading the active component, returning it."""
+        self._jobs.process_pending()  # Apply anything background jobs have posted since the last frame.
+        while True:
+            active_component = self._get_active_component()
+            tags = self._component_tags(active_component)
+            if not active_component.loaded_once:
+                with self._instrumentation.phase('on_first_load', **tags):
+                    yield active_component.on_first_load()
+                active_component.loaded_once = True
+            with self._instrumentation.phase('on_load', **tags):
+                yield active_component.on_load()
+            # Check the component is still the right one after the load method ran.
+            if active_component == self._get_active_component():
+                return active_component
+
+    @staticmethod
+    def _drive(steps: Iterator[Any]) -> Any:
+        """Runs the steps to the end, returning their result. Each awaitable they yield is run to completion,
+        and each blocking call is made, with the outcome sent back into the steps.
+
+        Raises:
+            AsyncFrameHookError: To indicate a frame hook returned an awaitable. Apps with async frame hooks
+                must be run with run_async().
+        """
+        value, error = None, None
+        while True:
+            try:
+                step = steps.throw(error) if error is not None else steps.send(value)
+            except StopIteration as stop:
+                return stop.value
+            try:
+                if isinstance(step, _Blocking):
+                    value = step.call() if step.while_waiting is None else step.call_while_waiting()
+                elif isinstance(step, _HookResult):
+                    value = step.result
+                    if _is_awaitable(value):
+                        if hasattr(value, 'close'):
+                            value.close()  # It will never be awaited, so don't warn that it wasn't.
+                        raise exceptions.AsyncFrameHookError(
+                            'The frame hook {hook!r} returned an awaitable. Use run_async() to run apps with '
+                            'async frame hooks.'.format(hook=step.hook))
+                else:
+                    value = _complete(step)
+                error = None
+            except BaseException as e:  # Raised within the steps, so they can handle it, or clean up.
+                value, error = None, e
+
+    @staticmethod
+    async def _drive_async(steps: Iterator[Any]) -> Any:
+        """Runs the steps to the end as _drive does, but awaits the awaitables they yield on the running loop,
+        and makes blocking calls on a worker thread, so other tasks on the loop carry on meanwhile."""
+        import asyncio
+        loop = asyncio.get_running_loop()
+        value, error = None, None
+        while True:
+            try:
+                step = steps.throw(error) if error is not None else steps.send(value)
+            except StopIteration as stop:
+                return stop.value
+            try:
+                if isinstance(step, _Blocking):
+                    future = loop.run_in_executor(None, step.call)
+                    if step.while_waiting is not None:
+                        while not (await asyncio.wait({future}, timeout=configs.job_refresh_interval))[0]:
+                            step.while_waiting()
+                    value = await future
+                elif isinstance(step, _HookResult):
+                    value = await _complete_async(step.result)
+                else:
+                    value = await _complete_async(step)
+                error = None
+            except BaseException as e:  # Raised within the steps, so they can handle it, or clean up.
+                value, error = None, e
+
     def run(self) -> None:
-        """Main run loop for the CLI."""
-        while not self._quit:
-            # If response has been collected;
-            if self._response is not None:
-                # Reset the error and info messages;
-                self.error_message = None
-                self.info_message = None
-                # Do the processing;
-                self._process_response(self._response)
-                self._clear_response()
-
-            # The response has not been collected, draw the view and collect it;
+        """Main run loop for the CLI. Piped input is run as a script, rather than drawing a view for every
+        line."""
+        self._drive(self._run_steps())
+
+    async def run_async(self) -> None:
+        """Asyncio equivalent of run(), for apps whose responders, load methods or frame hooks are async def
+        functions. These are awaited on the running loop, while sync ones are called as normal. The response is
+        read on a worker thread, so other tasks on the loop carry on while the app waits for the user."""
+        await self._drive_async(self._run_steps())
+
+    def _run_steps(self) -> Iterator[Any]:
+        """Steps through the run loop, shared by run() and run_async()."""
+        if configs.headless_when_not_tty and not sys.stdin.isatty():
+            yield from self._script_steps(sys.stdin, render_each_response=False, render_at_end=True)
+            return
+        with self._watching_stdout():
+            while not self._quit:
+                # If response has been collected;
+                if self._response is not None:
+                    self._start_frame()
+                    # Do the processing;
+                    yield from self._process_response_steps(self._response)
+                    self._clear_response()
+
+                # The response has not been collected, draw the view and collect it;
+                else:
+                    active_component = yield from self._load_steps()
+                    self._historise_route(self.current_route)
+                    # Draw the view, which ends the frame;
+                    prompt = self._draw_view(self._render_component(active_component))
+                    yield from self._end_frame_steps()
+                    self._response = yield _Blocking(self._collect_response, prompt,
+                                                     active_component.get_view_prefill(),
+                                                     while_waiting=self._get_refresh_while_waiting())
+        self._jobs.shutdown()
+        yield from self._run_frame_hooks_steps()
+        self._dump_instrumentation_on_quit()
+
+    def _start_frame(self) -> None:
+        """Marks the start of a frame, once its response has been collected, resetting the messages."""
+        self._instrumentation.start_frame()
+        self.error_message = None
+        self.info_message = None
+
+    @contextlib.contextmanager
+    def _watching_stdout(self) -> Iterator[None]:
+        """Watches stdout while the interactive view is drawn, so the renderer knows to repaint the whole
+        screen after anything else, such as a responder calling print(), writes to it."""
+        if not configs.incremental_rendering or self._terminal.is_plain:
+            yield
+            return
+        stdout = sys.stdout
+        sys.stdout = self._renderer.watcher = terminal.StreamWatcher(stdout)
+        try:
+            yield
+        finally:
+            sys.stdout = stdout
+            self._renderer.watcher = None
+
+    def _collect_response(self, prompt: str, prefill: Optional[str]) -> str:
+        """Collects the response at the prompt, drawn on the row below the frame. Writes made by the prompt
+        itself aren't counted as writes from elsewhere."""
+        watcher = self._renderer.watcher
+        if watcher is not None:
+            watcher.ignoring = True
+        try:
+            response = _write_to_screen(view=prompt, prefill=prefill)
+        finally:
+            if watcher is not None:
+                watcher.ignoring = False
+        self._renderer.note_response(prompt, response)
+        return response
+
+    def _get_refresh_while_waiting(self) -> Optional[Callable[[], None]]:
+        """Returns the callable which redraws the view while the prompt waits, if background jobs are running
+        and the view can be redrawn in place, or else None, so the response is read on this thread as usual."""
+        if not self._jobs.running_jobs or configs.job_refresh_interval is None or \
+                not configs.incremental_rendering or self._terminal.is_plain:
+            return None
+        return self._refresh_while_waiting
+
+    def _refresh_while_waiting(self) -> None:
+        """Applies anything background jobs have posted and redraws the rows of the view which changed, leaving
+        the prompt, and the response being typed at it, alone. The active component is rendered again without
+        being loaded, as its load methods run once per frame."""
+        self._jobs.process_pending()
+        view = self._render_component(self._get_active_component())
+        body, newline, _ = view.rpartition('\n')
+        with self._instrumentation.phase('draw', route=self._route_tag):
+            self._renderer.refresh(body + newline)
+
+    def _draw_view(self, view: str) -> str:
+        """Draws all but the last line of the view, which is returned to be used as the prompt."""
+        body, newline, prompt = view.rpartition('\n')
+        with self._instrumentation.phase('draw', route=self._route_tag):
+            if configs.incremental_rendering:
+                self._renderer.render(body + newline)
             else:
-                active_component = self._get_active_component()
-                if not active_component.loaded_once:
-                    active_component.on_first_load()
-                    active_component.loaded_once = True
-                active_component.on_load()
-                # Check the component is still the right one after the load method ran.
-                if not active_component == self._get_active_component():
-                    continue
-                #
-                self._historise_route(self.current_route)
-                # Draw the view;
-                self.clear_console()
-                self._response = _write_to_screen(view=active_component.printer(),
-                                                  prefill=active_component.get_view_prefill())
+                self._terminal.write_frame(body + newline)
+        return prompt
+
+    def _render_component(self, active_component: 'Component') -> str:
+        """Returns the component's view, timing the render."""
+        with self._instrumentation.phase('render', **self._component_tags(active_component)):
+            return active_component.render()
+
+    def run_script(self, responses: Iterable[str], render_each_response: bool = False,
+                   render_at_end: bool = True) -> None:
+        """Runs each response in turn without drawing the view between them, as if it had been typed at the
+        prompt. Any error message a response produces is written to stderr with its line number.
+
+        Args:
+            responses: The responses to run, for example the lines of a file or sys.stdin.
+            render_each_response: Render the view before each response is run.
+            render_at_end: Render the view once all of the responses have run.
+        """
+        self._drive(self._script_steps(responses, render_each_response, render_at_end))
+
+    def _script_steps(self, responses: Iterable[str], render_each_response: bool,
+                      render_at_end: bool) -> Iterator[Any]:
+        """Steps through running a script, shared by run_script(), and run() and run_async() with piped
+        input. Each response is read as a blocking call, so run_async() reads them on a worker thread."""
+        responses = iter(responses)
+        for line_num in itertools.count(1):
+            if self._quit:
+                break
+            response = yield _Blocking(next, responses, None)
+            if response is None:
+                break
+            self._instrumentation.start_frame()
+            active_component = yield from self._load_steps()
+            self._historise_route(self.current_route)
+            if render_each_response:
+                self._write_view(active_component)
+            self.error_message = None
+            self.info_message = None
+            yield from self._process_response_steps(response.rstrip('\r\n'))
+            self._clear_response()
+            yield from self._end_frame_steps()
+            if self.error_message is not None:
+                sys.stderr.write('Line {line_num}: {message}\n'.format(line_num=line_num, message=self.error_message))
+        # Let any background jobs the script started finish, so their outcome is reported;
+        self._jobs.wait_for_all()
+        if render_at_end and not self._quit:
+            self._write_view((yield from self._load_steps()))
+        yield from self._run_frame_hooks_steps()
+        self._dump_instrumentation_on_quit()
+
+    def render_frame(self) -> None:
+        """Loads the active component and writes its view to stdout, without clearing the console."""
+        self._write_view(self._load_active_component())
+
+    def _write_view(self, active_component: 'Component') -> None:
+        """Writes the component's view to stdout."""
+        sys.stdout.write(self._render_component(active_component) + '\n')
+        sys.stdout.flush()
+
+    @property
+    def jobs(self) -> 'jobs.JobManager':
+        """Returns the manager for the app's background jobs."""
+        return self._jobs
+
+    def submit_job(self, func: Callable[..., Any], *args, description: str, **kwargs) -> 'jobs.Job':
+        """Submits the callable to run in the background, returning control to the UI immediately. The
+        job's progress is shown in the message bar until it finishes. See JobManager.submit for options."""
+        return self._jobs.submit(func, *args, description=description, **kwargs)
+
+    @property
+    def instrumentation(self) -> 'instrumentation.Instrumentation':
+        """Returns the run loop instrumentation, for enabling it, adding hooks or reading its stats."""
+        return self._instrumentation
+
+    @property
+    def _route_tag(self) -> str:
+        """Returns the current route, or an empty string before a route is set, to tag timings with."""
+        return self._current_route_pattern if self._current_route_pattern is not None else ''
+
+    def _component_tags(self, active_component: 'Component') -> Dict[str, str]:
+        """Returns the tags to time the component's phases with."""
+        return {'route': self._route_tag, 'component': type(active_component).__name__}
+
+    def dump_instrumentation(self) -> None:
+        """Writes the instrumentation report to the path set in configs, or to stderr if no path is set."""
+        report = self._instrumentation.report()
+        if configs.instrumentation_report_path is None:
+            sys.stderr.write(report)
+            return
+        with open(configs.instrumentation_report_path, 'w') as f:
+            f.write(report)
+        self.info_message = 'Run loop stats written to {path}.'.format(path=configs.instrumentation_report_path)
+
+    def _dump_instrumentation_on_quit(self) -> None:
+        """Writes the instrumentation report when the app finishes, if instrumentation is enabled."""
+        if self._instrumentation.enabled:
+            self.dump_instrumentation()
+
+    def _profile_next_frame(self) -> None:
+        """Arranges for the next frame to be profiled, and its stats saved to the path set in configs."""
+        self._instrumentation.profile_next_frame()
+        self.info_message = 'The next frame will be profiled to {path}.'.format(path=configs.frame_profile_path)
+
+    def register_frame_hook(self, hook: Callable[[], Any]) -> None:
+        """Registers a function to be called at the end of every frame, once the frame's responses have been
+        processed, and once more when the app finishes. Useful to commit the changes a frame made in one go,
+        rather than as each change is made. Hooks may be async def functions if the app is run with
+        run_async(); run() and run_script() raise AsyncFrameHookError for them."""
+        self._frame_hooks.append(hook)
+
+    def unregister_frame_hook(self, hook: Callable[[], Any]) -> None:
+        """Removes a hook added with register_frame_hook."""
+        self._frame_hooks.remove(hook)
+
+    def _run_frame_hooks_steps(self) -> Iterator[Any]:
+        """Steps through calling each frame hook."""
+        for hook in self._frame_hooks:
+            with self._instrumentation.phase('frame_hook', hook=getattr(hook, '__qualname__', repr(hook))):
+                yield _HookResult(hook, hook())
+
+    def _end_frame_steps(self) -> Iterator[Any]:
+        """Steps through the end of a frame, running the frame hooks, and saving the frame's profile if it
+        was profiled."""
+        yield from self._run_frame_hooks_steps()
+        profile = self._instrumentation.end_frame()
+        if profile is not None:
+            profile.dump_stats(configs.frame_profile_path)
 
     def go_to(self, route: str) -> None:
         """Navigates the application the specified route."""
@@ -256,27 +791,60 @@ class ConsoleApp:
         self.current_route = route
 
     def go_back(self) -> None:
-        """Returns the current route to the previous route in the route history."""
-        self.current_route = self._route_history.pop()
-
-    def configure(self, routes: Optional[Dict[str, Type['Component']]] = None,
+        """Returns the current route to the previous route in the route history, if there is one."""
+        # The current route is at the top of the history, so look beneath it;
+        while len(self._route_history) > 0 and self._route_history[-1] == self._current_route:
+            self._route_history.pop()
+        if len(self._route_history) > 0:
+            self.current_route = self._route_history.pop()
+
+    def configure(self, routes: Optional[Dict[str, Callable[..., 'Component']]] = None,
                   **kwds) -> None:  # noqa: Ignore unused kwds warning.
-        """Configures the application routes and swallows any remaining keywords."""
+        """Configures the application routes and swallows any remaining keywords.
+
+        Args:
+            routes: Maps each route to its component class, or any factory called with the app as its app
+                keyword to build the route's component. Nothing is built until the route is first needed, so
+                startup time doesn't grow with the size of the app. Segments in angle brackets are parameters,
+                so todos.edit.<todo_id> matches todos.edit.42, and the component reads the todo_id from the
+                app's route_params.
+
+        As routes are built lazily, mistakes in a route's components, such as colliding markers, only surface
+        when the route is first visited. Apps should call build_routes() in their tests to catch them, or set
+        configs.validate_routes_on_configure to build the routes here.
+        """
         if routes is not None:
-            self._initialising = True
-            for route, component_class in routes.items():
-                self._route_component_map[route] = component_class(app=self)
-            self._initialising = False
+            for route, factory in routes.items():
+                self._route_trie.add(route)
+                self._route_factories[route] = factory
+                self._route_component_map.pop(route, None)  # Reconfigured routes are rebuilt.
+            if configs.validate_routes_on_configure:
+                self.build_routes(routes)
         # Check we don't have a superclass that also wants configuration;
         assert not hasattr(super(), 'configure')
 
-    @staticmethod
-    def clear_console():
-        os.system('cls' if os.name == 'nt' else 'clear')
+    def clear_console(self) -> None:
+        """Clears the console and homes the cursor."""
+        with self._instrumentation.phase('clear_console'):
+            self._terminal.clear()
+        self._renderer.invalidate()
+
+    @property
+    def render_stats(self) -> terminal.FrameStats:
+        """Returns the counts of bytes and lines written to draw the frames so far."""
+        return self._renderer.stats
 
     @property
     def terminal_width(self) -> int:
         return configs.terminal_width_chars
 
+    @property
+    def terminal_height(self) -> int:
+        """Returns the number of lines available to draw on, as set in the configs, or else the height of the
+        terminal."""
+        if configs.terminal_height_lines is not None:
+            return configs.terminal_height_lines
+        return terminal.get_terminal_size().lines
+
     def quit(self):
         self._quit = True
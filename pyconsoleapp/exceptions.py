@@ -42,6 +42,10 @@ class IdenticalPrimaryMarkersError(PyConsoleAppError):
     """Indicating two responders within the same component state have identical primary markers."""
 
 
+class DuplicateMarkerError(PyConsoleAppError):
+    """Indicating the same marker has been assigned to more than one argument on a responder."""
+
+
 class DuplicateMarkerlessArgError(PyConsoleAppError):
     """Indicating there are multiple markerless arguments assigned to this component state."""
 
@@ -54,6 +58,18 @@ class InvalidArgConfigError(PyConsoleAppError):
     """Indicating that the argument configuration is invald."""
 
 
+class RunningLoopError(PyConsoleAppError):
+    """Indicating an awaitable was reached from a synchronous call while an event loop is running."""
+
+
+class AsyncFrameHookError(PyConsoleAppError):
+    """Indicating a frame hook returned an awaitable while the app was run synchronously."""
+
+
+class JobCancelledError(PyConsoleAppError):
+    """Indicating a background job was cancelled before it finished."""
+
+
 class ResponseValidationError(PyConsoleAppError):
     """Indicating the response did not pass validation."""
 
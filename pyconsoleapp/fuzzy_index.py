@@ -0,0 +1,131 @@
+import itertools
+from collections import Counter
+from typing import Dict, Generic, Hashable, Iterable, List, Optional, Tuple, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+
+
+class FuzzyIndex(Generic[K]):
+    """Finds the entries whose text is most similar to a search term, ranking them exactly as scoring every
+    entry with difflib.SequenceMatcher would, but scoring only the entries which could make the top N.
+
+    Each entry's character counts are held in an inverted index, giving for any search term the number of
+    characters each entry has in common with it. Along with the entry's length, this bounds its SequenceMatcher
+    ratio from above (it is the ratio quick_ratio() gives), so entries are scored in order of their bound, and the
+    search stops once no remaining entry's bound can reach the current top N. Entries which tie are ranked in
+    the order they were added.
+
+    The index is split by text length, so within each length the entries can be ranked by the characters they
+    share with the search term alone, and the counting and ranking are done in C by Counter."""
+
+    def __init__(self, texts: Optional[Iterable[str]] = None):
+        """
+        Args:
+            texts: Texts to add straight away, each keyed on itself. Repeated texts are only added once.
+        """
+        self._next_order = itertools.count()
+        self._texts: Dict[K, str] = {}
+        self._orders: Dict[K, int] = {}
+        # Maps each character to a list of levels, and each level to the keys, by text length, whose text has the
+        # character more than n times. A search term with the character t times then shares min(t, count) of them
+        # with each key, one for each of the first t levels the key is in;
+        self._postings: Dict[str, List[Dict[int, Dict[K, None]]]] = {}
+        if texts is not None:
+            for text in texts:
+                if text not in self._texts:
+                    self.add(text, text)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._texts
+
+    def add(self, key: K, text: str) -> None:
+        """Adds the text under the key. If the key is already in the index, its text is replaced, but it keeps
+        its place in the order used to break ties."""
+        if key in self._texts:
+            self._remove_postings(key)
+        else:
+            self._orders[key] = next(self._next_order)
+        self._texts[key] = text
+        for char, count in Counter(text).items():
+            levels = self._postings.setdefault(char, [])
+            while len(levels) < count:
+                levels.append({})
+            for level in range(count):
+                levels[level].setdefault(len(text), {})[key] = None
+
+    def remove(self, key: K) -> None:
+        """Removes the key and its text from the index."""
+        self._remove_postings(key)
+        del self._texts[key]
+        del self._orders[key]
+
+    def _remove_postings(self, key: K) -> None:
+        text = self._texts[key]
+        for char, count in Counter(text).items():
+            levels = self._postings[char]
+            for level in range(count):
+                keys_by_length = levels[level]
+                del keys_by_length[len(text)][key]
+                if not keys_by_length[len(text)]:
+                    del keys_by_length[len(text)]
+            while levels and not levels[-1]:
+                levels.pop()
+            if not levels:
+                del self._postings[char]
+
+    def clear(self) -> None:
+        """Removes every entry from the index."""
+        self._texts.clear()
+        self._orders.clear()
+        self._postings.clear()
+
+    def best_matches(self, search_term: str, num_results: int) -> List[K]:
+        """Returns the keys of the num_results entries most similar to the search term, best first."""
+        if num_results <= 0:
+            return []
+        import heapq
+        from difflib import SequenceMatcher
+        # Count the characters each entry shares with the search term, for each text length;
+        common_chars: Dict[int, Counter] = {}
+        for char, term_count in Counter(search_term).items():
+            for keys_by_length in self._postings.get(char, [])[:term_count]:
+                for length, keys in keys_by_length.items():
+                    common_chars.setdefault(length, Counter()).update(keys.keys())
+
+        # Rank each length's entries by the characters they share, then queue each ranking's head by the highest
+        # ratio it could score;
+        term_length = len(search_term)
+        rankings = {length: counts.most_common() for length, counts in common_chars.items()}
+        queue = [(-2.0 * ranking[0][1] / (term_length + length), length, 0) for length, ranking in rankings.items()]
+        heapq.heapify(queue)
+
+        # Score the entries until none left in the queue could make the top N;
+        texts, orders = self._texts, self._orders
+        top: List[Tuple[float, int, K]] = []  # Min-heap of the best (score, -order, key) so far.
+        matcher = SequenceMatcher(None, search_term)
+        while queue and (len(top) < num_results or -queue[0][0] >= top[0][0]):
+            _, length, rank = queue[0]
+            ranking = rankings[length]
+            if rank + 1 < len(ranking):
+                heapq.heapreplace(queue, (-2.0 * ranking[rank + 1][1] / (term_length + length), length, rank + 1))
+            else:
+                heapq.heappop(queue)
+            key = ranking[rank][0]
+            matcher.set_seq2(texts[key])
+            scored = (matcher.ratio(), -orders[key], key)
+            if len(top) < num_results:
+                heapq.heappush(top, scored)
+            elif scored > top[0]:
+                heapq.heapreplace(top, scored)
+
+        # Entries sharing no characters score zero, unless both texts are empty, so they only make up the numbers;
+        if len(top) < num_results or top[0][0] == 0:
+            unscored = ((1.0 if text == search_term else 0.0, -orders[key], key)
+                        for key, text in texts.items() if key not in common_chars.get(len(text), ()))
+            if search_term != '':  # Only the earliest could be needed.
+                unscored = itertools.islice(unscored, num_results)
+            top = heapq.nlargest(num_results, itertools.chain(top, unscored))
+        return [key for _, _, key in sorted(top, reverse=True)]
@@ -23,4 +23,5 @@ class GuardComponent(Component, abc.ABC):
     def configure(self, should_activate: Optional[Callable[[], bool]] = None, **kwds) -> None:
         if should_activate is not None:
             self._should_activate = should_activate
+            self.app.refresh_guards()
         super().configure(**kwds)
@@ -0,0 +1,171 @@
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pyconsoleapp import GuardComponent
+
+_ENTRANCE = 'entrance'
+_EXIT = 'exit'
+
+
+class _GuardNode:
+    """A single route segment in the guard trie."""
+
+    def __init__(self, parent: Optional['_GuardNode'] = None, segment: Optional[str] = None):
+        self.parent: Optional['_GuardNode'] = parent
+        self.segment: Optional[str] = segment
+        self.children: Dict[str, '_GuardNode'] = {}
+        self.entrance_guard: Optional['GuardComponent'] = None
+        self.exit_guard: Optional['GuardComponent'] = None
+        self.exit_count: int = 0  # Number of exit guards on this node and its descendants.
+        self.exit_children: Dict[str, None] = {}  # Ordered set of child segments with exit guards below them.
+
+    @property
+    def is_empty(self) -> bool:
+        """Returns True/False to indicate if the node holds nothing and can be pruned."""
+        return self.entrance_guard is None and self.exit_guard is None and len(self.children) == 0
+
+
+class GuardTrie:
+    """Stores entrance and exit guards against route segments, so the guard for any route can be resolved
+    in time proportional to the route depth, regardless of how many guards are registered."""
+
+    def __init__(self):
+        self._root = _GuardNode()
+        self._guard_registrations: Dict['GuardComponent', Set[Tuple[str, str]]] = {}
+        self._version: int = 0
+
+    @property
+    def guards(self) -> List['GuardComponent']:
+        """Returns every guard guarding an entrance or exit."""
+        return list(self._guard_registrations)
+
+    @property
+    def version(self) -> int:
+        """Returns a counter which changes whenever a guard is added or removed."""
+        return self._version
+
+    def _get_node(self, route: str, create: bool = False) -> Optional[_GuardNode]:
+        """Returns the node for the route, creating it if specified, otherwise returning None if it is missing."""
+        node = self._root
+        for segment in route.split('.'):
+            child = node.children.get(segment)
+            if child is None:
+                if not create:
+                    return None
+                child = _GuardNode(parent=node, segment=segment)
+                node.children[segment] = child
+            node = child
+        return node
+
+    def _prune(self, node: _GuardNode) -> None:
+        """Removes the node and any ancestors left holding nothing."""
+        while node.parent is not None and node.is_empty:
+            del node.parent.children[node.segment]
+            node = node.parent
+
+    def _adjust_exit_count(self, node: _GuardNode, change: int) -> None:
+        """Adds the change to the exit guard count of the node and each of its ancestors."""
+        node.exit_count += change
+        while node.parent is not None:
+            if node.exit_count > 0:
+                node.parent.exit_children[node.segment] = None
+            else:
+                node.parent.exit_children.pop(node.segment, None)
+            node = node.parent
+            node.exit_count += change
+
+    def _register(self, guard: 'GuardComponent', kind: str, route: str) -> None:
+        self._guard_registrations.setdefault(guard, set()).add((kind, route))
+        self._version += 1
+
+    def _unregister(self, guard: 'GuardComponent', kind: str, route: str) -> None:
+        registrations = self._guard_registrations[guard]
+        registrations.discard((kind, route))
+        if len(registrations) == 0:
+            del self._guard_registrations[guard]
+        self._version += 1
+
+    def set_entrance_guard(self, route: str, guard: 'GuardComponent') -> None:
+        """Guards the entrance of the route, replacing any existing entrance guard."""
+        node = self._get_node(route, create=True)
+        if node.entrance_guard is not None:
+            self._unregister(node.entrance_guard, _ENTRANCE, route)
+        node.entrance_guard = guard
+        self._register(guard, _ENTRANCE, route)
+
+    def set_exit_guard(self, route: str, guard: 'GuardComponent') -> None:
+        """Guards the exit of the route, replacing any existing exit guard."""
+        node = self._get_node(route, create=True)
+        if node.exit_guard is not None:
+            self._unregister(node.exit_guard, _EXIT, route)
+        else:
+            self._adjust_exit_count(node, 1)
+        node.exit_guard = guard
+        self._register(guard, _EXIT, route)
+
+    def clear_entrance_guard(self, route: str) -> None:
+        """Removes any guard from the entrance of the route."""
+        node = self._get_node(route)
+        if node is not None and node.entrance_guard is not None:
+            self._unregister(node.entrance_guard, _ENTRANCE, route)
+            node.entrance_guard = None
+            self._prune(node)
+
+    def clear_exit_guard(self, route: str) -> None:
+        """Removes any guard from the exit of the route."""
+        node = self._get_node(route)
+        if node is not None and node.exit_guard is not None:
+            self._unregister(node.exit_guard, _EXIT, route)
+            node.exit_guard = None
+            self._adjust_exit_count(node, -1)
+            self._prune(node)
+
+    def remove_guard(self, guard: 'GuardComponent') -> None:
+        """Removes the guard from every entrance and exit it is guarding."""
+        for kind, route in list(self._guard_registrations.get(guard, ())):
+            if kind == _ENTRANCE:
+                self.clear_entrance_guard(route)
+            else:
+                self.clear_exit_guard(route)
+
+    def resolve(self, route: str) -> Optional['GuardComponent']:
+        """Returns the guard which applies to the route, if any. The deepest entrance guard on the route
+        takes priority, otherwise an exit guard for any route the given route is not within is returned."""
+        entrance_guard: Optional['GuardComponent'] = None
+        exit_guards_within = 0
+        path: List[_GuardNode] = [self._root]
+        segments = route.split('.')
+        for segment in segments:
+            node = path[-1].children.get(segment)
+            if node is None:
+                break
+            path.append(node)
+            if node.entrance_guard is not None:
+                entrance_guard = node.entrance_guard
+            if node.exit_guard is not None:
+                exit_guards_within += 1
+        if entrance_guard is not None:
+            return entrance_guard
+
+        # If every exit guard sits on the route, we are within them all;
+        if self._root.exit_count == exit_guards_within:
+            return None
+        # Otherwise find the first branch leaving the route which holds an exit guard;
+        for depth, node in enumerate(path):
+            next_segment = segments[depth] if depth < len(segments) else None
+            for child_segment in node.exit_children:
+                if child_segment != next_segment or depth + 1 >= len(path):
+                    return self._first_exit_guard(node.children[child_segment])
+        return None
+
+    @staticmethod
+    def _first_exit_guard(node: _GuardNode) -> 'GuardComponent':
+        """Returns the shallowest exit guard in the subtree below (and including) the node. Guards at the same
+        depth are taken in the order their branches first gained an exit guard. Only branches holding exit
+        guards are visited."""
+        level = [node]
+        while True:
+            for level_node in level:
+                if level_node.exit_guard is not None:
+                    return level_node.exit_guard
+            level = [level_node.children[segment] for level_node in level for segment in level_node.exit_children]
@@ -0,0 +1,144 @@
+import collections
+import contextlib
+import io
+import time
+from typing import Callable, ContextManager, Deque, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import cProfile
+    import pstats
+
+# Called with the phase name, its tags and the seconds it took, every time a phase finishes;
+PhaseHook = Callable[[str, Dict[str, str], float], None]
+
+_NULL_PHASE: ContextManager[None] = contextlib.nullcontext()
+
+
+class PhaseStats:
+    """Aggregated timings of one phase, for one combination of tags. The count, total and max cover every
+    sample, while the percentiles are taken over the most recent samples only, so memory use is bounded."""
+
+    def __init__(self, max_samples: int = 1000):
+        self.count: int = 0
+        self.total_s: float = 0.0
+        self.max_s: float = 0.0
+        self._samples: Deque[float] = collections.deque(maxlen=max_samples)
+
+    def record(self, seconds: float) -> None:
+        """Adds a sample to the stats."""
+        self.count += 1
+        self.total_s += seconds
+        if seconds > self.max_s:
+            self.max_s = seconds
+        self._samples.append(seconds)
+
+    def percentile(self, percent: float) -> float:
+        """Returns the specified percentile (0-100) of the recent samples, using the nearest rank."""
+        if not self._samples:
+            return 0.0
+        samples = sorted(self._samples)
+        rank = max(0, min(len(samples) - 1, round(percent / 100 * len(samples)) - 1))
+        return samples[rank]
+
+    @property
+    def p50_s(self) -> float:
+        return self.percentile(50)
+
+    @property
+    def p95_s(self) -> float:
+        return self.percentile(95)
+
+
+class Instrumentation:
+    """Times the phases of the app's run loop, and optionally profiles a single frame.
+
+    Phases are timed with the phase() context manager, and the timings are aggregated per phase name and
+    tags. Hooks can be added to receive each timing as it is taken, for example to forward them elsewhere.
+    While disabled, phase() returns a shared no-op context manager, so the run loop pays next to nothing."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled: bool = enabled
+        self._hooks: List[PhaseHook] = []
+        self._stats: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], PhaseStats] = {}
+        self._profile_next_frame: bool = False
+        self._frame_profile: Optional['cProfile.Profile'] = None
+        self.last_frame_profile: Optional['pstats.Stats'] = None
+
+    def add_hook(self, hook: PhaseHook) -> None:
+        """Adds a hook, which is called with every timing taken."""
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: PhaseHook) -> None:
+        """Removes a hook added with add_hook."""
+        self._hooks.remove(hook)
+
+    def phase(self, name: str, **tags: str) -> ContextManager[None]:
+        """Returns a context manager which times the code it wraps as the named phase."""
+        if not self.enabled:
+            return _NULL_PHASE
+        return self._timed_phase(name, tags)
+
+    @contextlib.contextmanager
+    def _timed_phase(self, name: str, tags: Dict[str, str]) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, tags, time.perf_counter() - start)
+
+    def record(self, name: str, tags: Dict[str, str], seconds: float) -> None:
+        """Records a timing of the named phase, and passes it to each hook."""
+        key = (name, tuple(sorted(tags.items())))
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = PhaseStats()
+        stats.record(seconds)
+        for hook in self._hooks:
+            hook(name, tags, seconds)
+
+    @property
+    def stats(self) -> Dict[str, PhaseStats]:
+        """Returns the aggregated stats, keyed on the phase name and its tags, e.g. 'render[route=home]'."""
+        return {self._describe_key(name, tags): stats for (name, tags), stats in self._stats.items()}
+
+    @staticmethod
+    def _describe_key(name: str, tags: Tuple[Tuple[str, str], ...]) -> str:
+        if not tags:
+            return name
+        return '{name}[{tags}]'.format(name=name, tags=','.join('{}={}'.format(k, v) for k, v in tags))
+
+    def reset(self) -> None:
+        """Discards all of the stats collected so far."""
+        self._stats.clear()
+
+    def report(self) -> str:
+        """Returns a table of the stats, with the phases which took the most time in total first."""
+        lines = ['{phase:<70} {count:>8} {p50:>10} {p95:>10} {max:>10} {total:>10}'.format(
+            phase='phase', count='count', p50='p50 ms', p95='p95 ms', max='max ms', total='total ms')]
+        for description, stats in sorted(self.stats.items(), key=lambda item: item[1].total_s, reverse=True):
+            lines.append('{phase:<70} {count:>8} {p50:>10.3f} {p95:>10.3f} {max:>10.3f} {total:>10.3f}'.format(
+                phase=description, count=stats.count, p50=stats.p50_s * 1e3, p95=stats.p95_s * 1e3,
+                max=stats.max_s * 1e3, total=stats.total_s * 1e3))
+        return '\n'.join(lines) + '\n'
+
+    def profile_next_frame(self) -> None:
+        """Arranges for the next frame to be profiled with cProfile."""
+        self._profile_next_frame = True
+
+    def start_frame(self) -> None:
+        """Marks the start of a frame, starting the profiler if a frame profile was requested."""
+        if self._profile_next_frame and self._frame_profile is None:
+            import cProfile
+            self._profile_next_frame = False
+            self._frame_profile = cProfile.Profile()
+            self._frame_profile.enable()
+
+    def end_frame(self) -> Optional['pstats.Stats']:
+        """Marks the end of a frame. Returns the frame's profile, if it was profiled, otherwise None."""
+        if self._frame_profile is None:
+            return None
+        import pstats
+        self._frame_profile.disable()
+        self.last_frame_profile = pstats.Stats(self._frame_profile, stream=io.StringIO())
+        self._frame_profile = None
+        return self.last_frame_profile
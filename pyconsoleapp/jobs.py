@@ -0,0 +1,190 @@
+import itertools
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
+
+from pyconsoleapp import exceptions
+
+if TYPE_CHECKING:
+    from concurrent import futures
+    from pyconsoleapp import ConsoleApp
+
+
+class Job:
+    """A callable submitted to run in the background. The callable can report its progress, post messages
+    and check for cancellation through the job, all of which are safe to call from the worker thread."""
+
+    def __init__(self, manager: 'JobManager', job_id: int, description: str):
+        self._manager: 'JobManager' = manager
+        self._id: int = job_id
+        self._description: str = description
+        self._future: Optional['futures.Future'] = None
+        self._cancel_requested: threading.Event = threading.Event()
+        self.progress: Optional[float] = None  # Fraction complete, between 0 and 1, if known.
+        self.status: Optional[str] = None  # Short description of what the job is currently doing.
+
+    @property
+    def id(self) -> int:
+        """Returns the job's id, which is unique within the app."""
+        return self._id
+
+    @property
+    def description(self) -> str:
+        """Returns the description the job was submitted with."""
+        return self._description
+
+    @property
+    def done(self) -> bool:
+        """Returns True/False to indicate if the job has finished, failed or been cancelled."""
+        return self._future is not None and self._future.done()
+
+    @property
+    def cancel_requested(self) -> bool:
+        """Returns True/False to indicate if cancel() has been called on the job."""
+        return self._cancel_requested.is_set()
+
+    def cancel(self) -> None:
+        """Cancels the job. A job which hasn't started yet never runs. A running job stops at its next
+        check_cancelled() call."""
+        self._cancel_requested.set()
+        if self._future is not None:
+            self._future.cancel()
+
+    def check_cancelled(self) -> None:
+        """Raises JobCancelledError if the job has been cancelled. Called by the job's callable."""
+        if self._cancel_requested.is_set():
+            raise exceptions.JobCancelledError
+
+    def report_progress(self, progress: Optional[float] = None, status: Optional[str] = None) -> None:
+        """Updates the progress shown for the job. Called by the job's callable."""
+        self.progress = progress
+        self.status = status
+
+    def post_info(self, message: str) -> None:
+        """Shows the info message on the next frame. Called by the job's callable."""
+        self._manager.call_on_main_thread(lambda: setattr(self._manager.app, 'info_message', message))
+
+    def post_error(self, message: str) -> None:
+        """Shows the error message on the next frame. Called by the job's callable."""
+        self._manager.call_on_main_thread(lambda: setattr(self._manager.app, 'error_message', message))
+
+    @property
+    def progress_text(self) -> str:
+        """Returns a short summary of the job's progress."""
+        parts = []
+        if self.progress is not None:
+            parts.append('{percent:.0f}%'.format(percent=self.progress * 100))
+        if self.status is not None:
+            parts.append(self.status)
+        return ' '.join(parts) if parts else 'running...'
+
+
+class JobManager:
+    """Runs jobs on background thread or process pools on behalf of an app. Anything a job does to the app
+    is queued, and applied on the main thread when the app next draws a frame, or redraws the view while the
+    prompt waits, so jobs never race the run loop."""
+
+    def __init__(self, app: 'ConsoleApp', max_workers: Optional[int] = None):
+        self._app: 'ConsoleApp' = app
+        self._max_workers: Optional[int] = max_workers
+        # The pools, and concurrent.futures itself, are only loaded once a job is submitted;
+        self._thread_pool: Optional['futures.ThreadPoolExecutor'] = None
+        self._process_pool: Optional['futures.ProcessPoolExecutor'] = None
+        self._job_ids = itertools.count(1)
+        self._running_jobs: Dict[int, Job] = {}
+        self._main_thread_calls: 'queue.SimpleQueue[Callable[[], None]]' = queue.SimpleQueue()
+
+    @property
+    def app(self) -> 'ConsoleApp':
+        """Returns the app the jobs run for."""
+        return self._app
+
+    @property
+    def running_jobs(self) -> List[Job]:
+        """Returns the jobs which have been submitted but not yet finished, in submission order."""
+        return list(self._running_jobs.values())
+
+    def _get_executor(self, use_process: bool) -> 'futures.Executor':
+        """Returns the requested pool, creating it the first time it is needed."""
+        from concurrent import futures
+        if use_process:
+            if self._process_pool is None:
+                self._process_pool = futures.ProcessPoolExecutor(max_workers=self._max_workers)
+            return self._process_pool
+        if self._thread_pool is None:
+            self._thread_pool = futures.ThreadPoolExecutor(max_workers=self._max_workers,
+                                                           thread_name_prefix='pyconsoleapp-job')
+        return self._thread_pool
+
+    def submit(self, func: Callable[..., Any], *args, description: str, use_process: bool = False,
+               pass_job: bool = False, on_done: Optional[Callable[[Any], None]] = None, **kwargs) -> Job:
+        """Submits the callable to run in the background and returns its job straight away.
+
+        Args:
+            func: The callable to run, with the args and kwargs given.
+            description: Describes the job in the message bar.
+            use_process: Run the callable in a process pool, for CPU bound work. The callable and its args
+                must then be picklable, and pass_job is not supported.
+            pass_job: Pass the Job to the callable as its job keyword, so it can report progress, post
+                messages and check for cancellation.
+            on_done: Called on the main thread with the callable's result when it finishes. By default, an
+                info message saying the job finished is shown.
+        """
+        if use_process and pass_job:
+            raise ValueError('Jobs can only be passed to callables running in the thread pool.')
+        job = Job(manager=self, job_id=next(self._job_ids), description=description)
+        if pass_job:
+            kwargs['job'] = job
+        self._running_jobs[job.id] = job
+        job._future = self._get_executor(use_process).submit(func, *args, **kwargs)
+        job._future.add_done_callback(lambda _: self.call_on_main_thread(lambda: self._finish(job, on_done)))
+        return job
+
+    def call_on_main_thread(self, callback: Callable[[], None]) -> None:
+        """Queues the callback to be called on the main thread when the app next draws a frame."""
+        self._main_thread_calls.put(callback)
+
+    def process_pending(self) -> None:
+        """Calls each queued callback, in the order they were queued. Called by the app before each frame, and
+        before each redraw while the prompt waits."""
+        while True:
+            try:
+                callback = self._main_thread_calls.get_nowait()
+            except queue.Empty:
+                return
+            callback()
+
+    def _finish(self, job: Job, on_done: Optional[Callable[[Any], None]]) -> None:
+        """Reports the outcome of the finished job through the app's messages."""
+        self._running_jobs.pop(job.id, None)
+        if job._future.cancelled():
+            self._app.info_message = '{description} was cancelled.'.format(description=job.description)
+            return
+        error = job._future.exception()
+        if isinstance(error, exceptions.JobCancelledError):
+            self._app.info_message = '{description} was cancelled.'.format(description=job.description)
+        elif error is not None:
+            self._app.error_message = '{description} failed: {error}'.format(description=job.description,
+                                                                            error=error)
+        elif on_done is not None:
+            on_done(job._future.result())
+        else:
+            self._app.info_message = '{description} finished.'.format(description=job.description)
+
+    def wait_for_all(self) -> None:
+        """Blocks until every running job has finished, then applies everything they posted."""
+        running_jobs = self.running_jobs
+        if running_jobs:
+            from concurrent import futures
+            futures.wait([job._future for job in running_jobs])
+        self.process_pending()
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Cancels any jobs which haven't started and shuts the pools down."""
+        for job in self._running_jobs.values():
+            job.cancel()
+        for pool in (self._thread_pool, self._process_pool):
+            if pool is not None:
+                pool.shutdown(wait=wait, cancel_futures=True)
+        self._thread_pool = None
+        self._process_pool = None
@@ -1,5 +1,5 @@
-from inspect import signature
-from typing import Callable, List, Dict, Any, Optional, TYPE_CHECKING
+from types import MappingProxyType
+from typing import Callable, List, Dict, Any, Optional, Mapping, Sequence, Tuple, FrozenSet, AbstractSet, TYPE_CHECKING
 
 from pyconsoleapp import exceptions
 
@@ -10,12 +10,14 @@ if TYPE_CHECKING:
 
 class Responder:
     """Associates a function with a list of arguments."""
+    __slots__ = ('_app', '_responder_func', '_args', '_markerless_arg', '_marker_arg_map', '_primary_marker_sets',
+                 '_func_takes_args')
 
-    def __init__(self, app: 'ConsoleApp', func: Callable[..., None], args: Optional[List['ResponderArg']] = None,
+    def __init__(self, app: 'ConsoleApp', func: Callable[..., None], args: Optional[Sequence['ResponderArg']] = None,
                  **kwds):
         self._app: 'ConsoleApp' = app
         self._responder_func: Callable[..., None] = func
-        self._args: List['ResponderArg'] = args if args is not None else []
+        self._args: Tuple['ResponderArg', ...] = tuple(args) if args is not None else ()
 
         self._markerless_arg: Optional['ResponderArg'] = None
         for arg in self._args:
@@ -25,8 +27,28 @@ class Responder:
                 else:
                     raise exceptions.DuplicateMarkerlessArgError
 
+        # Index every marker against its arg once, so parsing never has to scan the args;
+        marker_arg_map: Dict[str, 'ResponderArg'] = {}
+        for arg in self._args:
+            for marker in arg.markers:
+                if marker in marker_arg_map:
+                    raise exceptions.DuplicateMarkerError(marker)
+                marker_arg_map[marker] = arg
+        self._marker_arg_map: Mapping[str, 'ResponderArg'] = MappingProxyType(marker_arg_map)
+        self._primary_marker_sets: Tuple[FrozenSet[str], ...] = tuple(
+            frozenset(arg.markers) for arg in self._args if arg.is_primary)
+
+        # The function signature never changes, so only inspect it once;
+        from inspect import signature
+        self._func_takes_args: bool = len(signature(self._responder_func).parameters) > 0
+
         super().__init__(**kwds)
 
+    @property
+    def func_name(self) -> str:
+        """Returns the qualified name of the responder's function, to identify it in diagnostics."""
+        return getattr(self._responder_func, '__qualname__', repr(self._responder_func))
+
     @property
     def has_markerless_arg(self) -> bool:
         """Returns True/False to indicate if any constituent args are markerless."""
@@ -48,10 +70,7 @@ class Responder:
     @property
     def _all_markers(self) -> List[str]:
         """Returns a list of all markers associated with all args on this responder."""
-        markers = []
-        for arg in self._args:
-            markers.extend(arg.markers)
-        return markers
+        return list(self._marker_arg_map.keys())
 
     @property
     def is_argless(self) -> bool:
@@ -80,11 +99,19 @@ class Responder:
         for arg in self._args:
             arg.reset()
 
+    @property
+    def primary_marker_sets(self) -> Tuple[FrozenSet[str], ...]:
+        """Returns the set of markers for each primary arg on this responder, in arg order."""
+        return self._primary_marker_sets
+
     def check_marker_match(self, response: str) -> bool:
         """Returns True/False to indicate if the given response matches this responder."""
-        split_response = set(response.split())
-        for arg in self._primary_args:
-            if len(split_response.intersection(set(arg.markers))) == 0:
+        return self.check_words_match(set(response.split()))
+
+    def check_words_match(self, words: AbstractSet[str]) -> bool:
+        """Returns True/False to indicate if the given set of response words matches this responder."""
+        for primary_markers in self._primary_marker_sets:
+            if primary_markers.isdisjoint(words):
                 return False
         return True
 
@@ -93,49 +120,55 @@ class Responder:
         Notes:
         - Any present valueless arguments are set to True.
         - All argument validation occurs in the argument setters."""
-
-        def word_is_marker(word: str) -> bool:
-            """Returns True/False to indicate if word is a marker for an arg on this responder."""
-            return word in self._all_markers
-
-        def get_arg_for_marker(marker: str) -> 'ResponderArg':
-            """Returns the ResponderArg corresponding to the marker specified."""
-            for arg in self._args:
-                if marker in arg.markers:
-                    return arg
-            raise ValueError('{marker} is not a marker for any args.'.format(marker=marker))
-
-        words = response.split()  # Split the response into a list of words.
+        marker_arg_map = self._marker_arg_map
+        words = response.split()
         current_arg = self.markerless_arg  # None if no markerless arg exists.
-
-        # Cycle through each word in the response;
-        for current_word in words:
-            # Is the word a marker or part of a value?
-            # If it is a marker, write the buffer on the previous arg and update the current arg;
-            if word_is_marker(current_word):
-                if current_arg is not None:
-                    current_arg.write_value_buffer()
-                current_arg = get_arg_for_marker(current_word)
-                current_arg.marker_found = True
-            # If it is a value, just add it to the buffer;
-            else:
-                current_arg.buffer_value(current_word)
+        value_start = 0  # Index of the first word of the current arg's value.
+
+        def buffer_values(value_end: int) -> None:
+            """Buffers the words since the last marker onto the current arg."""
+            if value_start < value_end:
+                # A value before any marker has nowhere to go without a markerless arg;
+                if current_arg is None:
+                    raise exceptions.OrphanValueError(words[value_start])
+                current_arg.buffer_values(words[value_start:value_end])
+
+        # Find the markers in a single pass, then hand each run of words between them to its arg;
+        for marker_index in [i for i, word in enumerate(words) if word in marker_arg_map]:
+            buffer_values(marker_index)
+            if current_arg is not None:
+                current_arg.write_value_buffer()
+            current_arg = marker_arg_map[words[marker_index]]
+            current_arg.marker_found = True
+            value_start = marker_index + 1
+            if current_arg.raw_value:
+                # The rest of the response is the value, as typed;
+                rest = response.split(None, value_start)[value_start:]
+                if rest:
+                    current_arg.buffer_value(rest[0].rstrip())
+                value_start = len(words)
+                break
         # We have run out of words, so write any residual buffer;
-        current_arg.write_value_buffer()
+        buffer_values(len(words))
+        if current_arg is not None:
+            current_arg.write_value_buffer()
 
         # Return the kwds dict;
         return self._args_and_values
 
-    def respond(self, response: Optional[str] = None) -> None:
-        """Calls the function associated with the responder, passing any parsed arguments, if present."""
+    def respond(self, response: Optional[str] = None) -> Any:
+        """Calls the function associated with the responder, passing any parsed arguments, if present.
+        Returns whatever the function returns, so the coroutine from an async function can be awaited."""
         self._app.stop_responding()  # Stop by default, and the function can then restart before next loop.
         if self.is_argless:
-            self._responder_func()
+            return self._responder_func()
         else:
-            func_sig = signature(self._responder_func)
-            if len(func_sig.parameters) > 0:
-                kwds = self._parse_response(response)
-                self._responder_func(**kwds)
-            else:
-                self._responder_func()
-            self._reset_args()
+            try:
+                if self._func_takes_args:
+                    kwds = self._parse_response(response)
+                    return self._responder_func(**kwds)
+                else:
+                    return self._responder_func()
+            finally:
+                # Reset even if parsing failed, so half-parsed values don't leak into the next response;
+                self._reset_args()
@@ -1,30 +1,38 @@
 import abc
-from typing import List, Callable, Optional, Any
+from typing import List, Callable, Optional, Any, Sequence, Tuple
 
 from pyconsoleapp import exceptions
 
 
 class ResponderArg(abc.ABC):
     """Base class for an argument, representing its markers, validation and default value."""
+    __slots__ = ('_name', '_accepts_value', '_markers', 'marker_found', '_validators', '_default_value', '_value',
+                 '_value_buffer', '_raw_value')
 
     def __init__(self, name: str, accepts_value: bool,
-                 markers: Optional[List[str]] = None,
-                 validators: Optional[List[Callable[..., Any]]] = None,
+                 markers: Optional[Sequence[str]] = None,
+                 validators: Optional[Sequence[Callable[..., Any]]] = None,
                  default_value: Any = None,
+                 raw_value: bool = False,
                  **kwds):
 
         if accepts_value is False:
-            if validators is not None or default_value is not None:  # No validation or defaults on valuless args.
+            # No validation, defaults or raw values on valuless args;
+            if validators is not None or default_value is not None or raw_value:
                 raise exceptions.InvalidArgConfigError
 
         self._name: str = name
         self._accepts_value = accepts_value
-        self._markers: List[str] = markers if markers is not None else []
+        # The configuration never changes, so it is held in tuples, while the buffer is reused between responses;
+        self._markers: Tuple[str, ...] = tuple(markers) if markers is not None else ()
         self.marker_found: bool = False
-        self._validators: List[Callable[..., Any]] = validators if validators is not None else []
+        self._validators: Tuple[Callable[..., Any], ...] = tuple(validators) if validators is not None else ()
         self._default_value: Optional[Any] = default_value
         self._value: Any = None
-        self._value_buffer = []
+        self._value_buffer: List[Any] = []
+        # Takes the rest of the response after the marker as typed, such as a file path, keeping repeated spaces
+        # and any words which look like markers;
+        self._raw_value: bool = raw_value
 
         self._init_value()
 
@@ -73,6 +81,14 @@ class ResponderArg(abc.ABC):
 
         self._value_buffer.append(value_fragment)
 
+    def buffer_values(self, value_fragments: List[Any]) -> None:
+        """Adds each of the value fragments to the value buffer."""
+        # Raise exception if we try and buffer a valueless arg;
+        if not self._accepts_value:
+            raise exceptions.OrphanValueError(value_fragments[0])
+
+        self._value_buffer.extend(value_fragments)
+
     def write_value_buffer(self) -> None:
         """Concatenates the value buffer and submits it for validation via the value setter."""
         # If don't accept values;
@@ -96,7 +112,7 @@ class ResponderArg(abc.ABC):
             else:
                 self.value = ' '.join(self._value_buffer)
         # Whatever happened, clear the buffer;
-        self._value_buffer = []
+        self._value_buffer.clear()
 
     @property
     def accepts_value(self) -> bool:
@@ -104,10 +120,16 @@ class ResponderArg(abc.ABC):
         return self._accepts_value
 
     @property
-    def markers(self) -> List[str]:
-        """Returns a list of the argument's markers."""
+    def markers(self) -> Tuple[str, ...]:
+        """Returns the argument's markers."""
         return self._markers
 
+    @property
+    def raw_value(self) -> bool:
+        """Returns True/False to indicate if the argument takes the rest of the response after its marker, as
+        typed."""
+        return self._raw_value
+
     @property
     def is_markerless(self) -> bool:
         """Returns True/False to indicate if this arg has any markers."""
@@ -119,11 +141,13 @@ class ResponderArg(abc.ABC):
     def reset(self) -> None:
         """Resets the arg value."""
         self.marker_found = False
+        self._value_buffer.clear()  # Validation may have failed before the buffer was written.
         self._init_value()
 
 
 class PrimaryArg(ResponderArg):
     """Represents a mandatory Responder argument."""
+    __slots__ = ()
 
     def __init__(self, **kwds):
         super().__init__(**kwds)
@@ -131,6 +155,7 @@ class PrimaryArg(ResponderArg):
 
 class OptionalArg(ResponderArg):
     """Represents an optional Responder argument."""
+    __slots__ = ()
 
     def __init__(self, **kwds):
         super().__init__(**kwds)
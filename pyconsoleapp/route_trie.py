@@ -0,0 +1,111 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pyconsoleapp import exceptions
+
+
+def param_name(segment: str) -> Optional[str]:
+    """Returns the parameter name if the route segment is a parameter, like <todo_id>, otherwise None."""
+    if len(segment) > 2 and segment[0] == '<' and segment[-1] == '>':
+        return segment[1:-1]
+    return None
+
+
+class _RouteNode:
+    """A single route segment in the route trie."""
+
+    def __init__(self):
+        self.children: Dict[str, '_RouteNode'] = {}
+        self.param_child: Optional['_RouteNode'] = None
+        self.param_name: Optional[str] = None  # Name of the parameter param_child matches.
+        self.pattern: Optional[str] = None  # The pattern registered at this node, if any.
+
+
+class RouteTrie:
+    """Stores route patterns, whose segments are either fixed, like todos, or parameters, like <todo_id>, and
+    matches concrete routes against them in time proportional to the route depth, regardless of how many
+    patterns are registered. Fixed segments take priority over parameters, so todos.edit.new is matched by a
+    todos.edit.new pattern before todos.edit.<todo_id>."""
+
+    def __init__(self):
+        self._root = _RouteNode()
+
+    def __contains__(self, pattern: str) -> bool:
+        node = self._root
+        for segment in pattern.split('.'):
+            name = param_name(segment)
+            node = node.children.get(segment) if name is None else node.param_child
+            if node is None:
+                return False
+        return node.pattern == pattern
+
+    def add(self, pattern: str) -> None:
+        """Adds the route pattern.
+
+        Raises:
+            InvalidRouteError: To indicate the pattern has a parameter name which is used twice, or which
+                conflicts with a parameter already registered at the same position under another name.
+        """
+        node = self._root
+        names: List[str] = []
+        for segment in pattern.split('.'):
+            name = param_name(segment)
+            if name is None:
+                node = node.children.setdefault(segment, _RouteNode())
+                continue
+            if name in names:
+                raise exceptions.InvalidRouteError('The parameter {name} is used twice in route {pattern}.'.format(
+                    name=name, pattern=pattern))
+            names.append(name)
+            if node.param_child is None:
+                node.param_child, node.param_name = _RouteNode(), name
+            elif node.param_name != name:
+                raise exceptions.InvalidRouteError('Route {pattern} names parameter <{name}> where another '
+                                                   'route names it <{other}>.'.format(pattern=pattern, name=name,
+                                                                                      other=node.param_name))
+            node = node.param_child
+        node.pattern = pattern
+
+    def remove(self, pattern: str) -> None:
+        """Removes the route pattern, if it is registered."""
+        path: List[Tuple[_RouteNode, str]] = []
+        node = self._root
+        for segment in pattern.split('.'):
+            child = node.children.get(segment) if param_name(segment) is None else node.param_child
+            if child is None:
+                return
+            path.append((node, segment))
+            node = child
+        if node.pattern != pattern:
+            return
+        node.pattern = None
+        # Prune the nodes left holding nothing;
+        for parent, segment in reversed(path):
+            if node.pattern is not None or node.children or node.param_child is not None:
+                break
+            if param_name(segment) is None:
+                del parent.children[segment]
+            else:
+                parent.param_child, parent.param_name = None, None
+            node = parent
+
+    def match(self, route: str) -> Optional[Tuple[str, Dict[str, str]]]:
+        """Returns the pattern matching the route, with the value of each of its parameters, or None if no
+        pattern matches."""
+        segments = route.split('.')
+        for pattern, values in self._match(self._root, segments, 0, []):
+            return pattern, dict(values)
+        return None
+
+    def _match(self, node: _RouteNode, segments: List[str], depth: int,
+               values: List[Tuple[str, str]]) -> Iterator[Tuple[str, List[Tuple[str, str]]]]:
+        """Yields the patterns matching the segments from the depth on, fixed segments first."""
+        if depth == len(segments):
+            if node.pattern is not None:
+                yield node.pattern, values
+            return
+        segment = segments[depth]
+        child = node.children.get(segment)
+        if child is not None:
+            yield from self._match(child, segments, depth + 1, values)
+        if node.param_child is not None and segment != '':
+            yield from self._match(node.param_child, segments, depth + 1, values + [(node.param_name, segment)])
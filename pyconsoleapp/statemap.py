@@ -1,5 +1,5 @@
 from collections.abc import MutableMapping
-from typing import Dict, Iterator, TYPE_CHECKING
+from typing import Callable, Dict, Iterator, Optional, TYPE_CHECKING
 
 from pyconsoleapp import exceptions
 
@@ -8,9 +8,10 @@ if TYPE_CHECKING:
 
 
 class Statemap(MutableMapping):
-    def __init__(self, state_map: Dict[str, 'Component']):
+    def __init__(self, state_map: Dict[str, 'Component'], on_state_change: Optional[Callable[[], None]] = None):
         self._current_state: str = "main"
         self._state_component_map = state_map
+        self._on_state_change: Optional[Callable[[], None]] = on_state_change
 
     @property
     def current_state(self) -> str:
@@ -21,7 +22,10 @@ class Statemap(MutableMapping):
     def current_state(self, state: str) -> None:
         """Sets the current state."""
         self.validate_state(state)
-        self._current_state = state
+        if state != self._current_state:
+            self._current_state = state
+            if self._on_state_change is not None:
+                self._on_state_change()
 
     def validate_state(self, state: str) -> None:
         """Raises an exception if the current state is not in the list of known states."""
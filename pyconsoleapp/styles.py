@@ -1,16 +1,129 @@
-from typing import Any
-
-import colorama
-colorama.init()
-
-def fore(text:Any, color:str)->str:
-    code = getattr(colorama.Fore, color.upper())
-    return code + str(text) + colorama.Style.RESET_ALL
-
-def back(text:Any, color:str)->str:
-    code = getattr(colorama.Back, color.upper())
-    return code + str(text) + colorama.Style.RESET_ALL
-    
-def weight(text:Any, weight:str)->str:
-    code = getattr(colorama.Style, weight.upper())
-    return code + str(text) + colorama.Style.RESET_ALL
\ No newline at end of file
+import os
+import sys
+from typing import Any, Dict, Optional, Tuple
+
+# ANSI select graphic rendition codes, by the colour and weight names colorama uses;
+_COLOUR_CODES: Dict[str, int] = {
+    'black': 30, 'red': 31, 'green': 32, 'yellow': 33, 'blue': 34, 'magenta': 35, 'cyan': 36, 'white': 37,
+    'reset': 39, 'lightblack_ex': 90, 'lightred_ex': 91, 'lightgreen_ex': 92, 'lightyellow_ex': 93,
+    'lightblue_ex': 94, 'lightmagenta_ex': 95, 'lightcyan_ex': 96, 'lightwhite_ex': 97,
+}
+_BACK_OFFSET = 10  # Background colour codes are the foreground codes plus 10.
+_WEIGHT_CODES: Dict[str, int] = {'bright': 1, 'dim': 2, 'normal': 22, 'reset_all': 0}
+_RESET_ALL = '\x1b[0m'
+
+_plain_override: Optional[bool] = None
+_plain: Optional[bool] = None  # Decided the first time text is styled.
+_terminal_initialised: bool = False
+
+
+def is_plain() -> bool:
+    """Returns True/False to indicate if text is left unstyled. Unless set_plain() says otherwise, styling is
+    left off when the NO_COLOR environment variable is set, or stdout is not a TTY, so piped output carries
+    no escape codes. The decision is made once, the first time it is needed."""
+    global _plain
+    if _plain is None:
+        if _plain_override is not None:
+            _plain = _plain_override
+        elif os.environ.get('NO_COLOR'):
+            _plain = True
+        else:
+            try:
+                _plain = not sys.stdout.isatty()
+            except (AttributeError, ValueError):  # Not a real file, or already closed.
+                _plain = True
+        if not _plain:
+            _init_terminal()
+    return _plain
+
+
+def set_plain(plain: Optional[bool]) -> None:
+    """Forces plain (True) or styled (False) text, or with None, goes back to deciding automatically."""
+    global _plain_override, _plain
+    _plain_override = plain
+    _plain = None
+
+
+def _init_terminal() -> None:
+    """Lets colorama translate escape codes on Windows consoles, the first time styled text is produced."""
+    global _terminal_initialised
+    if not _terminal_initialised:
+        _terminal_initialised = True
+        if os.name == 'nt':
+            import colorama
+            colorama.init()
+
+
+class Style:
+    """A combination of foreground colour, background colour and weight, applied by calling the style with
+    some text. The escape codes are resolved once, into a prefix and suffix, rather than on every call."""
+    __slots__ = ('_codes', '_prefix', '_suffix')
+
+    def __init__(self, codes: Tuple[int, ...]):
+        self._codes: Tuple[int, ...] = codes
+        self._prefix: str = '\x1b[{codes}m'.format(codes=';'.join(str(code) for code in codes)) if codes else ''
+        self._suffix: str = _RESET_ALL if codes else ''
+
+    def __call__(self, text: Any) -> str:
+        """Returns the text wrapped in the style's escape codes, or just the text in plain mode."""
+        if (_plain if _plain is not None else is_plain()) or not self._codes:
+            return str(text)
+        return self._prefix + str(text) + self._suffix
+
+    def __add__(self, other: 'Style') -> 'Style':
+        """Returns the style which applies both styles at once, the other style's codes taking precedence."""
+        return Style(self._codes + other._codes)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Style) and self._codes == other._codes
+
+    def __hash__(self) -> int:
+        return hash(self._codes)
+
+    def __repr__(self) -> str:
+        return 'Style({codes})'.format(codes=self._codes)
+
+
+_styles: Dict[Tuple[Optional[str], Optional[str], Optional[str]], Style] = {}
+
+
+def style(fore: Optional[str] = None, back: Optional[str] = None, weight: Optional[str] = None) -> Style:
+    """Returns the style with the specified colours and weight. Styles are cached, so asking for the same
+    style again costs a dict lookup.
+
+    Raises:
+        ValueError: To indicate a colour or weight name is not recognised.
+    """
+    key = (fore, back, weight)
+    cached = _styles.get(key)
+    if cached is not None:
+        return cached
+    codes = []
+    try:
+        if fore is not None:
+            codes.append(_COLOUR_CODES[fore.lower()])
+        if back is not None:
+            codes.append(_COLOUR_CODES[back.lower()] + _BACK_OFFSET)
+        if weight is not None:
+            codes.append(_WEIGHT_CODES[weight.lower()])
+    except KeyError as e:
+        raise ValueError('The colour or weight {name} was not recognised.'.format(name=e))
+    _styles[key] = Style(tuple(codes))
+    return _styles[key]
+
+
+def styled(text: Any, fore: Optional[str] = None, back: Optional[str] = None, weight: Optional[str] = None) -> str:
+    """Returns the text with the colours and weight applied in a single wrap."""
+    return style(fore=fore, back=back, weight=weight)(text)
+
+
+def fore(text: Any, color: str) -> str:
+    return style(fore=color)(text)
+
+
+def back(text: Any, color: str) -> str:
+    return style(back=color)(text)
+
+
+def weight(text: Any, weight: str) -> str:
+    return style(weight=weight)(text)
@@ -0,0 +1,226 @@
+import os
+import sys
+from typing import Callable, List, Optional, Pattern, TextIO
+
+# Home the cursor, then clear the screen and scrollback, as the clear command does.
+_CLEAR_SCREEN = '\x1b[H\x1b[2J\x1b[3J'
+# Move to the start of a (1-based) row and write it, clearing whatever was left on the row.
+_REWRITE_ROW = '\x1b[{row};1H{line}\x1b[K'
+# Move to the start of a (1-based) row and clear from there to the end of the screen.
+_CLEAR_FROM_ROW = '\x1b[{row};1H\x1b[J'
+# Save and restore the cursor, so rows can be rewritten while the prompt is being typed at;
+_SAVE_CURSOR = '\x1b7'
+_RESTORE_CURSOR = '\x1b8'
+_escape_sequence: Optional[Pattern[str]] = None  # Compiled the first time it is needed.
+
+
+def visible_width(line: str) -> int:
+    """Returns the number of characters the line occupies on screen, ignoring any escape sequences."""
+    global _escape_sequence
+    if _escape_sequence is None:
+        import re
+        _escape_sequence = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+    return len(_escape_sequence.sub('', line))
+
+
+def get_terminal_size() -> os.terminal_size:
+    """Returns the size of the terminal, as shutil.get_terminal_size does, importing shutil the first time
+    the size is needed rather than when the package is imported."""
+    import shutil
+    return shutil.get_terminal_size()
+
+
+class StreamWatcher:
+    """Stands in for a stream, noting whenever anything is written to it, so the renderer can tell when
+    something other than itself, such as a responder calling print(), has moved the cursor or scrolled the
+    screen. Everything else is passed through to the stream."""
+
+    def __init__(self, stream: TextIO):
+        self.stream: TextIO = stream
+        self.written: bool = False
+        self.ignoring: bool = False  # Set while the app itself writes through the stream, e.g. for the prompt.
+
+    def write(self, text: str) -> int:
+        if text and not self.ignoring:
+            self.written = True
+        return self.stream.write(text)
+
+    def __getattr__(self, name: str):
+        return getattr(self.stream, name)
+
+
+class TerminalWriter:
+    """Writes frames to the terminal in-process, using escape sequences to clear the screen, so each frame
+    costs a single buffered write rather than a shell and an external command."""
+
+    def __init__(self, stream: Optional[TextIO] = None, plain: Optional[bool] = None):
+        """
+        Args:
+            stream: Stream to write to. Defaults to whatever sys.stdout is at the time of writing.
+            plain: Forces plain (True) or escape-code (False) output. By default, plain output is used
+                whenever the stream is not a TTY.
+        """
+        self._stream: Optional[TextIO] = stream
+        self._plain: Optional[bool] = plain
+
+    @property
+    def stream(self) -> TextIO:
+        """Returns the stream frames are written to. If the stream is being watched, frames are written
+        straight to the stream underneath, so they aren't mistaken for output from elsewhere."""
+        stream = self._stream if self._stream is not None else sys.stdout
+        return stream.stream if isinstance(stream, StreamWatcher) else stream
+
+    @property
+    def is_plain(self) -> bool:
+        """Returns True/False to indicate if output is written without escape sequences."""
+        if self._plain is not None:
+            return self._plain
+        try:
+            return not self.stream.isatty()
+        except (AttributeError, ValueError):  # Not a real file, or already closed.
+            return True
+
+    def write(self, text: str) -> None:
+        """Writes the text to the stream and flushes it."""
+        stream = self.stream
+        stream.write(text)
+        stream.flush()
+
+    def clear(self) -> None:
+        """Clears the screen and homes the cursor. Does nothing in plain mode."""
+        if not self.is_plain:
+            self.write(_CLEAR_SCREEN)
+
+    def write_frame(self, frame: str) -> None:
+        """Replaces the screen contents with the frame, in a single write. In plain mode the frame is just
+        appended to the output."""
+        if self.is_plain:
+            self.write(frame)
+        else:
+            self.write(_CLEAR_SCREEN + frame)
+
+
+class FrameStats:
+    """Records how much the renderer has written to the terminal."""
+
+    def __init__(self):
+        self.frames: int = 0
+        self.full_repaints: int = 0
+        self.bytes_written: int = 0
+        self.lines_written: int = 0
+        self.last_frame_bytes: int = 0
+        self.last_frame_lines: int = 0
+
+    def record(self, text: str, num_lines: int, full_repaint: bool) -> None:
+        """Records a frame made up of the text, which rewrote the specified number of lines."""
+        self.frames += 1
+        self.full_repaints += int(full_repaint)
+        self.last_frame_bytes = len(text.encode('utf-8'))
+        self.last_frame_lines = num_lines
+        self.bytes_written += self.last_frame_bytes
+        self.lines_written += num_lines
+
+    @property
+    def mean_bytes_per_frame(self) -> float:
+        """Returns the mean number of bytes written per frame."""
+        return self.bytes_written / self.frames if self.frames else 0.0
+
+    @property
+    def mean_lines_per_frame(self) -> float:
+        """Returns the mean number of lines written per frame."""
+        return self.lines_written / self.frames if self.frames else 0.0
+
+
+class IncrementalRenderer:
+    """Draws frames by rewriting only the rows which differ from the previous frame. After each frame the
+    cursor is left at the start of a cleared row directly below it, ready for the prompt.
+
+    The whole screen is repainted instead whenever row addressing can't be trusted: on the first frame, in
+    plain mode, after the terminal is resized, when the frame would wrap or scroll the screen, when the last
+    response wrapped past the end of the prompt row, or when anything else wrote to the watched stream."""
+
+    def __init__(self, writer: TerminalWriter,
+                 get_terminal_size: Callable[[], os.terminal_size] = get_terminal_size):
+        self._writer: TerminalWriter = writer
+        self._get_terminal_size: Callable[[], os.terminal_size] = get_terminal_size
+        self._last_lines: Optional[List[str]] = None
+        self._last_size: Optional[os.terminal_size] = None
+        self.watcher: Optional[StreamWatcher] = None  # Watches stdout for writes made between frames.
+        self.stats: FrameStats = FrameStats()
+
+    def invalidate(self) -> None:
+        """Forgets the previous frame, so the next frame repaints the whole screen."""
+        self._last_lines = None
+
+    def note_response(self, prompt: str, response: str) -> None:
+        """Records the response typed at the prompt below the last frame. If it reached the last column, it
+        may have wrapped onto further rows and scrolled the screen, so the next frame repaints the whole
+        screen."""
+        if self._last_size is not None and \
+                visible_width(prompt) + visible_width(response) >= self._last_size.columns:
+            self.invalidate()
+
+    def _needs_full_repaint(self, lines: List[str], size: os.terminal_size) -> bool:
+        """Returns True/False to indicate if the frame must be drawn by repainting the whole screen."""
+        if self._writer.is_plain or self._last_lines is None or size != self._last_size:
+            return True
+        if self.watcher is not None and self.watcher.written:
+            return True
+        # Leave room for the prompt row, and the row the cursor moves to when enter is pressed;
+        if len(lines) + 2 > size.lines:
+            return True
+        for line in lines:
+            if len(line) > size.columns and visible_width(line) > size.columns:
+                return True
+        return False
+
+    def render(self, frame: str) -> None:
+        """Draws the frame, which is made up of newline terminated lines."""
+        lines = frame.split('\n')
+        if lines[-1] == '':
+            lines.pop()
+        size = self._get_terminal_size()
+
+        if self._needs_full_repaint(lines, size):
+            text = frame if self._writer.is_plain else _CLEAR_SCREEN + frame
+            self._writer.write(text)
+            self.stats.record(text, len(lines), full_repaint=True)
+        else:
+            last_lines = self._last_lines
+            changes = []
+            for row, line in enumerate(lines):
+                if row >= len(last_lines) or last_lines[row] != line:
+                    changes.append(_REWRITE_ROW.format(row=row + 1, line=line))
+            num_changed_lines = len(changes)
+            changes.append(_CLEAR_FROM_ROW.format(row=len(lines) + 1))
+            text = ''.join(changes)
+            self._writer.write(text)
+            self.stats.record(text, num_changed_lines, full_repaint=False)
+
+        self._last_lines = lines
+        self._last_size = size
+        if self.watcher is not None:
+            self.watcher.written = False
+
+    def refresh(self, frame: str) -> bool:
+        """Redraws the frame in place while the prompt below the last frame is still waiting for a response,
+        rewriting only the rows which changed and putting the cursor back where it was, so the response being
+        typed is left alone. The prompt doesn't move, so rows the frame no longer has are blanked, and rows past
+        the end of the last frame are left for the next frame to draw. Returns True/False to indicate if the
+        frame could be drawn in place; it can't whenever render() would repaint the whole screen."""
+        lines = frame.split('\n')
+        if lines[-1] == '':
+            lines.pop()
+        size = self._get_terminal_size()
+        if self._needs_full_repaint(lines, size):
+            return False
+        last_lines = self._last_lines
+        lines = lines[:len(last_lines)] + [''] * (len(last_lines) - len(lines))
+        changes = [_REWRITE_ROW.format(row=row + 1, line=line)
+                   for row, (line, last_line) in enumerate(zip(lines, last_lines)) if line != last_line]
+        if changes:
+            text = _SAVE_CURSOR + ''.join(changes) + _RESTORE_CURSOR
+            self._writer.write(text)
+            self.stats.record(text, len(changes), full_repaint=False)
+        self._last_lines = lines
+        return True
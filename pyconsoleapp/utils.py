@@ -1,19 +1,18 @@
-from difflib import SequenceMatcher
-from heapq import nlargest
-from textwrap import fill
 from typing import Dict, List, Optional, TypeVar
 
-from pyconsoleapp import configs
+from pyconsoleapp import configs, fuzzy_index
 
 T = TypeVar('T')
 
 
-def wrap_text(text: str, num_chars: Optional[int] = None) -> str:
+def wrap_text(text: str, num_chars: Optional[int] = None, max_lines: Optional[int] = None) -> str:
     """Wraps the text to the specified width (number of chars). If no width is specified, the text is
-    wrapped to the console width defined in the configs."""
+    wrapped to the console width defined in the configs. If the text takes more than max_lines lines, it is
+    cut short, ending with '...'."""
     if num_chars is None:
         num_chars = configs.terminal_width_chars
-    return fill(text, num_chars)
+    from textwrap import fill
+    return fill(text, num_chars, max_lines=max_lines, placeholder=' ...')
 
 
 def truncate_text(text: str, num_chars: int, end_chars: str = '...') -> str:
@@ -40,6 +39,7 @@ def make_numbered_map(list_to_map: List[T], start_num: int = 1) -> Dict[int, T]:
 def score_similarity(words_to_score: List[str], search_term: str) -> Dict[str, float]:
     """Returns a dictionary of the each word in the original list, coupled with a similarity score indicating
     how similar each word is to the similarity term."""
+    from difflib import SequenceMatcher
     scores = {}
     for word in words_to_score:
         scores[word] = SequenceMatcher(None, search_term, word).ratio()
@@ -47,6 +47,6 @@ def score_similarity(words_to_score: List[str], search_term: str) -> Dict[str, f
 
 
 def get_n_best_matches(words_to_search: List[str], search_term: str, num_results: int) -> List[str]:
-    """Returns a list of n words most similar to the search term."""
-    all_scores = score_similarity(words_to_search, search_term)
-    return nlargest(num_results, all_scores, key=all_scores.get)
+    """Returns a list of n words most similar to the search term. To search the same words repeatedly, build
+    a FuzzyIndex of them once and call its best_matches method instead."""
+    return fuzzy_index.FuzzyIndex(words_to_search).best_matches(search_term, num_results)
@@ -1,3 +1,9 @@
-from todo_app import app
+from todo_app import app, service
+from todo_app.sqlite_repository import SqliteTodoRepository
+
+# Persist the todos, committing each frame's changes together;
+service.use_repository(SqliteTodoRepository('todos.db'))
+app.register_frame_hook(service.commit)
 
 app.run()
+service.repository.close()
@@ -0,0 +1,223 @@
+from unittest import TestCase
+
+from pyconsoleapp import ConsoleApp, Component, PrimaryArg, exceptions, styles
+
+
+class _Leaf(Component):
+    def printer(self, **kwds) -> str:
+        return 'leaf'
+
+
+class _LeafWithResponder(_Leaf):
+    def __init__(self, **kwds):
+        super().__init__(**kwds)
+        self.configure(responders=[
+            self.configure_responder(lambda: None, args=[
+                PrimaryArg(name='go', accepts_value=False, markers=['-go'])
+            ])
+        ])
+
+
+class _Parent(Component):
+    def __init__(self, **kwds):
+        super().__init__(**kwds)
+        self.leaf = self.use_component(_Leaf)
+        self.other_leaf = self.leaf.delegate_state('other', _LeafWithResponder)
+
+    def printer(self, **kwds) -> str:
+        return 'parent'
+
+
+class TestActiveResolution(TestCase):
+    """Tests the cached resolution of active components and responders."""
+
+    def setUp(self) -> None:
+        self.app = ConsoleApp('Test App')
+        self.parent = _Parent(app=self.app)
+
+    def test_active_components_follow_child_state(self):
+        self.assertEqual(self.parent.active_components, [self.parent, self.parent.leaf])
+        self.parent.leaf.current_state = 'other'
+        self.assertEqual(self.parent.active_components, [self.parent, self.parent.other_leaf])
+        self.assertEqual(len(self.parent.active_marker_arg_responders), 1)
+
+    def test_resolution_is_reused_while_nothing_changes(self):
+        first = self.parent.active_components
+        self.assertIs(self.parent.active_components, first)
+        self.parent.leaf.current_state = 'main'  # Not a change.
+        self.assertIs(self.parent.active_components, first)
+
+    def test_configuring_responders_invalidates_resolution(self):
+        self.assertIsNone(self.parent.active_argless_responder)
+        self.parent.leaf.configure(responders=[self.parent.leaf.configure_responder(lambda: None)])
+        self.assertIsNotNone(self.parent.active_argless_responder)
+
+    def test_duplicate_argless_responders_raise_on_access(self):
+        self.parent.configure(responders=[self.parent.configure_responder(lambda: None)])
+        self.parent.leaf.configure(responders=[self.parent.leaf.configure_responder(lambda: None)])
+        with self.assertRaises(exceptions.DuplicateArglessResponderError):
+            _ = self.parent.active_argless_responder
+        self.assertEqual(self.parent.active_marker_arg_responders, [])
+
+
+class TestMarkerDispatch(TestCase):
+    """Tests the compiled marker dispatch table."""
+
+    def setUp(self) -> None:
+        self.app = ConsoleApp('Test App')
+        self.component = _Leaf(app=self.app)
+        self.called = []
+
+    def make_responder(self, name: str, *markers: str):
+        return self.component.configure_responder(lambda: self.called.append(name), args=[
+            PrimaryArg(name=name, accepts_value=False, markers=list(markers))
+        ])
+
+    def test_matching_responder_is_resolved_from_many(self):
+        self.component.configure(responders=[self.make_responder('cmd{}'.format(i), '-cmd{}'.format(i))
+                                             for i in range(200)])
+        matches = self.component.match_marker_responders('-cmd150')
+        self.assertEqual(len(matches), 1)
+        matches[0].respond('-cmd150')
+        self.assertEqual(self.called, ['cmd150'])
+
+    def test_local_marker_collision_raises_at_configure(self):
+        with self.assertRaises(exceptions.IdenticalPrimaryMarkersError):
+            self.component.configure(responders=[
+                self.make_responder('one', '-x', '-one'),
+                self.make_responder('two', '-two', '-x')
+            ])
+
+    def test_marker_collision_across_tree_raises_when_route_is_built(self):
+        class Colliding(_Parent):
+            def __init__(self, **kwds):
+                super().__init__(**kwds)
+                self.leaf.current_state = 'other'
+                self.configure(responders=[self.configure_responder(lambda: None, args=[
+                    PrimaryArg(name='go', accepts_value=False, markers=['-go'])
+                ])])
+
+        self.app.configure(routes={'home': Colliding})
+        with self.assertRaises(exceptions.IdenticalPrimaryMarkersError):
+            self.app.build_routes()
+
+    def test_marker_collision_in_inactive_nested_state_raises_when_route_is_built(self):
+        class Widget(_Leaf):
+            def __init__(self, **kwds):
+                super().__init__(**kwds)
+                self.inner = self.use_component(_Leaf)
+                self.inner.delegate_state('alt', _LeafWithResponder)
+
+        class Page(_Leaf):
+            def __init__(self, **kwds):
+                super().__init__(**kwds)
+                self.use_component(Widget)
+                self.configure(responders=[self.configure_responder(lambda: None, args=[
+                    PrimaryArg(name='go', accepts_value=False, markers=['-go'])
+                ])])
+
+        self.app.configure(routes={'home': Page})
+        with self.assertRaises(exceptions.IdenticalPrimaryMarkersError):
+            self.app.build_routes()
+
+    def test_sibling_states_may_share_markers(self):
+        class Page(_LeafWithResponder):
+            def __init__(self, **kwds):
+                super().__init__(**kwds)
+                self.delegate_state('alt', _LeafWithResponder)
+
+        self.app.configure(routes={'home': Page})
+        self.app.build_routes()
+
+    def test_many_multi_state_children_are_checked_quickly(self):
+        class Page(_Leaf):
+            def __init__(self, **kwds):
+                super().__init__(**kwds)
+                # 2 ** 40 combinations of states, so they mustn't be enumerated;
+                for _ in range(40):
+                    self.use_component(_Leaf).delegate_state('alt', _Leaf)
+                self.use_component(_LeafWithResponder)
+                self.use_component(_Leaf).delegate_state('alt', _LeafWithResponder)
+
+        self.app.configure(routes={'home': Page})
+        with self.assertRaises(exceptions.IdenticalPrimaryMarkersError):
+            self.app.build_routes()
+
+
+class _RouteLabel(Component):
+    render_dependencies = ('route',)
+
+    def __init__(self, **kwds):
+        super().__init__(**kwds)
+        self.prints = 0
+
+    def printer(self, **kwds) -> str:
+        self.prints += 1
+        return self.app.current_route
+
+
+class _Frame(Component):
+    render_dependencies = ()
+
+    def __init__(self, **kwds):
+        super().__init__(**kwds)
+        self.label = self.use_component(_RouteLabel)
+        self.uncached = self.label.delegate_state('uncached', _Leaf)
+
+    def printer(self, content: str = '', **kwds) -> str:
+        return '[{}] {}'.format(self.label.get_sibling().render(), content)
+
+
+class TestRenderCache(TestCase):
+    """Tests reusing component views until their dependencies change."""
+
+    def setUp(self) -> None:
+        self.app = ConsoleApp('Test App')
+        self.app.configure(routes={'one': _Frame, 'two': _Frame})
+        self.app.current_route = 'one'
+        self.frame = self.app.get_component(_Frame, 'one')
+
+    def test_view_is_reused_until_dependency_changes(self):
+        self.assertEqual(self.frame.render(content='a'), '[one] a')
+        self.assertEqual(self.frame.render(content='a'), '[one] a')
+        self.assertEqual(self.frame.render_cache_stats, {'hits': 1, 'misses': 1})
+        self.app.current_route = 'two'
+        self.assertEqual(self.frame.render(content='a'), '[two] a')
+        self.assertEqual(self.frame.label.prints, 2)
+
+    def test_printer_kwds_are_part_of_the_key(self):
+        self.frame.render(content='a')
+        self.assertEqual(self.frame.render(content='b'), '[one] b')
+        self.assertEqual(self.frame.label.render_cache_hits, 1)
+
+    def test_invalidate_forces_a_fresh_render(self):
+        self.frame.render()
+        self.frame.label.invalidate()
+        self.frame.render()
+        self.assertEqual(self.frame.label.prints, 2)
+        self.assertEqual(self.frame.render_cache_hits, 0)
+
+    def test_uncached_child_disables_parent_cache(self):
+        self.frame.label.current_state = 'uncached'
+        self.frame.render()
+        self.frame.render()
+        self.assertEqual(self.frame.render_cache_stats, {'hits': 0, 'misses': 0})
+
+    def test_subclasses_do_not_inherit_caching(self):
+        class Subclass(_Frame):
+            pass
+
+        class Declared(_Frame):
+            render_dependencies = ('state',)
+
+        self.assertIsNone(Subclass.render_dependencies)
+        self.assertEqual(Declared.render_dependencies, ('state',))
+        self.assertEqual(_Frame.render_dependencies, ())
+
+    def test_plain_mode_is_part_of_the_key(self):
+        self.addCleanup(styles.set_plain, None)
+        styles.set_plain(False)
+        self.frame.render()
+        styles.set_plain(True)
+        self.frame.render()
+        self.assertEqual(self.frame.render_cache_stats, {'hits': 0, 'misses': 2})
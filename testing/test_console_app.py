@@ -0,0 +1,471 @@
+import asyncio
+import io
+import threading
+import time
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import TestCase, mock
+
+from pyconsoleapp import ConsoleApp, Component, GuardComponent, PrimaryArg, configs, exceptions, validators
+from pyconsoleapp.builtin_components import NavOptionsComponent
+
+
+class _Page(Component):
+    def printer(self, **kwds) -> str:
+        return 'page'
+
+
+class _Guard(GuardComponent):
+    def printer(self, **kwds) -> str:
+        return 'guard'
+
+
+class TestGuardResolution(TestCase):
+    """Tests resolving the active guard for the current route."""
+
+    def setUp(self) -> None:
+        self.app = ConsoleApp('Test App')
+        self.app.configure(routes={route: _Page for route in (
+            'todos', 'todos.edit', 'todos.edit.notes', 'todos.list', 'todos2', 'todos2.edit', 'other')})
+
+    def go_to(self, route: str):
+        self.app.current_route = route
+        return self.app._get_active_guard()
+
+    def test_exit_guard_is_inactive_within_route(self):
+        guard = self.app.guard_exit('todos.edit', _Guard)
+        self.assertIsNone(self.go_to('todos.edit'))
+        self.assertIsNone(self.go_to('todos.edit.notes'))
+        self.assertIs(self.go_to('todos'), guard)
+        self.assertIs(self.go_to('other'), guard)
+
+    def test_routes_sharing_a_prefix_are_distinct(self):
+        exit_guard = self.app.guard_exit('todos2', _Guard)
+        self.assertIs(self.go_to('todos'), exit_guard)
+        self.app.clear_guard(exit_guard)
+        entrance_guard = self.app.guard_entrance('todos', _Guard)
+        self.assertIsNone(self.go_to('todos2.edit'))
+        self.assertIs(self.go_to('todos.edit'), entrance_guard)
+
+    def test_deepest_entrance_guard_wins_over_exit_guard(self):
+        self.app.guard_exit('other', _Guard)
+        self.app.guard_entrance('todos', _Guard)
+        deep_guard = self.app.guard_entrance('todos.edit', _Guard)
+        self.assertIs(self.go_to('todos.edit.notes'), deep_guard)
+
+    def test_shallowest_exit_guard_outside_route_wins(self):
+        self.app.guard_exit('todos.edit.notes', _Guard)
+        shallow_guard = self.app.guard_exit('todos.list', _Guard)
+        self.assertIs(self.go_to('other'), shallow_guard)
+
+    def test_clear_guard_removes_every_registration(self):
+        guard = self.app.guard_entrance('todos', _Guard)
+        self.app._guard_trie.set_exit_guard('other', guard)
+        guard.stop_guarding()
+        self.assertIsNone(self.go_to('todos'))
+        self.assertIsNone(self.go_to('todos2'))
+
+    def test_activation_is_cached_until_refreshed(self):
+        active = [False]
+        guard = self.app.guard_entrance('todos', _Guard)
+        guard.configure(should_activate=lambda: active[0])
+        self.assertIsNone(self.go_to('todos'))
+        active[0] = True
+        self.assertIsNone(self.go_to('todos'))
+        self.app.refresh_guards()
+        self.assertIs(self.go_to('todos'), guard)
+
+
+class _Counter(Component):
+    def __init__(self, **kwds):
+        super().__init__(**kwds)
+        self.total = 0
+        self.loads = 0
+        self.configure(responders=[
+            self.configure_responder(self._on_add, args=[
+                PrimaryArg(name='amount', accepts_value=True, markers=['-add'],
+                           validators=[validators.validate_integer])
+            ]),
+            self.configure_responder(self.app.quit, args=[
+                PrimaryArg(name='quit', accepts_value=False, markers=['-quit'])
+            ])
+        ])
+
+    def on_load(self) -> None:
+        self.loads += 1
+
+    def _on_add(self, amount: int) -> None:
+        self.total += amount
+
+    def printer(self, **kwds) -> str:
+        return 'Total: {}'.format(self.total)
+
+
+class TestRunScript(TestCase):
+    """Tests running responses headlessly."""
+
+    def setUp(self) -> None:
+        self.app = ConsoleApp('Test App')
+        self.app.configure(routes={'counter': _Counter})
+        self.app.current_route = 'counter'
+        self.counter = self.app.get_component(_Counter, 'counter')
+
+    def run_script(self, lines, **kwds):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            self.app.run_script(lines, **kwds)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_responses_run_and_render_once_at_end(self):
+        stdout, stderr = self.run_script(['-add 2\n', '-add 3\n'])
+        self.assertEqual(self.counter.total, 5)
+        self.assertEqual(stdout, 'Total: 5\n')
+        self.assertEqual(stderr, '')
+
+    def test_errors_are_reported_with_line_numbers(self):
+        _, stderr = self.run_script(['-add 1', '-add x', 'nonsense'], render_at_end=False)
+        self.assertEqual(stderr, 'Line 2: Input must be an integer.\nLine 3: This response isn\'t recognised.\n')
+
+    def test_rendering_each_response_loads_once_per_response(self):
+        stdout, _ = self.run_script(['-add 2', '-add 3'], render_each_response=True, render_at_end=False)
+        self.assertEqual(stdout, 'Total: 0\nTotal: 2\n')
+        self.assertEqual(self.counter.loads, 2)
+
+    def test_quit_stops_the_script(self):
+        stdout, _ = self.run_script(['-add 1', '-quit', '-add 1'])
+        self.assertEqual(self.counter.total, 1)
+        self.assertEqual(stdout, '')
+
+
+class _AsyncCounter(_Counter):
+    def __init__(self, **kwds):
+        super().__init__(**kwds)
+        self.first_loaded = False
+        self.configure(responders=[
+            self.configure_responder(self._on_double, args=[
+                PrimaryArg(name='double', accepts_value=False, markers=['-double'])
+            ])
+        ])
+
+    async def on_first_load(self) -> None:
+        await asyncio.sleep(0)
+        self.first_loaded = True
+
+    async def _on_double(self) -> None:
+        await asyncio.sleep(0)
+        self.total *= 2
+
+
+class TestAsync(TestCase):
+    """Tests async responders and load methods."""
+
+    def setUp(self) -> None:
+        self.app = ConsoleApp('Test App')
+        self.app.configure(routes={'counter': _AsyncCounter})
+        self.app.current_route = 'counter'
+        self.counter = self.app.get_component(_AsyncCounter, 'counter')
+
+    def test_async_responder_completes_from_sync_loop(self):
+        self.app._process_response('-add 2')
+        self.app._process_response('-double')
+        self.assertEqual(self.counter.total, 4)
+
+    def test_run_async_awaits_responders_and_hooks(self):
+        hook_totals = []
+
+        async def hook():
+            await asyncio.sleep(0)
+            hook_totals.append(self.counter.total)
+
+        self.app.register_frame_hook(hook)
+        stdin, stdout = io.StringIO('-add 3\n-double\n-add x\n'), io.StringIO()
+        stderr = io.StringIO()
+        with mock.patch('sys.stdin', stdin), redirect_stdout(stdout), redirect_stderr(stderr):
+            asyncio.run(self.app.run_async())
+        self.assertEqual(hook_totals, [3, 6, 6, 6])
+        self.assertTrue(self.counter.first_loaded)
+        self.assertEqual(self.counter.total, 6)
+        self.assertEqual(stdout.getvalue(), 'Total: 6\n')
+        self.assertEqual(stderr.getvalue(), 'Line 3: Input must be an integer.\n')
+
+    def test_run_async_draws_and_collects_responses_interactively(self):
+        stdin, stdout = mock.Mock(), io.StringIO()
+        stdin.isatty.return_value = True
+        responses = mock.Mock(side_effect=['-add 3', '-double', '-quit'])
+        with mock.patch('sys.stdin', stdin), mock.patch('pyconsoleapp.console_app._write_to_screen', responses), \
+                redirect_stdout(stdout):
+            asyncio.run(self.app.run_async())
+        self.assertEqual(self.counter.total, 6)
+        self.assertEqual(responses.call_count, 3)
+        self.assertEqual(responses.call_args_list[1], mock.call(view='Total: 3', prefill=None))
+
+    def test_async_hooks_are_rejected_when_run_synchronously(self):
+        async def hook():
+            pass
+
+        self.app.register_frame_hook(hook)
+        with redirect_stdout(io.StringIO()), self.assertRaises(exceptions.AsyncFrameHookError):
+            self.app.run_script(['-add 1'])
+
+    def test_sync_call_inside_running_loop_fails_clearly(self):
+        async def process():
+            self.app._process_response('-double')
+
+        with self.assertRaises(exceptions.RunningLoopError):
+            asyncio.run(process())
+
+
+class TestCommandBatches(TestCase):
+    """Tests running several commands from a single response."""
+
+    def setUp(self) -> None:
+        self.app = ConsoleApp('Test App')
+        self.app.configure(routes={'counter': _Counter})
+        self.app.current_route = 'counter'
+        self.counter = self.app.get_component(_Counter, 'counter')
+
+    def test_each_command_runs_without_reloading(self):
+        self.app._process_response('-add 1; -add 2;; -add 3;')
+        self.assertEqual(self.counter.total, 6)
+        self.assertEqual(self.counter.loads, 0)
+        self.assertIsNone(self.app.error_message)
+
+    def test_errors_are_reported_per_command(self):
+        self.app._process_response('-add x; -add 2; -add y')
+        self.assertEqual(self.counter.total, 2)
+        self.assertEqual(self.app.error_message,
+                         '[1] -add x: Input must be an integer. [3] -add y: Input must be an integer.')
+
+    def test_text_containing_the_separator_is_one_command(self):
+        self.app._process_response('-add 1; nonsense')
+        self.assertEqual(self.counter.total, 0)
+        self.assertEqual(self.app.error_message, 'Input must be an integer.')
+
+    def test_quit_ends_the_batch(self):
+        self.app._process_response('-add 1; -quit; -add 1')
+        self.assertEqual(self.counter.total, 1)
+
+    def test_job_errors_applied_mid_batch_are_kept(self):
+        self.app.configure(routes={'jobs': _JobPage})
+        self.app.get_component(_JobPage, 'jobs')
+        self.app.current_route = 'jobs'
+        self.app.jobs.call_on_main_thread(lambda: setattr(self.app, 'error_message', 'Job failed.'))
+        self.app._process_response('-next; -add 2')
+        self.assertEqual(self.counter.total, 2)
+        self.assertEqual(self.app.error_message, 'Job failed.')
+
+
+class _JobPage(Component):
+    """Shows the app's info message, or the progress of its jobs, above the prompt."""
+
+    def __init__(self, **kwds):
+        super().__init__(**kwds)
+        self.release = threading.Event()
+        self.configure(responders=[
+            self.configure_responder(self._on_start, args=[
+                PrimaryArg(name='start', accepts_value=False, markers=['-start'])
+            ]),
+            self.configure_responder(lambda: self.app.go_to('counter'), args=[
+                PrimaryArg(name='next', accepts_value=False, markers=['-next'])
+            ]),
+            self.configure_responder(self.app.quit, args=[
+                PrimaryArg(name='quit', accepts_value=False, markers=['-quit'])
+            ])
+        ])
+
+    def _on_start(self) -> None:
+        self.app.submit_job(self.release.wait, 5, description='Work')
+
+    def printer(self, **kwds) -> str:
+        progress = ', '.join(job.progress_text for job in self.app.jobs.running_jobs)
+        return '{message}\n> '.format(message=self.app.info_message or progress)
+
+
+class TestJobRefresh(TestCase):
+    """Tests the view is redrawn while background jobs run and the prompt waits."""
+
+    def setUp(self) -> None:
+        self.app = ConsoleApp('Test App')
+        self.app.configure(routes={'jobs': _JobPage})
+        self.app.current_route = 'jobs'
+        self.page = self.app.get_component(_JobPage, 'jobs')
+        self.app._terminal._plain = False
+
+    def tearDown(self) -> None:
+        self.app.jobs.shutdown(wait=True)
+
+    def run_app(self, run) -> str:
+        """Runs the app, starting a job at the first prompt, and returns what had been drawn by the time the
+        job's outcome appeared while the second prompt was waiting."""
+        stdin, stdout = mock.Mock(), io.StringIO()
+        stdin.isatty.return_value = True
+        drawn = []
+
+        def finish_job():
+            self.page.release.set()
+            deadline = time.monotonic() + 5
+            while 'Work finished.' not in stdout.getvalue() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            drawn.append(stdout.getvalue())
+            return '-quit'
+
+        responses = iter([lambda: '-start', finish_job])
+        with mock.patch('sys.stdin', stdin), redirect_stdout(stdout), \
+                mock.patch('pyconsoleapp.console_app._write_to_screen', lambda view, prefill: next(responses)()), \
+                mock.patch.object(configs, 'job_refresh_interval', 0.01):
+            run()
+        return drawn[0]
+
+    def test_finished_job_is_drawn_while_prompt_waits(self):
+        self.assertIn('\x1b7\x1b[1;1HWork finished.\x1b[K\x1b8', self.run_app(self.app.run))
+
+    def test_finished_job_is_drawn_while_prompt_waits_under_run_async(self):
+        self.assertIn('\x1b7\x1b[1;1HWork finished.\x1b[K\x1b8',
+                      self.run_app(lambda: asyncio.run(self.app.run_async())))
+
+
+class TestInstrumentation(TestCase):
+    """Tests timing the run loop's phases."""
+
+    def setUp(self) -> None:
+        self.app = ConsoleApp('Test App')
+        self.app.configure(routes={'counter': _Counter})
+        self.app.current_route = 'counter'
+        self.app.instrumentation.enabled = True
+
+    def test_phases_are_tagged_with_route_and_responder(self):
+        stderr = io.StringIO()
+        with mock.patch.object(configs, 'instrumentation_report_path', None), redirect_stdout(io.StringIO()), \
+                redirect_stderr(stderr):
+            self.app.run_script(['-add 1', '-add 2'])
+        self.assertIn('responder[responder=_Counter._on_add,route=counter]', stderr.getvalue())
+        stats = self.app.instrumentation.stats
+        self.assertEqual(stats['responder[responder=_Counter._on_add,route=counter]'].count, 2)
+        self.assertEqual(stats['on_load[component=_Counter,route=counter]'].count, 3)
+        self.assertEqual(stats['render[component=_Counter,route=counter]'].count, 1)
+
+    def test_hidden_commands_need_instrumentation_enabled(self):
+        with mock.patch.object(self.app, 'dump_instrumentation') as dump:
+            self.app._hidden_commands['::stats'] = dump
+            self.app._process_response('::stats')
+            dump.assert_called_once()
+            self.app.instrumentation.enabled = False
+            self.app._process_response('::stats')
+            dump.assert_called_once()
+        self.assertEqual(self.app.error_message, 'This response isn\'t recognised.')
+
+
+class _Counted(_Page):
+    built = 0
+
+    def __init__(self, **kwds):
+        super().__init__(**kwds)
+        type(self).built += 1
+
+
+class _NeedsOther(_Page):
+    def __init__(self, **kwds):
+        super().__init__(**kwds)
+        self.other = self.app.get_component(_Page, 'other')
+
+
+class _Cyclic(_Page):
+    def __init__(self, **kwds):
+        super().__init__(**kwds)
+        self.app.get_component(_Page, 'cycle.b' if self.app._routes_being_built[-1] == 'cycle.a' else 'cycle.a')
+
+
+class TestLazyRoutes(TestCase):
+    """Tests route components are only built when first needed."""
+
+    def setUp(self) -> None:
+        _Counted.built = 0
+        self.app = ConsoleApp('Test App')
+
+    def test_routes_are_built_on_first_use(self):
+        self.app.configure(routes={'route{}'.format(i): _Counted for i in range(200)})
+        self.app.current_route = 'route5'
+        self.assertEqual(_Counted.built, 0)
+        self.assertIs(self.app._get_active_component(), self.app.get_component(_Counted, 'route5'))
+        self.assertEqual(_Counted.built, 1)
+
+    def test_components_can_get_other_routes_while_being_built(self):
+        self.app.configure(routes={'needs_other': _NeedsOther, 'other': _Page})
+        component = self.app.get_component(_NeedsOther, 'needs_other')
+        self.assertIs(component.other, self.app.get_component(_Page, 'other'))
+
+    def test_cycles_raise_partially_initialised_error(self):
+        self.app.configure(routes={'cycle.a': _Cyclic, 'cycle.b': _Cyclic})
+        with self.assertRaises(exceptions.PartiallyInitialisedError):
+            self.app.get_component(_Cyclic, 'cycle.a')
+        # The failed build isn't left half registered;
+        self.assertEqual(self.app._routes_being_built, [])
+        self.assertNotIn('cycle.a', self.app._route_component_map)
+
+    def test_routes_are_built_on_configure_when_validating(self):
+        with mock.patch.object(configs, 'validate_routes_on_configure', True):
+            self.app.configure(routes={'route{}'.format(i): _Counted for i in range(3)})
+        self.assertEqual(_Counted.built, 3)
+        with mock.patch.object(configs, 'validate_routes_on_configure', True):
+            with self.assertRaises(exceptions.PartiallyInitialisedError):
+                self.app.configure(routes={'cycle.a': _Cyclic, 'cycle.b': _Cyclic})
+
+
+class _RouteParamsPage(_Page):
+    instances = 0
+
+    def __init__(self, **kwds):
+        super().__init__(**kwds)
+        _RouteParamsPage.instances += 1
+
+    def printer(self, **kwds) -> str:
+        return 'item {item_id}'.format(item_id=self.app.route_params['item_id'])
+
+
+class _NavPage(_Page):
+    def __init__(self, **kwds):
+        super().__init__(**kwds)
+        self.use_component(NavOptionsComponent)
+
+
+class TestParameterisedRoutes(TestCase):
+    """Tests routes with parameters, which share one component between every concrete route."""
+
+    def setUp(self) -> None:
+        _RouteParamsPage.instances = 0
+        self.app = ConsoleApp('Test App')
+        self.app.configure(routes={'items': _Page, 'items.<item_id>': _RouteParamsPage})
+        self.app.current_route = 'items'
+
+    def test_concrete_routes_share_one_component(self):
+        for item_id in range(100):
+            self.app.go_to('items.{}'.format(item_id))
+            self.assertEqual(self.app._load_active_component().render(), 'item {}'.format(item_id))
+        self.assertEqual(_RouteParamsPage.instances, 1)
+        self.assertEqual(self.app.current_route_pattern, 'items.<item_id>')
+        self.assertEqual(self.app.route_params, {'item_id': '99'})
+
+    def test_unmatched_route_is_invalid(self):
+        self.assertFalse(self.app.has_route('items.1.notes'))
+        with self.assertRaises(exceptions.InvalidRouteError):
+            self.app.go_to('items.1.notes')
+
+    def test_history_remembers_parameters(self):
+        for route in ('items.1', 'items.2', 'items'):
+            self.app.go_to(route)
+            self.app._historise_route(self.app.current_route)
+        self.app.go_back()
+        self.assertEqual(self.app.current_route, 'items.2')
+        self.assertEqual(self.app.route_params, {'item_id': '2'})
+
+    def test_guards_apply_to_concrete_routes(self):
+        guard = self.app.guard_exit('items.1', _Guard)
+        self.app.go_to('items.1')
+        self.assertIsNone(self.app._get_active_guard())
+        self.app.go_to('items.2')
+        self.assertIs(self.app._get_active_guard(), guard)
+
+    def test_back_skips_routes_which_only_exist_within_longer_routes(self):
+        self.app.configure(routes={'items.<item_id>.notes.<note_id>': _NavPage})
+        self.app.current_route = 'items.1.notes.2'
+        self.app.run_script(['-b'], render_at_end=False)
+        self.assertEqual(self.app.current_route, 'items.1')
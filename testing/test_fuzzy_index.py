@@ -0,0 +1,54 @@
+import random
+import string
+from difflib import SequenceMatcher
+from heapq import nlargest
+from unittest import TestCase
+
+from pyconsoleapp import utils
+from pyconsoleapp.fuzzy_index import FuzzyIndex
+
+
+def _rank_by_scanning(words, search_term, num_results):
+    """Ranks the words as get_n_best_matches originally did, by scoring every one of them."""
+    scores = utils.score_similarity(words, search_term)
+    return nlargest(num_results, scores, key=scores.get)
+
+
+class TestFuzzyIndex(TestCase):
+    """Tests the fuzzy index ranks entries exactly as scoring every entry would."""
+
+    def setUp(self) -> None:
+        self.rng = random.Random(0)
+
+    def random_text(self, alphabet: str, max_length: int) -> str:
+        return ''.join(self.rng.choice(alphabet) for _ in range(self.rng.randint(0, max_length)))
+
+    def test_matches_scanning_every_word(self):
+        for _ in range(500):
+            # Small alphabets give plenty of ties, which must still be ranked by first appearance;
+            alphabet = self.rng.choice(['ab', 'abcd', string.ascii_lowercase])
+            words = [self.random_text(alphabet, 8) for _ in range(self.rng.randint(0, 60))]
+            search_term = self.random_text(alphabet + 'xyz', 6)
+            num_results = self.rng.randint(0, 70)
+            self.assertEqual(utils.get_n_best_matches(words, search_term, num_results),
+                             _rank_by_scanning(words, search_term, num_results))
+
+    def test_stays_exact_as_entries_change(self):
+        index, texts = FuzzyIndex(), {}
+        for step in range(2000):
+            key = self.rng.randrange(40)
+            if key in texts and self.rng.random() < 0.4:
+                index.remove(key)
+                del texts[key]
+            else:
+                texts[key] = self.random_text('abcde', 6)
+                index.add(key, texts[key])
+            if step % 50 == 0:
+                search_term = self.random_text('abcdef', 5)
+                expected = sorted(texts, key=lambda k: (-SequenceMatcher(None, search_term, texts[k]).ratio(),
+                                                        index._orders[k]))
+                self.assertEqual(index.best_matches(search_term, 5), expected[:5])
+        for key in texts:
+            index.remove(key)
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index._postings, {})
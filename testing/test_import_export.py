@@ -0,0 +1,112 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import todo_app
+from todo_app import cli, exceptions, service
+from todo_app.sqlite_repository import SqliteTodoRepository
+
+
+class TestImportExport(TestCase):
+    """Tests importing and exporting the todos as CSV and JSON lines files."""
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        service.use_repository(None)
+        self.chunk_size = service.import_chunk_size
+        service.import_chunk_size = 3
+
+    def tearDown(self) -> None:
+        service.import_chunk_size = self.chunk_size
+        if service.repository is not None:
+            service.repository.close()
+        service.use_repository(None)
+        todo_app.app.jobs.shutdown(wait=True)
+        self.directory.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def write(self, name: str, content: str) -> str:
+        with open(self.path(name), 'w', encoding='utf-8') as f:
+            f.write(content)
+        return self.path(name)
+
+    @staticmethod
+    def values():
+        return [(t.id, t.text, t.today, t.importance) for t in service.todos]
+
+    def test_csv_import(self):
+        path = self.write('todos.csv', 'importance,text,today\n2,milk,true\n\n,"eggs, free range",\n3,jam,0\n'
+                                       '1,bread,Yes\n')
+        progress = []
+        self.assertEqual(service.import_todos(path, on_progress=lambda *args: progress.append(args)), 4)
+        self.assertEqual(self.values(), [(1, 'milk', True, 2), (2, 'eggs, free range', False, 1),
+                                         (3, 'jam', False, 3), (4, 'bread', True, 1)])
+        self.assertEqual([count for _, count in progress], [3, 4])
+        self.assertEqual(progress[-1][0], 1.0)
+
+    def test_jsonl_import(self):
+        path = self.write('todos.jsonl', '{"text": "milk", "today": true, "importance": 2}\n\n'
+                                         '{"text": "eggs ✓"}\n{"text": "jam", "importance": "3"}\n')
+        self.assertEqual(service.import_todos(path), 3)
+        self.assertEqual(self.values(), [(1, 'milk', True, 2), (2, 'eggs ✓', False, 1), (3, 'jam', False, 3)])
+
+    def test_invalid_row_names_its_line_and_keeps_earlier_chunks(self):
+        path = self.write('todos.csv', 'text,importance\na,1\nb,2\nc,3\nd,1\ne,4\n')
+        with self.assertRaisesRegex(exceptions.InvalidTodoFileError, 'Line 6 has an invalid importance score'):
+            service.import_todos(path)
+        self.assertEqual([t.text for t in service.todos], ['a', 'b', 'c'])
+        path = self.write('todos.jsonl', '{"text": "a"}\nnot json\n')
+        with self.assertRaisesRegex(exceptions.InvalidTodoFileError, 'Line 2 has no text'):
+            service.import_todos(path)
+        with self.assertRaises(exceptions.InvalidTodoFileError):
+            service.import_todos(self.write('todos.csv', 'name\nmilk\n'))
+        with self.assertRaises(exceptions.InvalidTodoFileError):
+            service.import_todos(self.write('todos.txt', 'milk\n'))
+
+    def test_export_round_trips(self):
+        for num in range(7):
+            service.add_todo('todo, "{}"'.format(num), today=num % 2 == 0, importance=num % 3 + 1)
+        service.remove_todo(1)
+        exported = self.values()
+        for name in ('todos.csv', 'todos.jsonl'):
+            self.assertEqual(service.export_todos(self.path(name)), 6)
+            service.use_repository(None)
+            self.assertEqual(service.import_todos(self.path(name)), 6)
+            self.assertEqual([values[1:] for values in self.values()], [values[1:] for values in exported])
+
+    def test_import_is_persisted_by_the_next_commit(self):
+        service.use_repository(SqliteTodoRepository(self.path('todos.db')))
+        service.import_todos(self.write('todos.csv', 'text\n' + ''.join('{}\n'.format(n) for n in range(10))))
+        reader = SqliteTodoRepository(self.path('todos.db'))
+        self.assertEqual(list(reader.load()), [])
+        service.commit()
+        self.assertEqual(len(list(reader.load())), 10)
+        reader.close()
+        service.repository.close()
+        service.use_repository(SqliteTodoRepository(self.path('todos.db')))
+        self.assertEqual(self.values(), [(n + 1, str(n), False, 1) for n in range(10)])
+
+    def test_menu_commands_run_as_jobs(self):
+        menu = todo_app.app.get_component(cli.TodoMenuComponent, 'todos')
+        path = self.write('todos.csv', 'text\nmilk\neggs\n')
+        todo_app.app._process_response('-import {}'.format(path))
+        todo_app.app.jobs.wait_for_all()
+        self.assertEqual(todo_app.app.info_message, 'Imported 2 todos.')
+        self.assertIn('eggs', menu.printer())
+        todo_app.app._process_response('-export {}'.format(self.path('out.jsonl')))
+        todo_app.app.jobs.wait_for_all()
+        self.assertEqual(todo_app.app.info_message, 'Exported 2 todos.')
+        self.assertTrue(os.path.isfile(self.path('out.jsonl')))
+        todo_app.app._process_response('-import {}'.format(self.path('missing.csv')))
+        self.assertEqual(todo_app.app.error_message, 'There is no file at {}.'.format(self.path('missing.csv')))
+
+    def test_menu_paths_keep_their_spaces(self):
+        path = self.write('my  todos.csv', 'text\nmilk\n')
+        todo_app.app._process_response('-import {}'.format(path))
+        todo_app.app.jobs.wait_for_all()
+        self.assertEqual(todo_app.app.info_message, 'Imported 1 todos.')
+        todo_app.app._process_response('-export {} '.format(self.path('out  -add.jsonl')))
+        todo_app.app.jobs.wait_for_all()
+        self.assertTrue(os.path.isfile(self.path('out  -add.jsonl')))
@@ -0,0 +1,57 @@
+from unittest import TestCase
+
+from pyconsoleapp.instrumentation import Instrumentation, PhaseStats
+
+
+class TestPhaseStats(TestCase):
+    """Tests aggregating the timings of a phase."""
+
+    def test_percentiles_and_max(self):
+        stats = PhaseStats()
+        for ms in range(1, 101):
+            stats.record(ms / 1000)
+        self.assertEqual(stats.count, 100)
+        self.assertAlmostEqual(stats.p50_s, 0.050)
+        self.assertAlmostEqual(stats.p95_s, 0.095)
+        self.assertAlmostEqual(stats.max_s, 0.100)
+
+    def test_percentiles_use_recent_samples_only(self):
+        stats = PhaseStats(max_samples=10)
+        for seconds in [100.0] * 10 + [1.0] * 10:
+            stats.record(seconds)
+        self.assertEqual(stats.count, 20)
+        self.assertEqual(stats.p95_s, 1.0)
+        self.assertEqual(stats.max_s, 100.0)
+
+
+class TestInstrumentation(TestCase):
+    """Tests timing phases and profiling frames."""
+
+    def test_disabled_phases_are_not_recorded(self):
+        instrumentation = Instrumentation()
+        with instrumentation.phase('render', route='home'):
+            pass
+        self.assertEqual(instrumentation.stats, {})
+
+    def test_phases_are_aggregated_by_name_and_tags(self):
+        instrumentation = Instrumentation(enabled=True)
+        timings = []
+        instrumentation.add_hook(lambda name, tags, seconds: timings.append((name, tags)))
+        for route in ('home', 'home', 'todos'):
+            with instrumentation.phase('render', route=route):
+                pass
+        self.assertEqual(instrumentation.stats['render[route=home]'].count, 2)
+        self.assertEqual(instrumentation.stats['render[route=todos]'].count, 1)
+        self.assertEqual(timings[-1], ('render', {'route': 'todos'}))
+        self.assertIn('render[route=home]', instrumentation.report())
+
+    def test_only_the_requested_frame_is_profiled(self):
+        instrumentation = Instrumentation(enabled=True)
+        instrumentation.start_frame()
+        self.assertIsNone(instrumentation.end_frame())
+        instrumentation.profile_next_frame()
+        instrumentation.start_frame()
+        sorted(range(10))
+        self.assertIsNotNone(instrumentation.end_frame())
+        instrumentation.start_frame()
+        self.assertIsNone(instrumentation.end_frame())
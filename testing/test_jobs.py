@@ -0,0 +1,51 @@
+import threading
+from unittest import TestCase
+
+from pyconsoleapp import ConsoleApp
+
+
+class TestJobs(TestCase):
+    """Tests running callables as background jobs."""
+
+    def setUp(self) -> None:
+        self.app = ConsoleApp('Test App')
+
+    def tearDown(self) -> None:
+        self.app.jobs.shutdown(wait=True)
+
+    def test_finished_job_reports_on_main_thread(self):
+        job = self.app.submit_job(lambda: 42, description='Answer')
+        self.assertEqual(self.app.jobs.running_jobs, [job])
+        self.app.jobs.wait_for_all()
+        self.assertEqual(self.app.info_message, 'Answer finished.')
+        self.assertEqual(self.app.jobs.running_jobs, [])
+
+    def test_on_done_receives_result(self):
+        results = []
+        self.app.submit_job(sum, [1, 2, 3], description='Sum', on_done=results.append)
+        self.app.jobs.wait_for_all()
+        self.assertEqual(results, [6])
+
+    def test_failed_job_shows_error(self):
+        self.app.submit_job(int, 'x', description='Parse')
+        self.app.jobs.wait_for_all()
+        self.assertTrue(self.app.error_message.startswith('Parse failed:'))
+
+    def test_job_reports_progress_and_can_be_cancelled(self):
+        started = threading.Event()
+        progress_seen = threading.Event()
+
+        def work(job):
+            job.report_progress(0.5, 'halfway')
+            started.set()
+            progress_seen.wait(5)
+            job.check_cancelled()
+            job.post_info('Should not be seen.')
+
+        job = self.app.submit_job(work, description='Work', pass_job=True)
+        started.wait(5)
+        self.assertEqual(job.progress_text, '50% halfway')
+        job.cancel()
+        progress_seen.set()
+        self.app.jobs.wait_for_all()
+        self.assertEqual(self.app.info_message, 'Work was cancelled.')
@@ -0,0 +1,69 @@
+import os
+from unittest import TestCase
+
+from todo_app import service
+from todo_app.journal_repository import JournalTodoRepository
+from todo_repository_tests import TodoRepositoryTests
+
+
+class _SmallJournalRepository(JournalTodoRepository):
+    _compact_after_bytes = 256  # Compact often, to exercise it.
+
+
+class TestJournalTodoRepository(TodoRepositoryTests, TestCase):
+    """Tests persisting the todos as a snapshot and journal, through the service."""
+
+    def open_repository(self) -> JournalTodoRepository:
+        return _SmallJournalRepository(self.directory.name)
+
+    def test_uncommitted_changes_are_lost(self):
+        service.add_todo('milk', today=False, importance=1)
+        service.commit()
+        service.add_todo('eggs', today=False, importance=1)
+        service.repository._pending.clear()  # As if the app had crashed before the frame ended.
+        self.reopen()
+        self.assertEqual([t.text for t in service.todos], ['milk'])
+
+    def test_torn_record_is_dropped(self):
+        service.add_todo('milk', today=False, importance=1)
+        service.add_todo('eggs', today=False, importance=1)
+        service.commit()
+        journal_path = service.repository._journal_path(service.repository._generation)
+        service.repository.close()
+        with open(journal_path, 'r+b') as f:
+            f.truncate(os.path.getsize(journal_path) - 2)
+        service.use_repository(self.open_repository())
+        self.assertEqual([t.text for t in service.todos], ['milk'])
+        service.add_todo('jam', today=False, importance=1)
+        service.commit()
+        self.reopen()
+        self.assertEqual([t.text for t in service.todos], ['milk', 'jam'])
+
+    def test_compaction_folds_journals_into_snapshot(self):
+        for num in range(200):
+            service.add_todo('todo {}'.format(num), today=num % 2 == 0, importance=num % 3 + 1)
+            if num % 3 == 0:
+                service.remove_todo(1)
+            service.commit()
+        service.repository.compact(wait=True)
+        expected = self.snapshot()
+        names = os.listdir(self.directory.name)
+        self.assertIn('snapshot', names)
+        self.assertEqual(len([name for name in names if name.startswith('journal.')]), 1)
+        self.reopen()
+        self.assertEqual(self.snapshot(), expected)
+
+    def test_replaying_a_journal_twice_is_harmless(self):
+        service.add_todo('milk', today=False, importance=1)
+        service.add_todo('eggs', today=False, importance=1)
+        service.remove_todo(1)
+        service.commit()
+        repository = service.repository
+        journal_path = repository._journal_path(repository._generation)
+        with open(journal_path, 'rb') as f:
+            records = f.read()
+        repository.compact(wait=True)
+        with open(repository._journal_path(repository._generation), 'ab') as f:
+            f.write(records)
+        self.reopen()
+        self.assertEqual(self.snapshot(), [(2, 'eggs', False, 1)])
@@ -0,0 +1,141 @@
+import gc
+import os
+import tempfile
+from unittest import TestCase
+
+from todo_app import Todo, exceptions, service
+from todo_app.mapped_todo_store import MappedTodoStore, write_mapped_todos
+
+
+def _todos(count: int):
+    for todo_id in range(1, count + 1):
+        todo = Todo(text='todo {} ✓'.format(todo_id), today=todo_id % 2 == 0, importance=todo_id % 3 + 1)
+        todo.id = todo_id
+        todo.saved = True
+        yield todo
+
+
+class TestMappedTodoStore(TestCase):
+    """Tests the store which reads its todos from a memory mapped file."""
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'todos.tdc')
+        write_mapped_todos(self.path, _todos(100))
+        self.store = MappedTodoStore(self.path)
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self.directory.cleanup()
+
+    def values(self):
+        return [(t.id, t.text, t.today, t.importance) for t in self.store]
+
+    def test_rows_read_back_as_written(self):
+        self.assertEqual(self.values(), [(t.id, t.text, t.today, t.importance) for t in _todos(100)])
+        self.assertEqual(self.store.get(42).text, 'todo 42 ✓')
+        self.assertTrue(self.store.at(0).saved)
+
+    def test_todos_are_only_held_while_used(self):
+        todo = self.store.at(5)
+        self.assertIs(self.store.get(6), todo)
+        del todo
+        gc.collect()
+        self.assertEqual(len(self.store._materialised), 0)
+
+    def test_matches_a_list_under_removes_and_appends(self):
+        expected = list(_todos(100))
+        for index in (0, 50, 50, 96, 10, 10, 10):
+            self.assertEqual(self.store.remove_at(index).id, expected.pop(index).id)
+        for text in ('a', 'b'):
+            self.store.append(Todo(text=text))
+        self.assertEqual([t.id for t in self.store], [t.id for t in expected] + [101, 102])
+        self.assertEqual([self.store.at(i).id for i in range(len(self.store))], [t.id for t in self.store])
+        with self.assertRaises(exceptions.InvalidTodoIdError):
+            self.store.get(1)
+        with self.assertRaises(exceptions.InvalidTodoNumError):
+            self.store.insert(0, Todo(text='c'))
+
+    def test_save_writes_changes_back(self):
+        self.store.remove_at(99)
+        self.store.append(Todo(text='new'))
+        service.use_store(self.store)
+        try:
+            todo = service.fetch_todo_by_id(3)
+            service.edit_todo(todo, 'edited', today=True, importance=3)
+            del todo
+            gc.collect()
+            self.assertEqual(service.search_todos('edited', 1)[0].id, 3)
+        finally:
+            service.use_store(service.TodoStore())
+        self.store.save()
+        self.assertEqual(len(self.store), 100)
+        self.assertEqual((self.store.get(3).text, self.store.get(3).today), ('edited', True))
+        self.assertEqual(self.store.at(99).id, 101)
+        self.assertEqual(self.store.append(Todo(text='next')), 102)
+
+    def reopen(self) -> None:
+        self.store.close()
+        self.store = MappedTodoStore(self.path)
+
+    def test_committed_changes_survive_reopening_without_rewriting_the_file(self):
+        size = os.path.getsize(self.path)
+        service.use_store(self.store)
+        try:
+            service.commit()
+            self.assertFalse(os.path.exists(self.path + '.delta'))  # Nothing changed, so nothing was written.
+            todo = service.fetch_todo(3)
+            service.edit_todo(todo, 'edited', today=True, importance=3)
+            service.save_todo(todo)
+            service.remove_todo(1)
+            service.add_todo('added', today=False, importance=2)
+            service.commit()
+            service.edit_todo(service.fetch_todo(100), 'added, then edited', today=True, importance=1)
+            service.commit()
+        finally:
+            service.use_store(service.TodoStore())
+        self.assertEqual(os.path.getsize(self.path), size)
+        expected = self.values()
+        self.reopen()
+        self.assertEqual(self.values(), expected)
+        self.assertEqual(len(self.store), 100)
+        self.assertEqual(self.store.get(3).text, 'edited')
+        self.assertEqual(self.store.at(99).text, 'added, then edited')
+        self.assertEqual(self.store.append(Todo(text='next')), 102)
+
+    def test_torn_delta_record_is_dropped(self):
+        self.store.append(Todo(text='a'))
+        self.store.flush()
+        self.store.append(Todo(text='b'))
+        self.store.flush()
+        with open(self.path + '.delta', 'r+b') as f:
+            f.truncate(os.path.getsize(self.path + '.delta') - 2)
+        self.reopen()
+        self.assertEqual(self.store.at(100).text, 'a')
+        self.assertEqual(len(self.store), 101)
+        self.store.append(Todo(text='c'))
+        self.store.flush()
+        self.reopen()
+        self.assertEqual([t.text for t in self.store.iter_range(100)], ['a', 'c'])
+
+    def test_save_folds_the_delta_into_the_file(self):
+        self.store.remove_at(0)
+        self.store.append(Todo(text='a'))
+        self.store.flush()
+        with open(self.path + '.delta', 'rb') as f:
+            delta = f.read()
+        self.store.save()
+        self.assertFalse(os.path.exists(self.path + '.delta'))
+        expected = self.values()
+        # A delta left behind by a crash part way through saving is already in the file, so does nothing;
+        with open(self.path + '.delta', 'wb') as f:
+            f.write(delta)
+        self.reopen()
+        self.assertEqual(self.values(), expected)
+
+    def test_empty_file(self):
+        write_mapped_todos(self.path + '2', [])
+        store = MappedTodoStore(self.path + '2')
+        self.assertEqual(len(store), 0)
+        self.assertEqual(store.append(Todo(text='first')), 1)
+        store.close()
@@ -283,3 +283,65 @@ class TestParseResponse(TestCase):
                 PrimaryArg(name=self.argname(1), accepts_value=False, markers=[self.m(1)], default_value=True),
                 PrimaryArg(name=self.argname(2), accepts_value=True, markers=[self.m(2)])
             ])
+
+    def test_error_when_marker_shared_between_args(self):
+        with self.assertRaises(exceptions.DuplicateMarkerError):
+            _ = Responder(self.app, self.func, args=[
+                PrimaryArg(name=self.argname(0), accepts_value=True, markers=[self.m(0)]),
+                OptionalArg(name=self.argname(1), accepts_value=True, markers=[self.m(1), self.m(0)])
+            ])
+
+    def test_value_before_marker_without_markerless_arg_raises_exception(self):
+        response = self.build_response('vs1-m0-vs0')
+        responder = Responder(self.app, self.func, args=[
+            PrimaryArg(name=self.argname(0), accepts_value=True, markers=[self.m(0)])
+        ])
+        with self.assertRaises(exceptions.OrphanValueError):
+            _ = responder._parse_response(response)
+
+    def test_long_value_is_parsed_intact(self):
+        long_value = ' '.join(['word'] * 10000)
+        response = '{} {} {}'.format(self.m(1), self.m(0), long_value)
+        responder = Responder(self.app, self.func, args=[
+            PrimaryArg(name=self.argname(0), accepts_value=True, markers=[self.m(0)]),
+            OptionalArg(name=self.argname(1), accepts_value=False, markers=[self.m(1)])
+        ])
+        correct_args = {
+            self.argname(0): long_value,
+            self.argname(1): True
+        }
+        parsed_args = responder._parse_response(response)
+        self.assertEqual(parsed_args, correct_args)
+
+    def test_raw_value_takes_the_rest_of_the_response_as_typed(self):
+        responder = Responder(self.app, self.func, args=[
+            PrimaryArg(name=self.argname(0), accepts_value=True, markers=[self.m(0)], raw_value=True),
+            OptionalArg(name=self.argname(1), accepts_value=False, markers=[self.m(1)])
+        ])
+        parsed_args = responder._parse_response('{} {}  my   file {} .csv  '.format(self.m(1), self.m(0), self.m(1)))
+        self.assertEqual(parsed_args, {
+            self.argname(0): 'my   file {} .csv'.format(self.m(1)),
+            self.argname(1): True
+        })
+        with self.assertRaises(exceptions.ArgMissingValueError):
+            responder._parse_response('{} '.format(self.m(0)))
+        with self.assertRaises(exceptions.InvalidArgConfigError):
+            OptionalArg(name=self.argname(1), accepts_value=False, markers=[self.m(1)], raw_value=True)
+
+
+class TestRespond(TestCase):
+    """Tests calling the responder function."""
+
+    def setUp(self) -> None:
+        self.app = ConsoleApp('Test App')
+
+    def test_args_are_reset_after_failed_parse(self):
+        received = []
+        responder = Responder(self.app, lambda text, flag: received.append((text, flag)), args=[
+            PrimaryArg(name='text', accepts_value=True, markers=['-t']),
+            OptionalArg(name='flag', accepts_value=False, markers=['-f'])
+        ])
+        with self.assertRaises(exceptions.ArgMissingValueError):
+            responder.respond('-f -t')
+        responder.respond('-t hello')
+        self.assertEqual(received, [('hello', False)])
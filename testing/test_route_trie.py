@@ -0,0 +1,43 @@
+from unittest import TestCase
+
+from pyconsoleapp import exceptions
+from pyconsoleapp.route_trie import RouteTrie
+
+
+class TestRouteTrie(TestCase):
+    """Tests matching concrete routes against route patterns."""
+
+    def setUp(self) -> None:
+        self.trie = RouteTrie()
+        for pattern in ('todos', 'todos.edit.<todo_id>', 'todos.edit.new', 'todos.edit.<todo_id>.notes.<note_id>'):
+            self.trie.add(pattern)
+
+    def test_parameters_are_captured(self):
+        self.assertEqual(self.trie.match('todos.edit.42'), ('todos.edit.<todo_id>', {'todo_id': '42'}))
+        self.assertEqual(self.trie.match('todos.edit.42.notes.7'),
+                         ('todos.edit.<todo_id>.notes.<note_id>', {'todo_id': '42', 'note_id': '7'}))
+
+    def test_fixed_segments_win_over_parameters(self):
+        self.assertEqual(self.trie.match('todos.edit.new'), ('todos.edit.new', {}))
+
+    def test_falls_back_to_parameter_when_fixed_branch_does_not_match(self):
+        self.trie.add('todos.edit.new.draft')
+        self.assertEqual(self.trie.match('todos.edit.new.notes.1'),
+                         ('todos.edit.<todo_id>.notes.<note_id>', {'todo_id': 'new', 'note_id': '1'}))
+
+    def test_unmatched_routes_return_none(self):
+        self.assertIsNone(self.trie.match('todos.edit'))
+        self.assertIsNone(self.trie.match('todos.edit.'))
+        self.assertIsNone(self.trie.match('other'))
+
+    def test_remove_prunes_pattern(self):
+        self.trie.remove('todos.edit.<todo_id>.notes.<note_id>')
+        self.assertIsNone(self.trie.match('todos.edit.42.notes.7'))
+        self.assertNotIn('todos.edit.<todo_id>.notes.<note_id>', self.trie)
+        self.assertIn('todos.edit.<todo_id>', self.trie)
+
+    def test_conflicting_parameter_names_raise(self):
+        with self.assertRaises(exceptions.InvalidRouteError):
+            self.trie.add('todos.edit.<id>.history')
+        with self.assertRaises(exceptions.InvalidRouteError):
+            self.trie.add('pairs.<a>.<a>')
@@ -0,0 +1,23 @@
+import os
+from unittest import TestCase
+
+from todo_app import service
+from todo_app.sqlite_repository import SqliteTodoRepository
+from todo_repository_tests import TodoRepositoryTests
+
+
+class TestSqliteTodoRepository(TodoRepositoryTests, TestCase):
+    """Tests persisting the todos in SQLite, through the service."""
+
+    def open_repository(self) -> SqliteTodoRepository:
+        return SqliteTodoRepository(os.path.join(self.directory.name, 'todos.db'))
+
+    def test_only_committed_changes_are_persisted(self):
+        service.add_todo('milk', today=False, importance=1)
+        service.commit()
+        service.add_todo('eggs', today=False, importance=1)
+        reader = self.open_repository()
+        self.assertEqual([t.text for t in reader.load()], ['milk'])
+        service.commit()
+        self.assertEqual([t.text for t in reader.load()], ['milk', 'eggs'])
+        reader.close()
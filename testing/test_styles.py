@@ -0,0 +1,50 @@
+import os
+from unittest import TestCase, mock
+
+from pyconsoleapp import styles
+
+
+class TestStyles(TestCase):
+    """Tests styling text with escape codes, and leaving it plain."""
+
+    def tearDown(self) -> None:
+        styles.set_plain(None)
+
+    def test_styles_are_cached(self):
+        self.assertIs(styles.style(fore='red', weight='bright'), styles.style(fore='red', weight='bright'))
+
+    def test_text_is_wrapped_in_one_prefix_and_suffix(self):
+        styles.set_plain(False)
+        self.assertEqual(styles.styled('hi', fore='red', back='blue', weight='bright'), '\x1b[31;44;1mhi\x1b[0m')
+        self.assertEqual(styles.fore('hi', 'LIGHTGREEN_EX'), '\x1b[92mhi\x1b[0m')
+        self.assertEqual(styles.weight(3, 'bright'), '\x1b[1m3\x1b[0m')
+
+    def test_styles_compose(self):
+        styles.set_plain(False)
+        composed = styles.style(fore='red') + styles.style(weight='bright')
+        self.assertEqual(composed, styles.style(fore='red', weight='bright'))
+        self.assertEqual(composed('hi'), '\x1b[31;1mhi\x1b[0m')
+
+    def test_plain_mode_returns_text_unchanged(self):
+        styles.set_plain(True)
+        self.assertEqual(styles.styled('hi', fore='red', weight='bright'), 'hi')
+        self.assertEqual(styles.back(3, 'blue'), '3')
+
+    def test_plain_mode_follows_no_color(self):
+        with mock.patch.dict(os.environ, {'NO_COLOR': '1'}), mock.patch('sys.stdout.isatty', return_value=True):
+            styles.set_plain(None)
+            self.assertTrue(styles.is_plain())
+        with mock.patch.dict(os.environ, {'NO_COLOR': ''}), mock.patch('sys.stdout.isatty', return_value=True):
+            styles.set_plain(None)
+            self.assertFalse(styles.is_plain())
+
+    def test_plain_mode_when_stdout_is_not_a_tty(self):
+        with mock.patch.dict(os.environ, {'NO_COLOR': ''}), mock.patch('sys.stdout.isatty', return_value=False):
+            styles.set_plain(None)
+            self.assertTrue(styles.is_plain())
+
+    def test_unknown_name_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            styles.style(fore='mauve')
+        with self.assertRaises(ValueError):
+            styles.style(weight='heavy')
@@ -0,0 +1,91 @@
+import io
+import os
+from unittest import TestCase
+
+from pyconsoleapp import terminal
+
+
+class TestTerminalWriter(TestCase):
+    """Tests writing frames to the terminal."""
+
+    def test_frame_is_written_plain_when_not_a_tty(self):
+        stream = io.StringIO()
+        writer = terminal.TerminalWriter(stream=stream)
+        writer.clear()
+        writer.write_frame('frame\n')
+        self.assertEqual(stream.getvalue(), 'frame\n')
+
+    def test_frame_replaces_screen_in_one_write(self):
+        stream = io.StringIO()
+        writes = []
+        stream.write = writes.append
+        writer = terminal.TerminalWriter(stream=stream, plain=False)
+        writer.write_frame('frame\n')
+        self.assertEqual(writes, ['\x1b[H\x1b[2J\x1b[3Jframe\n'])
+
+
+class TestIncrementalRenderer(TestCase):
+    """Tests drawing frames by rewriting only the rows which changed."""
+
+    def setUp(self) -> None:
+        self.stream = io.StringIO()
+        self.size = os.terminal_size((20, 10))
+        self.renderer = terminal.IncrementalRenderer(terminal.TerminalWriter(stream=self.stream, plain=False),
+                                                     get_terminal_size=lambda: self.size)
+
+    def render(self, frame: str) -> str:
+        self.stream.seek(0)
+        self.stream.truncate()
+        self.renderer.render(frame)
+        return self.stream.getvalue()
+
+    def test_only_changed_rows_are_rewritten(self):
+        self.render('title\nbody\nfooter\n')
+        self.assertEqual(self.render('title\nBODY\nfooter\n'), '\x1b[2;1HBODY\x1b[K\x1b[4;1H\x1b[J')
+        self.assertEqual(self.renderer.stats.last_frame_lines, 1)
+        self.assertEqual(self.renderer.stats.full_repaints, 1)
+
+    def test_shrinking_frame_clears_leftover_rows(self):
+        self.render('one\ntwo\nthree\n')
+        self.assertEqual(self.render('one\n'), '\x1b[2;1H\x1b[J')
+
+    def test_full_repaint_when_addressing_cannot_be_trusted(self):
+        self.render('short\n')
+        self.assertTrue(self.render('x' * 21 + '\n').startswith('\x1b[H\x1b[2J'))
+        self.render('short\n')
+        self.assertTrue(self.render('row\n' * 9).startswith('\x1b[H\x1b[2J'))
+        self.render('short\n')
+        self.size = os.terminal_size((30, 10))
+        self.assertTrue(self.render('short\n').startswith('\x1b[H\x1b[2J'))
+
+    def test_full_repaint_after_response_reaches_last_column(self):
+        self.render('short\n')
+        self.renderer.note_response('> ', 'x' * 17)
+        self.assertFalse(self.render('short\n').startswith('\x1b[H\x1b[2J'))
+        self.renderer.note_response('> ', 'x' * 18)
+        self.assertTrue(self.render('short\n').startswith('\x1b[H\x1b[2J'))
+
+    def test_full_repaint_after_other_writes_to_watched_stream(self):
+        watcher = terminal.StreamWatcher(io.StringIO())
+        self.renderer.watcher = watcher
+        self.render('short\n')
+        self.assertFalse(self.render('short\n').startswith('\x1b[H\x1b[2J'))
+        print('from a responder', file=watcher)
+        self.assertTrue(self.render('short\n').startswith('\x1b[H\x1b[2J'))
+        self.assertFalse(self.render('short\n').startswith('\x1b[H\x1b[2J'))
+
+    def test_refresh_rewrites_changed_rows_and_puts_the_cursor_back(self):
+        self.render('title\n50%\nfooter\n')
+        self.stream.seek(0)
+        self.stream.truncate()
+        self.assertTrue(self.renderer.refresh('title\ndone\n'))
+        self.assertEqual(self.stream.getvalue(), '\x1b7\x1b[2;1Hdone\x1b[K\x1b[3;1H\x1b[K\x1b8')
+        # Rows past the end of the last frame are left for the next frame, as the prompt is below it;
+        self.assertTrue(self.renderer.refresh('title\ndone\nfooter\nextra\n'))
+        self.assertEqual(self.render('title\ndone\nfooter\nextra\n'), '\x1b[4;1Hextra\x1b[K\x1b[5;1H\x1b[J')
+
+    def test_refresh_declines_when_the_whole_screen_needs_repainting(self):
+        self.assertFalse(self.renderer.refresh('title\n'))
+        self.render('title\n')
+        self.size = os.terminal_size((30, 10))
+        self.assertFalse(self.renderer.refresh('title\n'))
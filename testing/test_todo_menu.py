@@ -0,0 +1,70 @@
+import io
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import TestCase
+
+import todo_app
+from pyconsoleapp import configs
+from todo_app import cli, service
+
+
+class TestTodoMenu(TestCase):
+    """Tests the todo app's menu and editor, driven through the app."""
+
+    def setUp(self) -> None:
+        service.use_repository(None)
+        todo_app.app.current_route = 'todos'
+        self.terminal_height_lines = configs.terminal_height_lines
+        configs.terminal_height_lines = 50
+        self.menu = todo_app.app.get_component(cli.TodoMenuComponent, 'todos')
+
+    def tearDown(self) -> None:
+        service.use_repository(None)
+        todo_app.app.current_route = 'todos'
+        todo_app.app.info_message = None
+        configs.terminal_height_lines = self.terminal_height_lines
+
+    def run_script(self, lines):
+        stderr = io.StringIO()
+        with redirect_stdout(io.StringIO()), redirect_stderr(stderr):
+            todo_app.app.run_script(lines, render_at_end=False)
+        return stderr.getvalue()
+
+    def test_text_containing_the_command_separator_is_kept_whole(self):
+        self.assertEqual(self.run_script(['-add buy milk; eggs and bread']), '')
+        self.assertEqual([todo.text for todo in service.todos], ['buy milk; eggs and bread'])
+        self.assertEqual(self.run_script(['-edit 1', 'milk; eggs --save']), '')
+        self.assertEqual(service.fetch_todo(1).text, 'milk; eggs')
+
+    def test_commands_starting_with_markers_are_batched(self):
+        self.assertEqual(self.run_script(['-add milk; -add eggs --today']), '')
+        self.assertEqual([(todo.text, todo.today) for todo in service.todos], [('milk', False), ('eggs', True)])
+
+    def rows_drawn(self) -> int:
+        """Returns the rows the menu takes; the view, with the prompt on its last row, and the row the cursor
+        moves to when enter is pressed."""
+        self.menu.on_load()
+        return self.menu.printer().count('\n') + 2
+
+    def test_page_fills_the_screen(self):
+        for num in range(100):
+            service.add_todo(text='todo {}'.format(num), today=False, importance=1)
+        self.assertEqual(self.rows_drawn(), 50)
+        todo_app.app.info_message = 'A message\nover two rows.'
+        self.assertEqual(self.rows_drawn(), 50)
+
+    def test_long_todos_wrap_without_overflowing_the_screen(self):
+        for num in range(100):
+            service.add_todo(text=' '.join(['long'] * 60), today=num % 2 == 0, importance=1)
+        self.assertEqual(self.rows_drawn(), 50)
+        self.menu._on_go_to_page(self.menu._num_pages)
+        self.assertLessEqual(self.rows_drawn(), 50)
+        self.assertIn(' ...', self.menu.printer())
+        # Alone on a page, a long todo wraps onto as many rows as it needs;
+        service.use_repository(None)
+        service.add_todo(text=' '.join(['long'] * 60), today=False, importance=1)
+        self.assertLess(self.rows_drawn(), 50)
+        self.assertEqual(self.menu.printer().count('long'), 60)
+
+    def test_every_route_builds(self):
+        # Routes are built lazily, so build them all here to catch mistakes in any of them;
+        todo_app.app.build_routes()
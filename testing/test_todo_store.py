@@ -0,0 +1,69 @@
+import random
+from unittest import TestCase
+
+from todo_app import Todo, exceptions
+from todo_app.todo_store import TodoStore
+
+
+class _SmallChunkStore(TodoStore):
+    _chunk_size = 4  # Split and drop chunks often, to exercise the index.
+
+
+class TestTodoStore(TestCase):
+    """Tests the ordered, indexed todo store."""
+
+    def setUp(self) -> None:
+        self.store = _SmallChunkStore()
+
+    def test_matches_a_list_under_random_edits(self):
+        rng = random.Random(0)
+        expected = []
+        for step in range(2000):
+            if expected and rng.random() < 0.4:
+                index = rng.randrange(len(expected))
+                self.assertIs(self.store.remove_at(index), expected.pop(index))
+            else:
+                index = rng.randint(0, len(expected))
+                todo = Todo(text=str(step))
+                self.store.insert(index, todo)
+                expected.insert(index, todo)
+            if step % 100 == 0:
+                self.assertEqual(list(self.store), expected)
+                self.assertEqual([self.store.at(i) for i in range(len(expected))], expected)
+        self.assertEqual(list(self.store.iter_range(3, 40)), expected[3:40])
+
+    def test_ids_are_stable(self):
+        first_id = self.store.append(Todo(text='first'))
+        self.store.insert(0, Todo(text='zeroth'))
+        self.assertEqual(self.store.get(first_id).text, 'first')
+        self.store.remove_at(1)
+        with self.assertRaises(exceptions.InvalidTodoIdError):
+            self.store.get(first_id)
+
+    def test_out_of_range_positions_are_rejected(self):
+        self.store.append(Todo(text='only'))
+        for index in (-1, 1):
+            with self.assertRaises(exceptions.InvalidTodoNumError):
+                self.store.at(index)
+
+    def test_numbered_view_reads_through(self):
+        numbered = self.store.numbered()
+        for text in 'abcdefghij':
+            self.store.append(Todo(text=text))
+        self.assertEqual(numbered[1].text, 'a')
+        self.assertNotIn(0, numbered)
+        self.assertEqual([(num, todo.text) for num, todo in numbered.items_between(9, 20)], [(9, 'i'), (10, 'j')])
+        self.store.remove_at(0)
+        self.assertEqual(len(numbered), 9)
+        self.assertEqual([num for num, _ in numbered.items()], list(range(1, 10)))
+        self.assertEqual(numbered[1].text, 'b')
+
+    def test_search_follows_edits(self):
+        for text in ('buy milk', 'walk dog', 'pay bills'):
+            self.store.append(Todo(text=text))
+        self.assertEqual(self.store.search('milk', 1)[0].text, 'buy milk')
+        todo = self.store.at(1)
+        todo.text = 'buy milkshake'
+        self.store.reindex(todo)
+        self.store.remove_at(0)
+        self.assertEqual([t.text for t in self.store.search('milk', 2)], ['buy milkshake', 'pay bills'])
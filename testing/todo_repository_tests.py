@@ -0,0 +1,74 @@
+import tempfile
+
+import todo_app
+from todo_app import Todo, cli, service
+from todo_app.repository import TodoRepository
+
+
+class TodoRepositoryTests:
+    """Tests every todo repository must pass, persisting the todos through the service. Mixed into a TestCase
+    for each repository class, which opens the repository in open_repository()."""
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.reopen()
+
+    def tearDown(self) -> None:
+        service.repository.close()
+        service.use_repository(None)
+        self.directory.cleanup()
+
+    def open_repository(self) -> TodoRepository:
+        """Returns the repository under test, persisting the todos in self.directory."""
+        raise NotImplementedError
+
+    def reopen(self) -> None:
+        if service.repository is not None:
+            service.repository.close()
+        service.use_repository(self.open_repository())
+
+    def snapshot(self):
+        return [(t.id, t.text, t.today, t.importance) for t in service.todos]
+
+    def test_todos_survive_reopening(self):
+        service.add_todo('milk', today=True, importance=2)
+        service.add_todo('eggs', today=False, importance=1)
+        service.add_todo('bread', today=False, importance=3)
+        service.remove_todo(2)
+        todo = service.fetch_todo(1)
+        service.edit_todo(todo, 'oat milk', today=False, importance=3)
+        service.save_todo(todo)
+        service.commit()
+        self.reopen()
+        self.assertEqual(self.snapshot(), [(1, 'oat milk', False, 3), (3, 'bread', False, 3)])
+        self.assertTrue(all(t.saved for t in service.todos))
+        service.add_todo('jam', today=False, importance=1)
+        self.assertEqual(service.fetch_todo(3).id, 4)
+
+    def test_add_many_inserts_in_one_batch(self):
+        repository = service.repository
+        todos = [Todo(text=str(i)) for i in range(1, 1001)]
+        for todo_id, todo in enumerate(todos, start=1):
+            todo.id = todo_id
+        repository.add_many(todos)
+        repository.commit()
+        self.reopen()
+        self.assertEqual(service.count_todos(), 1000)
+        self.assertEqual(service.fetch_todo_by_id(1000).text, '1000')
+
+    def test_save_check_saves_edits(self):
+        service.add_todo('milk', today=False, importance=1)
+        todo = service.fetch_todo(1)
+        app = todo_app.app
+        app.register_frame_hook(service.commit)
+        try:
+            app.current_route = 'todos'
+            app.run_script(['-e 1', 'oat milk', '-q'], render_at_end=False)
+            self.assertIsInstance(app._get_active_component(), cli.TodoSaveCheckComponent)
+            app._quit = False
+            app.run_script(['-y'], render_at_end=False)
+        finally:
+            app.unregister_frame_hook(service.commit)
+        self.assertTrue(todo.saved)
+        self.reopen()
+        self.assertEqual(service.fetch_todo(1).text, 'oat milk')
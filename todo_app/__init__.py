@@ -8,7 +8,7 @@ app = ConsoleApp('Todo App')
 # Configure some todo_app routes;
 app.configure(routes={
     'todos': cli.TodoMenuComponent,
-    'todos.edit': cli.TodoEditorComponent
+    'todos.edit.<todo_id>': cli.TodoEditorComponent
 })
 # Configure the route to start with;
 app.current_route = 'todos'
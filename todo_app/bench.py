@@ -0,0 +1,195 @@
+"""Benchmark scenarios for the todo app's store, repositories and menu. They are added to pyconsoleapp's own
+scenarios and run by its benchmark runner, or --memory measures the memory held per todo.
+
+Usage:
+    python -m todo_app.bench [--filter TEXT] [--output FILE] [--compare BASELINE_FILE] [--repeat N]
+    python -m todo_app.bench --memory [--todos 1000000] [--json]
+"""
+import argparse
+import collections
+import functools
+import json
+import os
+import sys
+import tempfile
+from typing import Any, Callable, Iterator, List, Tuple
+
+import todo_app
+from pyconsoleapp.bench import memory
+from pyconsoleapp.bench import __main__ as runner
+from pyconsoleapp.bench.scenarios import scenario
+from todo_app import Todo, cli, service
+from todo_app.journal_repository import JournalTodoRepository
+from todo_app.mapped_todo_store import MappedTodoStore, write_mapped_todos
+from todo_app.sqlite_repository import SqliteTodoRepository
+
+
+def _numbered_todos(count: int) -> Iterator[Todo]:
+    """Yields the count todos, numbered from 1, with their ids already given."""
+    for num in range(count):
+        todo = Todo(text='Todo number {}'.format(num), today=num % 7 == 0, importance=num % 3 + 1)
+        todo.id = num + 1
+        yield todo
+
+
+@scenario('todo_menu.printer', todos=[10, 1000, 100000])
+def todo_menu_printer_setup(todos: int) -> Callable[[], Any]:
+    service.todos.clear()
+    for num in range(todos):
+        service.add_todo(text='Todo number {}'.format(num), today=num % 7 == 0, importance=num % 3 + 1)
+    menu = todo_app.app.get_component(cli.TodoMenuComponent, 'todos')
+
+    def print_menu():
+        menu.on_load()
+        return menu.printer()
+
+    return print_menu
+
+
+@scenario('sqlite_repository.insert', todos=[10000, 1000000])
+def sqlite_repository_insert_setup(todos: int) -> Callable[[], Any]:
+    directory = tempfile.TemporaryDirectory()  # Removed along with the closure.
+    path = os.path.join(directory.name, 'todos.db')
+    to_insert = list(_numbered_todos(todos))
+
+    def insert():
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        repository = SqliteTodoRepository(path)
+        repository.add_many(to_insert)
+        repository.close()
+        return directory
+
+    return insert
+
+
+@scenario('sqlite_repository.load', todos=[10000, 1000000])
+def sqlite_repository_load_setup(todos: int) -> Callable[[], Any]:
+    directory = tempfile.TemporaryDirectory()  # Removed along with the closure.
+    repository = SqliteTodoRepository(os.path.join(directory.name, 'todos.db'))
+    repository.add_many(_numbered_todos(todos))
+    repository.commit()
+
+    def load():
+        collections.deque(repository.load(), maxlen=0)
+        return directory
+
+    return load
+
+
+@scenario('journal_repository.commit', changes=[1, 100])
+def journal_repository_commit_setup(changes: int) -> Callable[[], Any]:
+    directory = tempfile.TemporaryDirectory()  # Removed along with the closure.
+    repository = JournalTodoRepository(directory.name)
+    to_update = list(_numbered_todos(changes))
+    repository.add_many(to_update)
+    repository.commit()
+
+    def commit():
+        for todo in to_update:
+            repository.update(todo)
+        repository.commit()
+        return directory
+
+    return commit
+
+
+@scenario('journal_repository.load', todos=[10000, 1000000])
+def journal_repository_load_setup(todos: int) -> Callable[[], Any]:
+    directory = tempfile.TemporaryDirectory()  # Removed along with the closure.
+    repository = JournalTodoRepository(directory.name)
+    repository.add_many(_numbered_todos(todos))
+    repository.commit()
+    repository.compact(wait=True)
+    # Leave a journal of recent changes to replay over the snapshot;
+    for todo in _numbered_todos(todos // 10):
+        repository.update(todo)
+    repository.commit()
+
+    def load():
+        collections.deque(repository.load(), maxlen=0)
+        return directory
+
+    return load
+
+
+@scenario('service.import_todos', rows=[10000, 1000000])
+def service_import_todos_setup(rows: int) -> Callable[[], Any]:
+    directory = tempfile.TemporaryDirectory()  # Removed along with the closure.
+    path = os.path.join(directory.name, 'todos.csv')
+    with open(path, 'w', newline='') as f:
+        f.write('text,today,importance\n')
+        f.writelines('Todo number {num},{today},{importance}\n'.format(
+            num=num, today='true' if num % 7 == 0 else 'false', importance=num % 3 + 1) for num in range(rows))
+
+    def import_todos():
+        service.use_repository(None)
+        service.import_todos(path)
+        return directory
+
+    return import_todos
+
+
+@functools.lru_cache()
+def _mapped_todo_file(todos: int) -> Tuple[Any, str]:
+    """Returns a temporary directory holding a mapped todo file of the size, shared between scenarios."""
+    directory = tempfile.TemporaryDirectory()
+    path = os.path.join(directory.name, 'todos.tdc')
+    write_mapped_todos(path, _numbered_todos(todos))
+    return directory, path
+
+
+@scenario('mapped_todo_store.open', todos=[5000000])
+def mapped_todo_store_open_setup(todos: int) -> Callable[[], Any]:
+    directory, path = _mapped_todo_file(todos)
+
+    def open_store():
+        store = MappedTodoStore(path)
+        store.close()
+        return directory
+
+    return open_store
+
+
+@scenario('todo_menu.printer_mapped', todos=[5000000])
+def todo_menu_printer_mapped_setup(todos: int) -> Callable[[], Any]:
+    directory, path = _mapped_todo_file(todos)
+    service.use_store(MappedTodoStore(path))
+    menu = todo_app.app.get_component(cli.TodoMenuComponent, 'todos')
+    menu.on_load()
+    menu._on_go_to_page(menu._num_pages // 2)
+
+    def print_menu():
+        menu.on_load()
+        return menu.printer()
+
+    return print_menu
+
+
+def bytes_per_todo(count: int) -> float:
+    """Returns the bytes allocated and kept per todo, making count todos."""
+    texts = ['Todo number {}'.format(i) for i in range(count)]  # Shared, so only the todo itself is counted.
+    return memory.bytes_per_object(lambda i: Todo(text=texts[i], today=i % 7 == 0, importance=i % 3 + 1), count)
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(prog='python -m todo_app.bench', add_help=False)
+    parser.add_argument('--memory', action='store_true', help='Measure the memory held per todo instead.')
+    parser.add_argument('--todos', type=int, default=1000000, help='Number of todos to make for --memory.')
+    parser.add_argument('--json', action='store_true', help='Write the --memory results to stdout as JSON.')
+    args, runner_args = parser.parse_known_args(argv)
+    if not args.memory:
+        runner.main(runner_args, prog=parser.prog)
+        return
+    report = {'bytes_per_todo': bytes_per_todo(args.todos)}
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+        return
+    for name, value in report.items():
+        print('{name:<22} {value:10.1f}'.format(name=name, value=value))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
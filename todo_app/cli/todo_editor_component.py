@@ -2,14 +2,15 @@ from typing import Optional, TYPE_CHECKING
 
 from pyconsoleapp import Component, PrimaryArg, OptionalArg
 from pyconsoleapp.builtin_components import StandardPageComponent
-from todo_app import cli, service
+from todo_app import cli, service, exceptions
 
 if TYPE_CHECKING:
     from todo_app.todo import Todo
 
 
 class TodoEditorComponent(Component):
-    """Component to edit the specified todo_."""
+    """Component to edit the todo_ whose id is in the route, e.g. todos.edit.42. One instance serves every
+    todo_, so nothing is held per todo_ beyond the route in the history."""
     _template = u'''
 [todo text]
     --today                   \u2502 -> Mark the todo as 'complete today'.
@@ -38,8 +39,18 @@ Update the todo and press enter:
         self._page_component = self.use_component(StandardPageComponent)
         self._page_component.configure(page_title='Todo Editor')
 
+    def on_load(self) -> None:
+        """Fetches the todo_ named by the route, or goes back to the list if there is no such todo_."""
+        try:
+            self._todo = service.fetch_todo_by_id(int(self.app.route_params['todo_id']))
+        except (ValueError, exceptions.InvalidTodoIdError):
+            self._todo = None
+            self.app.error_message = 'There is no todo with id {todo_id}.'.format(
+                todo_id=self.app.route_params['todo_id'])
+            self.app.go_to('todos')
+
     def printer(self, **kwds) -> str:
-        return self._page_component.printer(page_content=self._template)
+        return self._page_component.render(page_content=self._template)
 
     def _get_todo_text(self) -> str:
         """Returns the text from the current todo_."""
@@ -48,9 +59,7 @@ Update the todo and press enter:
     def _on_enter(self, todo_text: str, today: bool, importance_score: int, save: bool):
         """Handler for when user presses enter."""
         self._todo.saved = False
-        self._todo.text = todo_text
-        self._todo.today = today
-        self._todo.importance = importance_score
+        service.edit_todo(self._todo, text=todo_text, today=today, importance=importance_score)
         if save is True:
             service.save_todo(self._todo)
         self.app.go_to('todos')
@@ -58,9 +67,3 @@ Update the todo and press enter:
     def _on_save(self) -> None:
         """Saves the _todo."""
         service.save_todo(self._todo)
-
-    def configure(self, todo: Optional['Todo'] = None, **kwds) -> None:
-        """Places the todo_ instance on the editor."""
-        if todo is not None:
-            self._todo = todo
-        super().configure(**kwds)
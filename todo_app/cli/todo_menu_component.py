@@ -1,11 +1,10 @@
-from typing import Dict, Optional, TYPE_CHECKING
+import math
+import os
+from typing import Optional
 
 from pyconsoleapp import Component, PrimaryArg, OptionalArg, validators, utils, ResponseValidationError, styles
 from pyconsoleapp.builtin_components import StandardPageComponent
-from todo_app import service, cli
-
-if TYPE_CHECKING:
-    from todo_app import Todo
+from todo_app import service, cli, exceptions
 
 
 class TodoMenuComponent(Component):
@@ -16,9 +15,17 @@ class TodoMenuComponent(Component):
     --importance [level: 1-3] \u2502 -> Describes the importance of a todo.
 -remove, -r      [number]     \u2502 -> Remove a todo_item.
 -edit, -e        [number]     \u2502 -> Edit a todo_item.
+-next, -prev                  \u2502 -> Show the next/previous page of todos.
+-page            [number]     \u2502 -> Show the specified page of todos.
+-import          [file]       \u2502 -> Add the todos in a .csv or .jsonl file.
+-export          [file]       \u2502 -> Write the todos to a .csv or .jsonl file.
 (enter)                       \u2502 -> View todo_item dashboard.
+[command]; [command]          \u2502 -> Run several commands at once.
 {single_hr}
 '''
+    _min_page_size = 5
+    _today_style = styles.style(fore='red')
+    _number_style = styles.style(weight='bright')
 
     def __init__(self, **kwds):
         super().__init__(**kwds)
@@ -38,56 +45,177 @@ class TodoMenuComponent(Component):
                 PrimaryArg(name='todo_number', accepts_value=True, markers=['-edit', '-e'],
                            validators=[self._validate_todo_num])
             ]),
+            self.configure_responder(self._on_next_page, args=[
+                PrimaryArg(name='next', accepts_value=False, markers=['-next'])
+            ]),
+            self.configure_responder(self._on_prev_page, args=[
+                PrimaryArg(name='prev', accepts_value=False, markers=['-prev'])
+            ]),
+            self.configure_responder(self._on_go_to_page, args=[
+                PrimaryArg(name='page_num', accepts_value=True, markers=['-page'],
+                           validators=[self._validate_page_num])
+            ]),
+            self.configure_responder(self._on_import_todos, args=[
+                PrimaryArg(name='import_path', accepts_value=True, markers=['-import'], raw_value=True,
+                           validators=[self._validate_import_path])
+            ]),
+            self.configure_responder(self._on_export_todos, args=[
+                PrimaryArg(name='export_path', accepts_value=True, markers=['-export'], raw_value=True,
+                           validators=[self._validate_todo_file_path])
+            ]),
             self.configure_responder(self.get_state_changer('dash'), args=None)
         ])
 
-        self._todo_num_map: Dict[int, 'Todo'] = {}
+        self._page_num: int = 1
 
         self._dash_component = self.delegate_state('dash', TodoDashComponent)
-        self._editor_component: Optional['cli.TodoEditorComponent'] = None
+        self._save_check_component: Optional['cli.TodoSaveCheckComponent'] = None
         self._page_component = self.use_component(StandardPageComponent)
         self._page_component.configure(page_title='Todo List')
 
-    def on_first_load(self) -> None:
-        self._editor_component = self.app.get_component(cli.TodoEditorComponent, 'todos.edit', 'main')
-
     def on_load(self) -> None:
-        self._todo_num_map = utils.make_numbered_map(service.todos)
+        # Keep the page in range, in case todos were removed or the terminal was resized;
+        with service.lock:
+            self._page_num = min(self._page_num, self._num_pages)
 
     def printer(self):
-        return self._page_component.printer(page_content=self._template.format(
-            todos=self._todo_list_view,
+        with service.lock:  # An import may be adding todos in the background.
+            todos = self._todo_list_view
+        return self._page_component.render(page_content=self._template.format(
+            todos=todos,
             single_hr=self.single_hr))
 
+    @property
+    def _page_size(self) -> int:
+        """Returns the number of todos on a page; the rows left for the list, measured from the page drawn
+        without it. Besides the page's own rows, the prompt's row, the row the cursor moves to when enter is
+        pressed and the page number's row are kept free. Pages hold the same number of todos, so any page is
+        found without reading the todos before it."""
+        chrome = self._page_component.render(page_content=self._template.format(todos='', single_hr=self.single_hr))
+        return max(self._min_page_size, self.app.terminal_height - chrome.count('\n') - 3)
+
+    @property
+    def _num_pages(self) -> int:
+        """Returns the number of pages needed to show every todo, which is at least one."""
+        return max(1, math.ceil(service.count_todos() / self._page_size))
+
     @property
     def _todo_list_view(self) -> str:
-        """Returns an enumerated summary of all current _todo's"""
-        view = ''
+        """Returns an enumerated summary of the _todo's on the current page. Only the visible todos are
+        formatted, so the cost doesn't grow with the length of the list. Long todos wrap onto the rows the
+        page has spare, counting the wrapped lines as the page fills, and are cut short where they would push
+        the page past the bottom of the screen."""
         if service.count_todos() == 0:
             return 'No todo\'s to show yet.'
-        else:
-            for num, todo in self._todo_num_map.items():
-                # Make the text red if today;
-                if todo.today:
-                    text = styles.fore(todo.text, 'red')
-                else:
-                    text = todo.text
-                view = view + utils.wrap_text('{number:<3} {todo_text}'.format(
-                    number=styles.weight(str(num), 'bright') + '.',
-                    todo_text=text)) + '\n'
-            return view
+        rows_left = page_size = self._page_size
+        first_num = (self._page_num - 1) * page_size + 1
+        todos = list(service.numbered_todos().items_between(first_num, first_num + page_size - 1))
+        width = self.app.terminal_width
+        today_style, number_style = self._today_style, self._number_style
+        rows = []
+        for index, (num, todo) in enumerate(todos):
+            row = '{number:<3} {todo_text}'.format(number=str(num) + '.', todo_text=todo.text)
+            if len(row) > width:
+                # Leave a row for each todo still to come;
+                row = utils.wrap_text(row, width, max_lines=rows_left - (len(todos) - index - 1))
+            rows_left -= row.count('\n') + 1
+            # Style the number, and make the text red if today;
+            text = row[len(str(num)) + 1:]
+            rows.append(number_style(num) + '.' + (today_style(text) if todo.today else text))
+        num_pages = self._num_pages
+        if num_pages > 1:
+            rows.append('Page {page_num} of {num_pages}.'.format(page_num=self._page_num, num_pages=num_pages))
+        return '\n'.join(rows) + '\n'
 
     def _validate_todo_num(self, value) -> int:
         """Raises ResponseValidationError if number is invalid. Otherwise returns number as int."""
         value = validators.validate_integer(value)
-        if value > len(self._todo_num_map):
+        if value < 1 or value > service.count_todos():
             raise ResponseValidationError('Input must be a number corresponding to a todo.')
         return value
 
+    def _validate_page_num(self, value) -> int:
+        """Raises ResponseValidationError if there is no such page. Otherwise returns page number as int."""
+        value = validators.validate_integer(value)
+        if value < 1 or value > self._num_pages:
+            raise ResponseValidationError('Input must be a page number between 1 and {num_pages}.'.format(
+                num_pages=self._num_pages))
+        return value
+
     @staticmethod
-    def _on_add_todo(todo_text: str, today_flag: bool, importance_score: int) -> None:
-        """Handler function for when a todo_ is added."""
+    def _validate_todo_file_path(value) -> str:
+        """Raises ResponseValidationError if the path isn't to a .csv or .jsonl file. Otherwise returns the path."""
+        try:
+            service.todo_file_format(value)
+        except exceptions.InvalidTodoFileError:
+            raise ResponseValidationError('Input must be the path to a .csv or .jsonl file.')
+        return value
+
+    def _validate_import_path(self, value) -> str:
+        """Raises ResponseValidationError if there is no .csv or .jsonl file at the path. Otherwise returns the
+        path."""
+        value = self._validate_todo_file_path(value)
+        if not os.path.isfile(value):
+            raise ResponseValidationError('There is no file at {path}.'.format(path=value))
+        return value
+
+    def _on_add_todo(self, todo_text: str, today_flag: bool, importance_score: int) -> None:
+        """Handler function for when a todo_ is added. Shows the last page, so the new todo_ is visible."""
         service.add_todo(text=todo_text, today=today_flag, importance=importance_score)
+        self._page_num = self._num_pages
+
+    def _on_next_page(self) -> None:
+        """Handler function to show the next page of todos."""
+        if self._page_num >= self._num_pages:
+            raise ResponseValidationError('This is the last page.')
+        self._page_num += 1
+
+    def _on_prev_page(self) -> None:
+        """Handler function to show the previous page of todos."""
+        if self._page_num <= 1:
+            raise ResponseValidationError('This is the first page.')
+        self._page_num -= 1
+
+    def _on_go_to_page(self, page_num: int) -> None:
+        """Handler function to show the specified page of todos."""
+        self._page_num = page_num
+
+    def _on_import_todos(self, import_path: str) -> None:
+        """Handler function to import the todos in a file. The import runs as a background job, showing its
+        progress in the message bar, and adds the todos a chunk at a time as it goes."""
+        self.app.submit_job(self._import_todos, import_path, pass_job=True, on_done=self._on_todos_imported,
+                            description='Importing {path}'.format(path=import_path))
+
+    @staticmethod
+    def _import_todos(import_path: str, job) -> int:
+        """Imports the todos in the file, reporting progress to the job, and stopping if it is cancelled."""
+        def on_progress(fraction: float, count: int) -> None:
+            job.check_cancelled()
+            job.report_progress(fraction, '{count:,} todos added'.format(count=count))
+
+        return service.import_todos(import_path, on_progress=on_progress)
+
+    def _on_todos_imported(self, count: int) -> None:
+        """Called on the main thread once an import finishes."""
+        self.app.info_message = 'Imported {count:,} todos.'.format(count=count)
+
+    def _on_export_todos(self, export_path: str) -> None:
+        """Handler function to export the todos to a file, as a background job."""
+        self.app.submit_job(self._export_todos, export_path, pass_job=True, on_done=self._on_todos_exported,
+                            description='Exporting to {path}'.format(path=export_path))
+
+    @staticmethod
+    def _export_todos(export_path: str, job) -> int:
+        """Exports the todos to the file, reporting progress to the job, and stopping if it is cancelled."""
+        def on_progress(fraction: float, count: int) -> None:
+            job.check_cancelled()
+            job.report_progress(fraction, '{count:,} todos written'.format(count=count))
+
+        return service.export_todos(export_path, on_progress=on_progress)
+
+    def _on_todos_exported(self, count: int) -> None:
+        """Called on the main thread once an export finishes."""
+        self.app.info_message = 'Exported {count:,} todos.'.format(count=count)
 
     @staticmethod
     def _on_remove_todo(todo_number: int) -> None:
@@ -95,12 +223,15 @@ class TodoMenuComponent(Component):
         service.remove_todo(todo_num=todo_number)
 
     def _on_edit_todo(self, todo_number: int) -> None:
-        """Handler function for when a todo_ is edited."""
+        """Handler function for when a todo_ is edited. Guards the todo_'s editor route, so leaving it with
+        unsaved changes asks to save them, replacing the guard left by the last todo_ edited."""
         t = service.fetch_todo(todo_number)
-        self._editor_component.configure(todo=t)
-        exit_guard = self.app.guard_exit('todos.edit', cli.TodoSaveCheckComponent)
-        exit_guard.configure(todo_to_check=t)
-        self.app.go_to('todos.edit')
+        edit_route = 'todos.edit.{todo_id}'.format(todo_id=t.id)
+        if self._save_check_component is not None:
+            self.app.clear_guard(self._save_check_component)
+        self._save_check_component = self.app.guard_exit(edit_route, cli.TodoSaveCheckComponent)
+        self._save_check_component.configure(todo_to_check=t)
+        self.app.go_to(edit_route)
 
 
 class TodoDashComponent(Component):
@@ -113,6 +244,6 @@ class TodoDashComponent(Component):
         self.page_component.configure(page_title='Dashboard', go_back=self.get_state_changer("main"))
 
     def printer(self, **kwds) -> str:
-        return self.page_component.printer(
+        return self.page_component.render(
             page_content=self._template.format(todo_count=service.count_todos())
         )
@@ -8,3 +8,11 @@ class InvalidTodoNumError(TodoAppException):
 
 class InvalidImportanceScore(TodoAppException):
     """Indicating the importance score is invalid."""
+
+
+class InvalidTodoIdError(TodoAppException):
+    """Indicating no _todo has the id."""
+
+
+class InvalidTodoFileError(TodoAppException):
+    """Indicating a file of todos to import or export is of an unknown format, or holds an invalid row."""
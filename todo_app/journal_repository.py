@@ -0,0 +1,232 @@
+import os
+import re
+import struct
+import threading
+import zlib
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from todo_app.repository import TodoRepository
+from todo_app.todo import Todo
+
+_ADD, _UPDATE, _REMOVE = 1, 2, 3
+# Each record is a CRC, the fixed size fields, then the text in UTF-8. The CRC covers everything after itself,
+# so a record torn by a crash is detected, and it and anything after it is dropped;
+_CRC = struct.Struct('<I')
+_FIELDS = struct.Struct('<BQ?BI')  # Op, todo_ id, today, importance and text length.
+_HEADER = struct.Struct('<IBQ?BI')  # The CRC and the fields, to read them in one go.
+_RECORD_OVERHEAD = _HEADER.size
+# The snapshot holds an add record for every todo_, after a header naming the first journal it doesn't cover;
+_SNAPSHOT_HEADER = struct.Struct('<4sQ')
+_SNAPSHOT_MAGIC = b'TDS1'
+_SNAPSHOT_NAME = 'snapshot'
+_JOURNAL_NAME = re.compile(r'^journal\.(\d+)$')
+
+_State = Dict[int, Tuple[str, bool, int]]  # Each todo_'s text, today flag and importance, keyed on id.
+
+
+def _encode(op: int, todo_id: int, text: str = '', today: bool = False, importance: int = 0) -> bytes:
+    """Returns the record for the change."""
+    encoded_text = text.encode('utf-8')
+    record = _FIELDS.pack(op, todo_id, today, importance, len(encoded_text)) + encoded_text
+    return _CRC.pack(zlib.crc32(record)) + record
+
+
+def _replay(data: bytes, offset: int, state: _State) -> int:
+    """Applies the records in the data, from the offset on, to the state. Returns the offset the intact
+    records end at. Records set or delete a todo_ outright, so replaying one twice does no harm."""
+    view = memoryview(data)
+    unpack_header, crc32, data_length = _HEADER.unpack_from, zlib.crc32, len(data)
+    while offset + _RECORD_OVERHEAD <= data_length:
+        crc, op, todo_id, today, importance, text_length = unpack_header(data, offset)
+        text_start = offset + _RECORD_OVERHEAD
+        end = text_start + text_length
+        if end > data_length or crc32(view[offset + _CRC.size:end]) != crc:
+            break
+        if op == _REMOVE:
+            state.pop(todo_id, None)
+        else:
+            state[todo_id] = (str(view[text_start:end], 'utf-8'), today, importance)
+        offset = end
+    return offset
+
+
+class JournalTodoRepository(TodoRepository):
+    """Persists the todos as a snapshot plus an append-only journal of the changes since, in a directory.
+
+    Changes are encoded as compact records and held in memory until commit(), which appends them to the
+    journal with a single write and fsync, so a frame's changes cost one fsync however many there are. No
+    change ever rewrites the existing data. Once the journal outgrows the snapshot, the journal is rotated,
+    and a background thread folds the old journals into a new snapshot, which replaces the old one
+    atomically. Loading reads the snapshot, then replays the journals written since."""
+
+    _compact_after_bytes: int = 1 << 20  # Journals smaller than this are never compacted.
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: The directory to keep the files in, created if it doesn't exist.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self._directory: str = directory
+        self._lock = threading.RLock()
+        # Held while the files are read, or swapped over by compaction. Compaction only reads files nothing
+        # else writes to, so it doesn't need the main lock until then;
+        self._files_lock = threading.Lock()
+        self._pending = bytearray()
+        self._compaction: Optional[threading.Thread] = None
+        self._snapshot_bytes: int = 0
+        self._journal_bytes: int = 0  # Bytes written to the journals the snapshot doesn't cover.
+        self._generation: int = self._recover()
+        self._journal: BinaryIO = open(self._journal_path(self._generation), 'ab')
+
+    def _journal_path(self, generation: int) -> str:
+        return os.path.join(self._directory, 'journal.{generation:08d}'.format(generation=generation))
+
+    def _journal_generations(self) -> List[int]:
+        """Returns the generations of the journals in the directory, oldest first."""
+        generations = []
+        for name in os.listdir(self._directory):
+            match = _JOURNAL_NAME.match(name)
+            if match is not None:
+                generations.append(int(match.group(1)))
+        return sorted(generations)
+
+    def _read_snapshot(self, state: _State) -> int:
+        """Reads the snapshot into the state, and returns the first journal generation it doesn't cover."""
+        try:
+            with open(os.path.join(self._directory, _SNAPSHOT_NAME), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return 0
+        magic, generation = _SNAPSHOT_HEADER.unpack_from(data)
+        if magic != _SNAPSHOT_MAGIC:
+            raise ValueError('{path} is not a todo snapshot.'.format(path=f.name))
+        _replay(data, _SNAPSHOT_HEADER.size, state)
+        self._snapshot_bytes = len(data)
+        return generation
+
+    def _read_state(self, below_generation: Optional[int] = None) -> _State:
+        """Returns the todos as of the end of the journals, or of the journals before the generation."""
+        state: _State = {}
+        first_generation = self._read_snapshot(state)
+        for generation in self._journal_generations():
+            if generation < first_generation or (below_generation is not None and generation >= below_generation):
+                continue
+            with open(self._journal_path(generation), 'rb') as f:
+                _replay(f.read(), 0, state)
+        return state
+
+    def _recover(self) -> int:
+        """Tidies up after a crash, returning the generation of the journal to append to. Journals already
+        folded into the snapshot are deleted, and a record torn part way through being written is cut from the
+        end of the latest journal, so new records follow on from the last intact one."""
+        first_generation = self._read_snapshot({})
+        generations = self._journal_generations()
+        for generation in generations:
+            if generation < first_generation:
+                os.remove(self._journal_path(generation))
+        generations = [g for g in generations if g >= first_generation]
+        if not generations:
+            return first_generation
+        for generation in generations[:-1]:
+            self._journal_bytes += os.path.getsize(self._journal_path(generation))
+        with open(self._journal_path(generations[-1]), 'r+b') as f:
+            data = f.read()
+            intact_bytes = _replay(data, 0, {})
+            if intact_bytes < len(data):
+                f.truncate(intact_bytes)
+        self._journal_bytes += intact_bytes
+        return generations[-1]
+
+    def load(self) -> Iterator[Todo]:
+        with self._lock, self._files_lock:
+            self._flush()
+            state = self._read_state()
+        for todo_id, (text, today, importance) in state.items():
+            todo = Todo(text=text, today=today, importance=importance)
+            todo.id = todo_id
+            todo.saved = True
+            yield todo
+
+    def add(self, todo: Todo) -> None:
+        with self._lock:
+            self._pending += _encode(_ADD, todo.id, todo.text, todo.today, todo.importance)
+
+    def update(self, todo: Todo) -> None:
+        with self._lock:
+            self._pending += _encode(_UPDATE, todo.id, todo.text, todo.today, todo.importance)
+
+    def remove(self, todo_id: int) -> None:
+        with self._lock:
+            self._pending += _encode(_REMOVE, todo_id)
+
+    def _flush(self) -> None:
+        """Appends the pending records to the journal, and waits for them to reach the disk."""
+        if self._pending:
+            self._journal.write(self._pending)
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._journal_bytes += len(self._pending)
+            self._pending.clear()
+
+    def commit(self) -> None:
+        with self._lock:
+            self._flush()
+            # Compact once the journal is bigger than the snapshot, so the cost of rewriting the snapshot is
+            # spread over at least as many bytes of changes;
+            if self._journal_bytes > max(self._compact_after_bytes, self._snapshot_bytes):
+                self.compact()
+
+    def compact(self, wait: bool = False) -> None:
+        """Starts a fresh journal, and folds the journals before it into a new snapshot on a background
+        thread. Does nothing if a compaction is already running.
+
+        Args:
+            wait: Wait for the compaction to finish.
+        """
+        with self._lock:
+            if self._compaction is None or not self._compaction.is_alive():
+                self._flush()
+                self._journal.close()
+                self._generation += 1
+                self._journal = open(self._journal_path(self._generation), 'ab')
+                self._journal_bytes = 0
+                self._compaction = threading.Thread(target=self._write_snapshot, args=(self._generation,),
+                                                    name='todo-journal-compaction')
+                self._compaction.start()
+            compaction = self._compaction
+        if wait:
+            compaction.join()
+
+    def _write_snapshot(self, generation: int) -> None:
+        """Writes the todos as of the journals before the generation to a new snapshot, then replaces the old
+        snapshot with it and deletes the journals it covers."""
+        state = self._read_state(below_generation=generation)
+        path = os.path.join(self._directory, _SNAPSHOT_NAME)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, generation))
+            f.writelines(_encode(_ADD, todo_id, text, today, importance)
+                         for todo_id, (text, today, importance) in state.items())
+            f.flush()
+            os.fsync(f.fileno())
+            snapshot_bytes = f.tell()
+        with self._files_lock:
+            os.replace(path + '.tmp', path)
+            if os.name != 'nt':  # Make the rename itself durable.
+                directory_fd = os.open(self._directory, os.O_RDONLY)
+                try:
+                    os.fsync(directory_fd)
+                finally:
+                    os.close(directory_fd)
+            self._snapshot_bytes = snapshot_bytes
+            for old_generation in self._journal_generations():
+                if old_generation < generation:
+                    os.remove(self._journal_path(old_generation))
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+        self._journal.close()
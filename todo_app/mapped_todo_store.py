@@ -0,0 +1,366 @@
+import array
+import bisect
+import itertools
+import mmap
+import os
+import struct
+import weakref
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pyconsoleapp.fuzzy_index import FuzzyIndex
+from todo_app import exceptions
+from todo_app.todo import Todo
+from todo_app.todo_store import NumberedTodos
+
+# The file is a header, then a column for each field; the ids, the offset of each text plus the offset the last
+# text ends at, the flags, and then the texts in UTF-8. Numbers are in the native byte order, so the columns are
+# used where they lie in the mapping, and the byte order mark catches a file written on another machine;
+_HEADER = struct.Struct('=4sIQQ')  # Magic, byte order mark, row count and total text bytes.
+_MAGIC = b'TDC1'
+_BYTE_ORDER_MARK = 0x01020304
+_IMPORTANCE_MASK = 0b0011
+_TODAY_FLAG = 0b0100
+_SAVED_FLAG = 0b1000
+# The changes made since the file was last saved are appended to a delta file alongside it, each as a record of
+# a CRC, the fixed size fields and then the text in UTF-8. The CRC covers everything after itself, so a record
+# torn by a crash is dropped. Replaying a record twice does no harm, so a delta left behind by a crash part way
+# through save() is harmless too;
+_DELTA_ADD, _DELTA_UPDATE, _DELTA_REMOVE = 1, 2, 3
+_DELTA_CRC = struct.Struct('<I')
+_DELTA_FIELDS = struct.Struct('<BQQBI')  # Op, todo_ id, index it was added at, flags and text length.
+_DELTA_HEADER = struct.Struct('<IBQQBI')  # The CRC and the fields, to read them in one go.
+_DELTA_SUFFIX = '.delta'
+
+
+def _flags_of(todo: Todo) -> int:
+    """Returns the todo_'s importance, today flag and saved flag, packed into a byte."""
+    return todo.importance & _IMPORTANCE_MASK | (_TODAY_FLAG if todo.today else 0) | (_SAVED_FLAG if todo.saved else 0)
+
+
+def _encode_delta(op: int, todo: Todo, index: int = 0) -> bytes:
+    """Returns the delta record for the change to the todo_."""
+    encoded_text = todo.text.encode('utf-8') if op != _DELTA_REMOVE else b''
+    record = _DELTA_FIELDS.pack(op, todo.id, index, _flags_of(todo), len(encoded_text)) + encoded_text
+    return _DELTA_CRC.pack(zlib.crc32(record)) + record
+
+
+def write_mapped_todos(path: str, todos: Iterable[Todo]) -> None:
+    """Writes the todos to a file in the mapped format. The todos must be in ascending order of id."""
+    ids = array.array('Q')
+    offsets = array.array('Q', [0])
+    flags = bytearray()
+    texts = bytearray()
+    for todo in todos:
+        if ids and todo.id <= ids[-1]:
+            raise ValueError('Todos must be written in ascending order of id.')
+        ids.append(todo.id)
+        texts += todo.text.encode('utf-8')
+        offsets.append(len(texts))
+        flags.append(_flags_of(todo))
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _BYTE_ORDER_MARK, len(ids), len(texts)))
+        ids.tofile(f)
+        offsets.tofile(f)
+        f.write(flags)
+        f.write(texts)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class MappedTodoFile:
+    """Read only access to a file of todos in the mapped format. The file is mapped into memory, and each row
+    is read straight from the mapping when it is asked for, so opening the file costs the same however many
+    rows it holds, and rows which are never read are never paged in."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, byte_order_mark, count, text_bytes = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC or byte_order_mark != _BYTE_ORDER_MARK:
+            self._mmap.close()
+            raise ValueError('{path} is not a todo file written on this machine.'.format(path=path))
+        view = memoryview(self._mmap)
+        offsets_start = _HEADER.size + 8 * count
+        flags_start = offsets_start + 8 * (count + 1)
+        texts_start = flags_start + count
+        self.ids: memoryview = view[_HEADER.size:offsets_start].cast('Q')
+        self._offsets: memoryview = view[offsets_start:flags_start].cast('Q')
+        self._flags: memoryview = view[flags_start:texts_start]
+        self._texts: memoryview = view[texts_start:texts_start + text_bytes]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def text(self, row: int) -> str:
+        """Returns the text of the todo_ in the row."""
+        return str(self._texts[self._offsets[row]:self._offsets[row + 1]], 'utf-8')
+
+    def todo(self, row: int) -> Todo:
+        """Returns a new todo_ holding the values in the row."""
+        flags = self._flags[row]
+        todo = Todo(text=self.text(row), today=bool(flags & _TODAY_FLAG), importance=flags & _IMPORTANCE_MASK)
+        todo.id = self.ids[row]
+        todo.saved = bool(flags & _SAVED_FLAG)
+        return todo
+
+    def row_of(self, todo_id: int) -> Optional[int]:
+        """Returns the row holding the todo_ with the id, or None if there is no such row."""
+        row = bisect.bisect_left(self.ids, todo_id)
+        if row < len(self.ids) and self.ids[row] == todo_id:
+            return row
+        return None
+
+    def close(self) -> None:
+        for view in (self.ids, self._offsets, self._flags, self._texts):
+            view.release()
+        self._mmap.close()
+
+
+class MappedTodoStore:
+    """Holds the todos as TodoStore does, but reads them from a file in the mapped format, so millions of todos
+    can be opened in milliseconds and cost next to no memory until they are used.
+
+    Todo_ objects are only made for the rows which are asked for, for example the page of the list being shown,
+    and are only held while something else holds them, or once they have been edited. Changes are held in
+    memory alongside the file, as a set of removed rows and a list of added todos. flush(), which the service
+    calls as it commits, appends the changes made since the last flush to a delta file beside the file, which
+    is replayed when the file is opened, so persisting a change costs as much as the change, however long the
+    file is. save() folds the changes into the file itself, rewriting it. Todos can only be inserted after the
+    last row in the file."""
+
+    def __init__(self, path: str):
+        self._path: str = path
+        self._delta_path: str = path + _DELTA_SUFFIX
+        self._file: MappedTodoFile = MappedTodoFile(path)
+        self._reset_overlay(self._file.ids[-1] + 1 if len(self._file) else 1)
+        self._replay_delta()
+
+    def _reset_overlay(self, next_id: int) -> None:
+        self._removed_rows: List[int] = []  # Sorted.
+        self._added: List[Todo] = []
+        self._added_by_id: Dict[int, Todo] = {}
+        self._edited: Dict[int, Todo] = {}  # Edited todos, keyed on their row, held until they are saved.
+        self._materialised: 'weakref.WeakValueDictionary[int, Todo]' = weakref.WeakValueDictionary()
+        self._ids = itertools.count(next_id)
+        self._search_index: Optional[FuzzyIndex[int]] = None  # Built the first time it is needed.
+        # The todos added or removed since the last flush, in order, with the index each was added at, and the
+        # todos edited since, keyed on id;
+        self._unflushed: List[Tuple[int, Todo, int]] = []
+        self._unflushed_edits: Dict[int, Todo] = {}
+
+    def _replay_delta(self) -> None:
+        """Applies the changes in the delta file, if there is one, and cuts any torn record from its end, so
+        new records follow on from the last intact one."""
+        try:
+            with open(self._delta_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        view = memoryview(data)
+        offset = 0
+        while offset + _DELTA_HEADER.size <= len(data):
+            crc, op, todo_id, index, flags, text_length = _DELTA_HEADER.unpack_from(data, offset)
+            text_start = offset + _DELTA_HEADER.size
+            end = text_start + text_length
+            if end > len(data) or zlib.crc32(view[offset + _DELTA_CRC.size:end]) != crc:
+                break
+            self._apply_delta(op, todo_id, index, flags, str(view[text_start:end], 'utf-8'))
+            offset = end
+        view.release()
+        if offset < len(data):
+            with open(self._delta_path, 'r+b') as f:
+                f.truncate(offset)
+
+    def _apply_delta(self, op: int, todo_id: int, index: int, flags: int, text: str) -> None:
+        """Applies a change read from the delta file. Changes already applied, for example because they were
+        saved into the file, are skipped."""
+        row = self._file.row_of(todo_id)
+        if op == _DELTA_ADD:
+            if row is not None or todo_id in self._added_by_id:
+                return
+            todo = Todo(text=text, today=bool(flags & _TODAY_FLAG), importance=flags & _IMPORTANCE_MASK)
+            todo.id = todo_id
+            todo.saved = bool(flags & _SAVED_FLAG)
+            self._added.insert(min(max(index - self._file_length, 0), len(self._added)), todo)
+            self._added_by_id[todo_id] = todo
+            self._ids = itertools.count(max(next(self._ids), todo_id + 1))
+        elif op == _DELTA_REMOVE:
+            if todo_id in self._added_by_id:
+                self._added.remove(self._added_by_id.pop(todo_id))
+            elif row is not None and not self._is_removed(row):
+                bisect.insort(self._removed_rows, row)
+                self._edited.pop(row, None)
+        elif todo_id in self._added_by_id or (row is not None and not self._is_removed(row)):
+            todo = self.get(todo_id)
+            todo.text, todo.today, todo.importance = text, bool(flags & _TODAY_FLAG), flags & _IMPORTANCE_MASK
+            todo.saved = bool(flags & _SAVED_FLAG)
+            if row is not None:
+                self._edited[row] = todo
+
+    def __len__(self) -> int:
+        return self._file_length + len(self._added)
+
+    def __iter__(self) -> Iterator[Todo]:
+        return itertools.chain((self._held_or_new_todo(row) for row in range(len(self._file))
+                                if not self._is_removed(row)), list(self._added))
+
+    @property
+    def _file_length(self) -> int:
+        """Returns the number of rows in the file which haven't been removed."""
+        return len(self._file) - len(self._removed_rows)
+
+    def _is_removed(self, row: int) -> bool:
+        i = bisect.bisect_left(self._removed_rows, row)
+        return i < len(self._removed_rows) and self._removed_rows[i] == row
+
+    def _row_at(self, index: int) -> int:
+        """Returns the file row holding the todo_ at the (0-based) index, skipping the removed rows."""
+        row = index
+        while True:
+            next_row = index + bisect.bisect_right(self._removed_rows, row)
+            if next_row == row:
+                return row
+            row = next_row
+
+    def _held_or_new_todo(self, row: int) -> Todo:
+        """Returns the todo_ in the row, if it is held, otherwise a new todo_ which isn't held."""
+        todo = self._edited.get(row)
+        if todo is None:
+            todo = self._materialised.get(row)
+        return todo if todo is not None else self._file.todo(row)
+
+    def _todo_in_row(self, row: int) -> Todo:
+        """Returns the todo_ in the row, making it if it isn't already held."""
+        todo = self._edited.get(row)
+        if todo is None:
+            todo = self._materialised.get(row)
+        if todo is None:
+            todo = self._materialised[row] = self._file.todo(row)
+        return todo
+
+    def _check_index(self, index: int) -> None:
+        if not 0 <= index < len(self):
+            raise exceptions.InvalidTodoNumError
+
+    def get(self, todo_id: int) -> Todo:
+        """Returns the todo with the specified id."""
+        todo = self._added_by_id.get(todo_id)
+        if todo is not None:
+            return todo
+        row = self._file.row_of(todo_id)
+        if row is None or self._is_removed(row):
+            raise exceptions.InvalidTodoIdError
+        return self._todo_in_row(row)
+
+    def at(self, index: int) -> Todo:
+        """Returns the todo at the (0-based) index."""
+        self._check_index(index)
+        if index < self._file_length:
+            return self._todo_in_row(self._row_at(index))
+        return self._added[index - self._file_length]
+
+    def append(self, todo: Todo) -> int:
+        """Adds the todo to the end of the list and returns its id."""
+        return self.insert(len(self), todo)
+
+    def extend(self, todos: Iterable[Todo]) -> List[Todo]:
+        """Adds the todos to the end of the list, giving each an id, and returns them."""
+        todos = list(todos)
+        for todo in todos:
+            self.append(todo)
+        return todos
+
+    def insert(self, index: int, todo: Todo) -> int:
+        """Inserts the todo before the (0-based) index and returns its id. The index must come after every row
+        in the file."""
+        if not self._file_length <= index <= len(self):
+            raise exceptions.InvalidTodoNumError
+        todo.id = next(self._ids)
+        self._added.insert(index - self._file_length, todo)
+        self._added_by_id[todo.id] = todo
+        self._unflushed.append((_DELTA_ADD, todo, index))
+        if self._search_index is not None:
+            self._search_index.add(todo.id, todo.text)
+        return todo.id
+
+    def remove_at(self, index: int) -> Todo:
+        """Removes and returns the todo at the (0-based) index."""
+        self._check_index(index)
+        if index < self._file_length:
+            row = self._row_at(index)
+            todo = self._todo_in_row(row)
+            bisect.insort(self._removed_rows, row)
+            self._edited.pop(row, None)
+        else:
+            todo = self._added.pop(index - self._file_length)
+            del self._added_by_id[todo.id]
+        self._unflushed.append((_DELTA_REMOVE, todo, 0))
+        self._unflushed_edits.pop(todo.id, None)
+        if self._search_index is not None:
+            self._search_index.remove(todo.id)
+        return todo
+
+    def iter_range(self, start: int, stop: Optional[int] = None) -> Iterator[Todo]:
+        """Yields the todos from the start index up to, but not including, the stop index."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for index in range(max(start, 0), stop):
+            yield self.at(index)
+
+    def reindex(self, todo: Todo) -> None:
+        """Records that the todo has been edited, holding onto it until it is saved, and updates the search
+        index if it has been built."""
+        if todo.id not in self._added_by_id:
+            self._edited[self._file.row_of(todo.id)] = todo
+        self._unflushed_edits[todo.id] = todo
+        if self._search_index is not None:
+            self._search_index.add(todo.id, todo.text)
+
+    def search(self, search_term: str, num_results: int) -> List[Todo]:
+        """Returns the todos whose text is most similar to the search term, best first. The search index is
+        built the first time this is called, which reads every text in the file."""
+        if self._search_index is None:
+            self._search_index = FuzzyIndex()
+            for row in range(len(self._file)):
+                if not self._is_removed(row):
+                    todo = self._edited.get(row)
+                    self._search_index.add(self._file.ids[row], todo.text if todo else self._file.text(row))
+            for todo in self._added:
+                self._search_index.add(todo.id, todo.text)
+        return [self.get(todo_id) for todo_id in self._search_index.best_matches(search_term, num_results)]
+
+    def numbered(self) -> NumberedTodos:
+        """Returns a live view of the todos keyed on their 1-based number in the list."""
+        return NumberedTodos(self)
+
+    def save(self) -> None:
+        """Writes the todos, with every change made since the file was last saved, back to the file, replacing
+        it atomically, and reopens it. This rewrites the whole file, so it costs as much as the file is long."""
+        write_mapped_todos(self._path + '.tmp', iter(self))
+        self._file.close()
+        os.replace(self._path + '.tmp', self._path)
+        if os.path.exists(self._delta_path):
+            os.remove(self._delta_path)
+        self._file = MappedTodoFile(self._path)
+        self._reset_overlay(next(self._ids))  # Ids aren't reused, even those of todos removed from the end.
+
+    def flush(self) -> None:
+        """Appends the changes made since the last flush to the delta file, and waits for them to reach the
+        disk. Todos are written with their values as they are now, so later edits to added todos are caught."""
+        if not self._unflushed and not self._unflushed_edits:
+            return
+        records = bytearray()
+        for op, todo, index in self._unflushed:
+            records += _encode_delta(op, todo, index)
+        for todo in self._unflushed_edits.values():
+            records += _encode_delta(_DELTA_UPDATE, todo)
+        with open(self._delta_path, 'ab') as f:
+            f.write(records)
+            f.flush()
+            os.fsync(f.fileno())
+        self._unflushed.clear()
+        self._unflushed_edits.clear()
+
+    def close(self) -> None:
+        """Unmaps the file. Changes which haven't been flushed or saved are lost."""
+        self._file.close()
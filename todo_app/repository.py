@@ -0,0 +1,46 @@
+import abc
+from typing import Iterable, Iterator
+
+from todo_app.todo import Todo
+
+
+class TodoRepository(abc.ABC):
+    """Base class for the stores the todos are persisted in.
+
+    Changes may be held back and written together, so they are only guaranteed to be persisted once commit()
+    has returned. The service commits at the end of every frame, so a frame's changes are written in one go."""
+
+    @abc.abstractmethod
+    def load(self) -> Iterator[Todo]:
+        """Yields every persisted todo_, in the order they were added, marked as saved."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def add(self, todo: Todo) -> None:
+        """Persists a new todo_. The todo_ must already have its id."""
+        raise NotImplementedError
+
+    def add_many(self, todos: Iterable[Todo]) -> None:
+        """Persists several new todos at once."""
+        for todo in todos:
+            self.add(todo)
+
+    @abc.abstractmethod
+    def update(self, todo: Todo) -> None:
+        """Persists the current text, today flag and importance of a todo_ already added."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def remove(self, todo_id: int) -> None:
+        """Removes the todo_ with the id."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def commit(self) -> None:
+        """Writes any changes held back, so they are persisted."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def close(self) -> None:
+        """Commits any changes held back and releases the repository's resources."""
+        raise NotImplementedError
@@ -1,13 +1,77 @@
-from typing import List
+import csv
+import functools
+import itertools
+import json
+import os
+import threading
+from typing import Any, Callable, Iterator, List, Optional, TextIO, Tuple, Union
 
 import todo_app
+from todo_app.mapped_todo_store import MappedTodoStore
+from todo_app.repository import TodoRepository
 from todo_app.todo import Todo
+from todo_app.todo_store import TodoStore, NumberedTodos
 
-todos: List['Todo'] = []
+todos: Union[TodoStore, MappedTodoStore] = TodoStore()
+repository: Optional[TodoRepository] = None  # Where the todos are persisted, if anywhere.
+# Held while the todos are read or changed, so imports and exports can run as background jobs;
+lock = threading.RLock()
+import_chunk_size: int = 10000  # Rows read, validated and added at a time by import_todos().
 
+_TODO_FILE_FORMATS = ('.csv', '.jsonl')
+# The values accepted for each field in an imported file, with what they stand for. Bools are equal to 0 and 1,
+# so they're accepted too;
+_TODAY_VALUES = {'': False, '0': False, 'false': False, 'no': False, 'n': False, None: False, 0: False,
+                 '1': True, 'true': True, 'yes': True, 'y': True, 1: True}
+_IMPORTANCE_VALUES = {'': 1, None: 1, '1': 1, '2': 2, '3': 3, 1: 1, 2: 2, 3: 3}
+_Row = Tuple[int, Any, Any, Any]  # The row number, then the text, today and importance values as read.
 
+
+def _locked(func: Callable) -> Callable:
+    """Decorates a function so it holds the lock while it runs."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with lock:
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+@_locked
+def use_store(store: Union[TodoStore, MappedTodoStore]) -> None:
+    """Replaces the store the todos are held in, for example with a MappedTodoStore to browse a very long
+    list without loading it."""
+    global todos
+    todos = store
+
+
+@_locked
+def use_repository(repo: Optional[TodoRepository]) -> None:
+    """Replaces the todos with those persisted in the repository, and persists changes to it from then on.
+    With None, the todos are only held in memory."""
+    global repository
+    use_store(TodoStore())
+    repository = repo
+    if repo is not None:
+        todos.load(repo.load())
+
+
+@_locked
+def commit() -> None:
+    """Commits the changes made since the last commit to the repository, if there is one, or else to the store's
+    file, for a MappedTodoStore. Register this as a frame hook on the app, so each frame's changes are committed
+    together."""
+    todos.flush()
+    if repository is not None:
+        repository.commit()
+
+
+@_locked
 def save_todo(todo: 'Todo') -> None:
-    """Stubs in save functionality of a database."""
+    """Persists the todo_'s edits to the repository, if there is one, and marks it saved."""
+    if repository is not None:
+        repository.update(todo)
     todo.saved = True
 
 
@@ -17,7 +81,7 @@ def validate_todo_num(num) -> int:
         num = int(num)
     except ValueError:
         raise todo_app.exceptions.InvalidTodoNumError
-    if num > len(todos):
+    if num < 1 or num > len(todos):
         raise todo_app.exceptions.InvalidTodoNumError
     return num
 
@@ -33,21 +97,184 @@ def validate_importance_score(score) -> int:
     return score
 
 
+@_locked
 def add_todo(text: str, today: bool, importance: int) -> None:
     """Instantiates and adds a todo_ to the list."""
-    todos.append(Todo(text=text, today=today, importance=importance))
+    todo = Todo(text=text, today=today, importance=importance)
+    todos.append(todo)
+    if repository is not None:
+        repository.add(todo)
+
+
+@_locked
+def edit_todo(todo: 'Todo', text: str, today: bool, importance: int) -> None:
+    """Updates the todo_, keeping the store's search index in step with its text."""
+    todo.text = text
+    todo.today = today
+    todo.importance = importance
+    todos.reindex(todo)
+
 
+@_locked
+def search_todos(search_term: str, num_results: int) -> List['Todo']:
+    """Returns the todo_'s whose text is most similar to the search term, best first."""
+    return todos.search(search_term, num_results)
 
+
+@_locked
 def remove_todo(todo_num: int) -> None:
     """Removes a the todo_ associated with the specifed number."""
-    todos.pop(todo_num - 1)
+    todo = todos.remove_at(todo_num - 1)
+    if repository is not None:
+        repository.remove(todo.id)
 
 
+@_locked
 def fetch_todo(todo_num: int) -> 'Todo':
     """Returns the _todo at the specified index."""
-    return todos[todo_num - 1]
+    return todos.at(todo_num - 1)
+
+
+@_locked
+def fetch_todo_by_id(todo_id: int) -> 'Todo':
+    """Returns the _todo with the specified id."""
+    return todos.get(todo_id)
+
+
+def numbered_todos() -> NumberedTodos:
+    """Returns a live view of the todos, keyed on their number in the list."""
+    return todos.numbered()
 
 
 def count_todos() -> int:
     """Returns the number of _todo items."""
     return len(todos)
+
+
+def todo_file_format(path: str) -> str:
+    """Returns the format of a file of todos, from its extension; '.csv' or '.jsonl'."""
+    file_format = os.path.splitext(path)[1].lower()
+    if file_format not in _TODO_FILE_FORMATS:
+        raise todo_app.exceptions.InvalidTodoFileError('{path} is not a .csv or .jsonl file.'.format(path=path))
+    return file_format
+
+
+def _csv_rows(f: TextIO) -> Iterator[_Row]:
+    """Yields the rows of a CSV file with a header naming its columns; text, and optionally today and
+    importance. Other columns, such as the id written by export_todos(), are ignored."""
+    reader = csv.reader(f)
+    header = [name.strip().lower() for name in next(reader, [])]
+    if 'text' not in header:
+        raise todo_app.exceptions.InvalidTodoFileError('The first row must name the columns, including text.')
+    text_column = header.index('text')
+    today_column = header.index('today') if 'today' in header else None
+    importance_column = header.index('importance') if 'importance' in header else None
+    for row in reader:
+        if not row:  # Blank line.
+            continue
+        try:
+            yield (reader.line_num, row[text_column],
+                   row[today_column].strip().lower() if today_column is not None else '',
+                   row[importance_column].strip() if importance_column is not None else '')
+        except IndexError:
+            yield reader.line_num, None, None, None
+
+
+def _jsonl_rows(f: TextIO) -> Iterator[_Row]:
+    """Yields the rows of a JSON lines file, each an object with a text, and optionally today and importance."""
+    for line_num, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+            today = row.get('today')
+            yield line_num, row['text'], today.strip().lower() if isinstance(today, str) else today, \
+                row.get('importance')
+        except (ValueError, KeyError, AttributeError):
+            yield line_num, None, None, None
+
+
+def _todos_from_rows(rows: List[_Row]) -> List[Todo]:
+    """Returns a todo_ for each row, validating the rows as a batch. Raises InvalidTodoFileError naming the
+    first invalid row."""
+    todays = [_TODAY_VALUES.get(today) for _, _, today, _ in rows]
+    importances = [_IMPORTANCE_VALUES.get(importance) for _, _, _, importance in rows]
+    if None in todays or None in importances or not all(type(text) is str for _, text, _, _ in rows):
+        for (row_num, text, _, _), today, importance in zip(rows, todays, importances):
+            if type(text) is not str:
+                reason = 'has no text'
+            elif today is None:
+                reason = 'has an invalid today flag'
+            elif importance is None:
+                reason = 'has an invalid importance score'
+            else:
+                continue
+            raise todo_app.exceptions.InvalidTodoFileError('Line {row_num} {reason}.'.format(
+                row_num=row_num, reason=reason))
+    return [Todo(text, today, importance) for (_, text, _, _), today, importance in zip(rows, todays, importances)]
+
+
+def import_todos(path: str, on_progress: Optional[Callable[[float, int], None]] = None) -> int:
+    """Adds the todos in a CSV or JSON lines file to the end of the list, and returns how many were added.
+
+    The file is read, validated and added import_chunk_size rows at a time, so the memory used doesn't grow
+    with the size of the file. If a row is invalid, InvalidTodoFileError is raised, naming its line, and the
+    chunks before it are kept. The added todos are handed to the repository, if there is one, but not
+    committed; they are persisted by the next commit(), along with the rest of the frame's changes.
+
+    Args:
+        path: The file to import, a .csv or .jsonl file.
+        on_progress: Called after each chunk is added, with the fraction of the file read and the number of
+            todos added so far. Anything it raises stops the import.
+    """
+    file_format = todo_file_format(path)
+    size = os.path.getsize(path)
+    count = 0
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = _csv_rows(f) if file_format == '.csv' else _jsonl_rows(f)
+        while True:
+            chunk = _todos_from_rows(list(itertools.islice(rows, import_chunk_size)))
+            if not chunk:
+                return count
+            with lock:
+                todos.extend(chunk)
+                if repository is not None:
+                    repository.add_many(chunk)
+            count += len(chunk)
+            if on_progress is not None:
+                on_progress(f.buffer.tell() / size if size else 1.0, count)
+
+
+def export_todos(path: str, on_progress: Optional[Callable[[float, int], None]] = None) -> int:
+    """Writes the todos to a CSV or JSON lines file, replacing it, and returns how many were written.
+
+    The todos are copied out and written import_chunk_size at a time, so the list is only locked for a chunk
+    at a time. Todos added or removed while the export runs may be missed, or written twice.
+
+    Args:
+        path: The file to write, a .csv or .jsonl file.
+        on_progress: Called after each chunk is written, with the fraction of the list written and the number
+            of todos written so far. Anything it raises stops the export.
+    """
+    file_format = todo_file_format(path)
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if file_format == '.csv':
+            writer = csv.writer(f)
+            writer.writerow(('id', 'text', 'today', 'importance'))
+            write_chunk = writer.writerows
+        else:
+            def write_chunk(chunk):
+                f.writelines(json.dumps({'id': todo_id, 'text': text, 'today': today, 'importance': importance},
+                                        ensure_ascii=False) + '\n' for todo_id, text, today, importance in chunk)
+        while True:
+            with lock:
+                total = len(todos)
+                chunk = [(todo.id, todo.text, todo.today, todo.importance)
+                         for todo in todos.iter_range(count, count + import_chunk_size)]
+            if not chunk:
+                return count
+            write_chunk(chunk)
+            count += len(chunk)
+            if on_progress is not None:
+                on_progress(min(1.0, count / total), count)
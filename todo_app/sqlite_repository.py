@@ -0,0 +1,95 @@
+import sqlite3
+import threading
+from typing import Iterable, Iterator
+
+from todo_app.repository import TodoRepository
+from todo_app.todo import Todo
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS todos (id INTEGER PRIMARY KEY, text TEXT NOT NULL, today INTEGER NOT NULL, '
+    'importance INTEGER NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS todos_importance ON todos (importance)',
+    'CREATE INDEX IF NOT EXISTS todos_today ON todos (today)',
+)
+# The statements are kept as constants, so sqlite3's statement cache prepares each of them once;
+_INSERT = 'INSERT INTO todos (id, text, today, importance) VALUES (?, ?, ?, ?)'
+_UPDATE = 'UPDATE todos SET text = ?, today = ?, importance = ? WHERE id = ?'
+_DELETE = 'DELETE FROM todos WHERE id = ?'
+_SELECT_ALL = 'SELECT id, text, today, importance FROM todos ORDER BY id'
+
+
+class SqliteTodoRepository(TodoRepository):
+    """Persists the todos in an SQLite database, through one connection held open for the life of the
+    repository.
+
+    Changes are made inside a transaction which is only committed by commit(), so however many todos a frame
+    adds, edits or removes, they cost one commit. The database is put in WAL mode, so a commit appends to the
+    log rather than rewriting the pages in place."""
+
+    _fetch_size: int = 10000  # Rows fetched from the cursor at a time while loading.
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: The database file, created if it doesn't exist, or ':memory:'.
+        """
+        # Transactions are begun and committed explicitly, rather than by the sqlite3 module. The connection
+        # is guarded by the lock, so it can be shared with background jobs;
+        self._connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._in_transaction: bool = False
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        for statement in _SCHEMA:
+            self._connection.execute(statement)
+
+    def _begin(self) -> None:
+        """Begins a transaction, unless one is already open."""
+        if not self._in_transaction:
+            self._connection.execute('BEGIN')
+            self._in_transaction = True
+
+    def load(self) -> Iterator[Todo]:
+        with self._lock:
+            cursor = self._connection.execute(_SELECT_ALL)
+            rows = cursor.fetchmany(self._fetch_size)
+        while rows:
+            for todo_id, text, today, importance in rows:
+                todo = Todo(text=text, today=bool(today), importance=importance)
+                todo.id = todo_id
+                todo.saved = True
+                yield todo
+            with self._lock:
+                rows = cursor.fetchmany(self._fetch_size)
+
+    def add(self, todo: Todo) -> None:
+        with self._lock:
+            self._begin()
+            self._connection.execute(_INSERT, (todo.id, todo.text, todo.today, todo.importance))
+
+    def add_many(self, todos: Iterable[Todo]) -> None:
+        with self._lock:
+            self._begin()
+            self._connection.executemany(_INSERT, ((todo.id, todo.text, todo.today, todo.importance)
+                                                   for todo in todos))
+
+    def update(self, todo: Todo) -> None:
+        with self._lock:
+            self._begin()
+            self._connection.execute(_UPDATE, (todo.text, todo.today, todo.importance, todo.id))
+
+    def remove(self, todo_id: int) -> None:
+        with self._lock:
+            self._begin()
+            self._connection.execute(_DELETE, (todo_id,))
+
+    def commit(self) -> None:
+        with self._lock:
+            if self._in_transaction:
+                self._connection.execute('COMMIT')
+                self._in_transaction = False
+
+    def close(self) -> None:
+        with self._lock:
+            self.commit()
+            self._connection.close()
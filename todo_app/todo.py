@@ -1,5 +1,12 @@
+from typing import Optional
+
+
 class Todo:
+    # Slots keep each todo_ small when there are millions of them. Mapped stores hold todos weakly;
+    __slots__ = ('id', 'text', 'today', 'importance', 'saved', '__weakref__')
+
     def __init__(self, text: str, today=False, importance=1):
+        self.id: Optional[int] = None  # Assigned by the store when the todo_ is added.
         self.text: str = text
         self.today: bool = today
         self.importance: int = importance
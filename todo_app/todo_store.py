@@ -0,0 +1,228 @@
+import itertools
+from typing import Dict, ItemsView, Iterable, Iterator, List, Mapping, Optional, Tuple, TYPE_CHECKING, Union
+
+from pyconsoleapp.fuzzy_index import FuzzyIndex
+from todo_app import exceptions
+from todo_app.todo import Todo
+
+if TYPE_CHECKING:
+    from todo_app.mapped_todo_store import MappedTodoStore
+
+
+class TodoStore:
+    """Holds the todos in order, giving each a stable id when it is added.
+
+    The order is kept as a list of chunks of todos, with a Fenwick tree over the chunk lengths, so finding,
+    inserting or deleting the todo at a position costs O(log n) to find the chunk plus O(chunk size) within
+    it, rather than the O(n) shuffle of a single list. Todos can also be looked up by id in O(1), and searched
+    by their text through a fuzzy index, which is built the first time a search is made and kept in step with
+    the store from then on, so loading or importing a long list doesn't pay for indexing it."""
+
+    _chunk_size: int = 512  # Chunks are split once they reach twice this length.
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self._todos_by_id: Dict[int, Todo] = {}
+        self._chunks: List[List[Todo]] = []
+        self._tree: List[int] = [0]  # 1-based Fenwick tree over the chunk lengths.
+        self._search_index: Optional[FuzzyIndex[int]] = None  # Built the first time it is needed.
+
+    def __len__(self) -> int:
+        return len(self._todos_by_id)
+
+    def __iter__(self) -> Iterator[Todo]:
+        return itertools.chain.from_iterable(self._chunks)
+
+    def _rebuild_tree(self) -> None:
+        """Rebuilds the Fenwick tree after chunks are added or removed."""
+        tree = [0] + [len(chunk) for chunk in self._chunks]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _add_to_chunk_length(self, chunk_index: int, delta: int) -> None:
+        i = chunk_index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        """Returns the chunk holding the todo at the (0-based) index, and the todo's offset within it."""
+        chunk_index = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            next_index = chunk_index + step
+            if next_index < len(self._tree) and self._tree[next_index] <= index:
+                chunk_index = next_index
+                index -= self._tree[next_index]
+            step >>= 1
+        return chunk_index, index
+
+    def _check_index(self, index: int) -> None:
+        if not 0 <= index < len(self):
+            raise exceptions.InvalidTodoNumError
+
+    def get(self, todo_id: int) -> Todo:
+        """Returns the todo with the specified id."""
+        try:
+            return self._todos_by_id[todo_id]
+        except KeyError:
+            raise exceptions.InvalidTodoIdError
+
+    def at(self, index: int) -> Todo:
+        """Returns the todo at the (0-based) index."""
+        self._check_index(index)
+        chunk_index, offset = self._locate(index)
+        return self._chunks[chunk_index][offset]
+
+    def append(self, todo: Todo) -> int:
+        """Adds the todo to the end of the list and returns its id."""
+        return self.insert(len(self), todo)
+
+    def insert(self, index: int, todo: Todo) -> int:
+        """Inserts the todo before the (0-based) index and returns its id."""
+        if not 0 <= index <= len(self):
+            raise exceptions.InvalidTodoNumError
+        todo.id = next(self._ids)
+        self._todos_by_id[todo.id] = todo
+        if self._search_index is not None:
+            self._search_index.add(todo.id, todo.text)
+        if not self._chunks:
+            self._chunks.append([todo])
+            self._rebuild_tree()
+            return todo.id
+        if index == len(self) - 1:  # The new todo is already counted, so this is an append.
+            chunk_index, offset = len(self._chunks) - 1, len(self._chunks[-1])
+        else:
+            chunk_index, offset = self._locate(index)
+        chunk = self._chunks[chunk_index]
+        chunk.insert(offset, todo)
+        if len(chunk) >= 2 * self._chunk_size:
+            self._chunks[chunk_index:chunk_index + 1] = [chunk[:self._chunk_size], chunk[self._chunk_size:]]
+            self._rebuild_tree()
+        else:
+            self._add_to_chunk_length(chunk_index, 1)
+        return todo.id
+
+    def remove_at(self, index: int) -> Todo:
+        """Removes and returns the todo at the (0-based) index."""
+        self._check_index(index)
+        chunk_index, offset = self._locate(index)
+        chunk = self._chunks[chunk_index]
+        todo = chunk.pop(offset)
+        del self._todos_by_id[todo.id]
+        if self._search_index is not None:
+            self._search_index.remove(todo.id)
+        if not chunk:
+            del self._chunks[chunk_index]
+            self._rebuild_tree()
+        else:
+            self._add_to_chunk_length(chunk_index, -1)
+        return todo
+
+    def iter_range(self, start: int, stop: Optional[int] = None) -> Iterator[Todo]:
+        """Yields the todos from the start index up to, but not including, the stop index."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+        chunk_index, offset = self._locate(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = self._chunks[chunk_index]
+            todos = chunk[offset:offset + remaining]
+            yield from todos
+            remaining -= len(todos)
+            chunk_index, offset = chunk_index + 1, 0
+
+    def load(self, todos: Iterable[Todo]) -> None:
+        """Adds todos which already have their ids, for example read back from a repository, to the end of the
+        list. Ids given out afterwards carry on from the highest id loaded."""
+        last_id = 0
+        chunk: List[Todo] = []
+        for todo in todos:
+            self._todos_by_id[todo.id] = todo
+            if self._search_index is not None:
+                self._search_index.add(todo.id, todo.text)
+            last_id = max(last_id, todo.id)
+            chunk.append(todo)
+            if len(chunk) == self._chunk_size:
+                self._chunks.append(chunk)
+                chunk = []
+        if chunk:
+            self._chunks.append(chunk)
+        self._rebuild_tree()
+        self._ids = itertools.count(max(next(self._ids), last_id + 1))
+
+    def extend(self, todos: Iterable[Todo]) -> List[Todo]:
+        """Adds the todos to the end of the list, giving each an id, and returns them. Much faster than
+        appending them one at a time, as the chunks are filled and the Fenwick tree rebuilt in one go."""
+        todos = list(todos)
+        ids = self._ids
+        for todo in todos:
+            todo.id = next(ids)
+        self.load(todos)
+        return todos
+
+    def clear(self) -> None:
+        """Removes every todo. Ids are not reused."""
+        self._todos_by_id.clear()
+        self._search_index = None
+        self._chunks.clear()
+        self._rebuild_tree()
+
+    def reindex(self, todo: Todo) -> None:
+        """Updates the search index, if it has been built, after the todo's text has been changed."""
+        if self._search_index is not None:
+            self._search_index.add(todo.id, todo.text)
+
+    def search(self, search_term: str, num_results: int) -> List[Todo]:
+        """Returns the todos whose text is most similar to the search term, best first. The search index is
+        built the first time this is called."""
+        if self._search_index is None:
+            self._search_index = FuzzyIndex()
+            for todo in self:
+                self._search_index.add(todo.id, todo.text)
+        return [self._todos_by_id[todo_id] for todo_id in self._search_index.best_matches(search_term, num_results)]
+
+    def numbered(self) -> 'NumberedTodos':
+        """Returns a live view of the todos keyed on their 1-based number in the list."""
+        return NumberedTodos(self)
+
+    def flush(self) -> None:
+        """Does nothing, as the todos are only held in memory. A repository persists them, if there is one."""
+
+
+class NumberedTodos(Mapping[int, Todo]):
+    """Read only view of a store's todos, keyed on their 1-based number in the list. The view reads through
+    to the store, so it never needs rebuilding when the store changes."""
+
+    def __init__(self, store: Union[TodoStore, 'MappedTodoStore']):
+        self._store: Union[TodoStore, 'MappedTodoStore'] = store
+
+    def __getitem__(self, num: int) -> Todo:
+        if not isinstance(num, int) or not 1 <= num <= len(self._store):
+            raise KeyError(num)
+        return self._store.at(num - 1)
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(1, len(self._store) + 1))
+
+    def items_between(self, first_num: int, last_num: int) -> Iterator[Tuple[int, Todo]]:
+        """Yields the number and todo of each todo from first_num to last_num inclusive."""
+        first_num = max(first_num, 1)
+        return zip(itertools.count(first_num), self._store.iter_range(first_num - 1, last_num))
+
+    def items(self) -> '_NumberedTodoItems':
+        return _NumberedTodoItems(self)
+
+
+class _NumberedTodoItems(ItemsView):
+    """Items view which walks the store in order, rather than looking each number up."""
+
+    def __iter__(self) -> Iterator[Tuple[int, Todo]]:
+        return zip(itertools.count(1), self._mapping._store)